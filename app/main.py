@@ -1,23 +1,30 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-import pandas as pd
-import io
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Request, Query, Response, Header, Depends
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 import json
 import os
+import tempfile
+import time
 from typing import List, Optional
 
 from src.config import settings
-from src.data_loader import save_data
-from src.validator import DataValidator
-from src.eda_engine import EDAEngine
+from src.metrics import metrics
+from src.validator import StreamingValidator
+from src.ingest import ingest_csv, link_or_copy
+from src.eda_cache import eda_cache
 from src.model_suggester import ModelSuggester
-from src.trainer import Trainer
+from src.model_selector import ModelSelector
+from src.job_manager import job_manager
 from src.registry import ModelRegistry
 from src.predictor import Predictor
+from src.batch_reader import iter_batches, SUPPORTED_FORMATS
+from src.model_cache import model_cache
 from src.storage_manager import StorageManager
+from src.dataset_profile import DatasetProfile
 from src.history_manager import HistoryManager
+from src.session_store import Session, session_store
 
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -27,15 +34,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
-# In-memory storage for current session
-current_session = {
-    "project_id": None,
-    "df": None,
-    "task_type": None,
-    "target": None
-}
+def get_session(x_session_id: str = Header("default")) -> Session:
+    # Each client sends its own X-Session-ID; DataFrames are shared per project and evicted by memory budget
+    return session_store.get(x_session_id)
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # Reject oversized uploads from the header, before the body is received
+    content_length = request.headers.get("content-length")
+    if request.url.path == "/upload" and content_length and int(content_length) > settings.MAX_UPLOAD_BYTES:
+        return JSONResponse(status_code=413, content={"detail": f"Upload exceeds the {settings.MAX_UPLOAD_BYTES} byte limit."})
+    return await call_next(request)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    with metrics.collect_request_timings() as timings:
+        response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    # Label by route template so /jobs/{job_id} is one series, not one per job
+    route = request.scope.get("route")
+    metrics.count_request(request.method, getattr(route, "path", "unmatched"), response.status_code, elapsed)
+    if settings.SERVER_TIMING_HEADERS:
+        totals = {}
+        for stage, seconds in timings:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items()]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    job_manager.shutdown()
 
 @app.get("/")
 async def root():
@@ -45,33 +79,51 @@ async def root():
 async def upload_dataset(
     file: UploadFile = File(...), 
     task_type: str = Form(...),
-    target_column: str = Form(...)
+    target_column: str = Form(...),
+    session: Session = Depends(get_session)
 ):
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are supported.")
+    if file.size is not None and file.size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {settings.MAX_UPLOAD_BYTES} byte limit.")
+    
+    # Create project ID and storage
+    project_id = StorageManager.create_project_structure()
+    dataset_path = StorageManager.get_dataset_path(project_id)
     
-    contents = await file.read()
-    df = pd.read_csv(io.BytesIO(contents))
+    # Parse the spooled upload chunk by chunk straight into project storage, validating as we go
+    validator = StreamingValidator(target_column, task_type)
+    start = time.perf_counter()
+    try:
+        await run_in_threadpool(ingest_csv, file.file, dataset_path, validator.update, settings.UPLOAD_CHUNK_ROWS)
+    except Exception as e:
+        StorageManager.delete_project(project_id)
+        raise HTTPException(status_code=400, detail=f"Could not parse CSV: {str(e)}")
+    # Validation runs chunk by chunk inside the ingest; report the two shares separately
+    metrics.observe("upload_parse", time.perf_counter() - start - validator.seconds)
+    metrics.observe("validation", validator.seconds)
     
     # Validate
-    is_valid, errors = DataValidator.validate_dataset(df)
+    is_valid, errors = validator.validate_dataset()
     if not is_valid:
+        StorageManager.delete_project(project_id)
         raise HTTPException(status_code=400, detail={"errors": errors})
     
-    if not DataValidator.check_target_exists(df, target_column):
+    if not validator.check_target_exists():
+        StorageManager.delete_project(project_id)
         raise HTTPException(status_code=400, detail=f"Target column '{target_column}' not found.")
     
     # Validate Task Alignment
-    is_aligned, message = DataValidator.validate_task_alignment(df, target_column, task_type)
+    is_aligned, message = validator.validate_task_alignment()
     if not is_aligned:
+        StorageManager.delete_project(project_id)
         raise HTTPException(status_code=400, detail=message)
     
-    # Create project ID and storage
-    project_id = StorageManager.create_project_structure()
-    StorageManager.save_dataset(project_id, df, "raw_data.csv")
+    # The profile built during ingest serves later EDA, suggestions and validation without rescanning
+    validator.profile.save(project_id)
     
     # Save for DVC (backward compatibility)
-    save_data(df, "raw_dataset.csv")
+    link_or_copy(dataset_path, settings.RAW_DATASET_PATH)
     
     # Update History index
     HistoryManager.add_project(project_id, {
@@ -81,129 +133,369 @@ async def upload_dataset(
         "score": None
     })
     
-    # Store in session
-    current_session["project_id"] = project_id
-    current_session["df"] = df
-    current_session["task_type"] = task_type
-    current_session["target"] = target_column
+    # Store in session; the frame is loaded lazily from storage when first needed
+    session.activate(project_id, task_type, target_column)
     
     return {
         "message": "Dataset uploaded and validated successfully.",
         "project_id": project_id
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint: stage latencies, request counts, cache hit rates and in-flight jobs."""
+    caches = {
+        "model": model_cache.stats(),
+        "eda": {"hits": eda_cache.hits, "misses": eda_cache.misses},
+        "dataframe": session_store.frames.stats()
+    }
+    gauges = {
+        "automl_cache_hits_total": ("Cache hits by cache.", {(("cache", name),): s["hits"] for name, s in caches.items()}),
+        "automl_cache_misses_total": ("Cache misses by cache.", {(("cache", name),): s["misses"] for name, s in caches.items()}),
+        "automl_cache_hit_ratio": ("Share of lookups served from the cache.", {
+            (("cache", name),): s["hits"] / (s["hits"] + s["misses"]) if s["hits"] + s["misses"] else 0.0
+            for name, s in caches.items()
+        }),
+        "automl_jobs_in_flight": ("Background jobs queued or running.", {(): job_manager.in_flight()})
+    }
+    return metrics.render(gauges)
+
 @app.get("/projects")
-async def list_projects():
-    return HistoryManager.get_all_projects()
+async def list_projects(response: Response, limit: Optional[int] = Query(None, ge=1, le=500), cursor: Optional[str] = None):
+    if limit is None:
+        return HistoryManager.get_all_projects()
+    
+    try:
+        projects, next_cursor = HistoryManager.list_projects(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return projects
 
 @app.get("/project/{project_id}")
-async def load_project(project_id: str):
+async def load_project(project_id: str, session: Session = Depends(get_session)):
     metadata = HistoryManager.get_project_metadata(project_id)
     if not metadata:
         raise HTTPException(status_code=404, detail="Project not found")
         
-    df = StorageManager.load_dataset(project_id)
+    df = session_store.frames.get(project_id)
     if df is None:
         raise HTTPException(status_code=404, detail="Dataset not found in storage")
         
     eda_data = StorageManager.load_json(project_id, "eda.json")
     results = StorageManager.load_json(project_id, "results.json")
+    profile = DatasetProfile.for_project(project_id, df)
     
     # Update active session
-    current_session["project_id"] = project_id
-    current_session["df"] = df
-    current_session["task_type"] = metadata["task_type"]
-    current_session["target"] = metadata["target"]
+    session.activate(project_id, metadata["task_type"], metadata["target"])
     
     return {
         "metadata": metadata,
         "eda_data": eda_data,
-        "training_results": results
+        "training_results": results,
+        "profile": profile.to_dict() if profile else None,
+        "memory": df.attrs.get("memory_optimization")
     }
 
 @app.delete("/project/{project_id}")
 async def delete_project(project_id: str):
     StorageManager.delete_project(project_id)
     HistoryManager.remove_project(project_id)
-    if current_session["project_id"] == project_id:
-        current_session["project_id"] = None
-        current_session["df"] = None
+    session_store.forget_project(project_id)
     return {"message": "Project deleted successfully"}
 
 @app.get("/eda")
-async def get_eda():
-    if current_session["df"] is None:
+async def get_eda(session: Session = Depends(get_session)):
+    # Served from the project's cached report unless the dataset or target changed;
+    # the dataset is only loaded when the report has to be built
+    report = eda_cache.get_or_build(session.project_id, lambda: session.df, session.target) if session.project_id else None
+    if report is None:
         raise HTTPException(status_code=400, detail="No dataset uploaded.")
-    
-    report_path = EDAEngine.generate_eda_report(current_session["df"], current_session["target"])
-    with open(report_path, "r") as f:
-        report_data = json.load(f)
-    
-    # Persistent storage
-    if current_session["project_id"]:
-        StorageManager.save_json(current_session["project_id"], report_data, "eda.json")
-        
-    return report_data
+    return report
 
 @app.get("/model-suggestions")
-async def get_suggestions():
-    if current_session["df"] is None:
+async def get_suggestions(session: Session = Depends(get_session)):
+    # Only the profile is needed, so the dataset itself isn't loaded
+    profile = DatasetProfile.for_project(session.project_id) if session.project_id else None
+    if profile is None:
         raise HTTPException(status_code=400, detail="No dataset uploaded.")
     
-    suggestions = ModelSuggester.suggest_models(current_session["df"], current_session["task_type"])
+    suggestions = ModelSuggester.suggest_models(None, session.task_type, profile=profile, target=session.target)
     return {"suggestions": suggestions}
 
-@app.post("/train")
-async def train_model(model_id: str):
-    if current_session["df"] is None:
+def _persist_training_result(project_id: str, result: dict):
+    StorageManager.save_json(project_id, result, "results.json")
+    # Update index with best score
+    score = list(result["metrics"].values())[0]
+    metadata = HistoryManager.get_project_metadata(project_id)
+    if metadata:
+        metadata["score"] = score
+        HistoryManager.add_project(project_id, metadata)
+
+@app.post("/train", status_code=202)
+async def train_model(model_id: str, session: Session = Depends(get_session)):
+    if session.project_id is None:
         raise HTTPException(status_code=400, detail="No dataset uploaded.")
     
-    trainer = Trainer(experiment_name=settings.MLFLOW_EXPERIMENT_NAME)
     try:
-        result = trainer.train(
-            current_session["df"], 
-            current_session["target"], 
-            current_session["task_type"], 
-            model_id
-        )
+        ModelSelector.validate(model_id)
     except ValueError as e:
-        if "Unknown label type" in str(e) or "classification" in str(e).lower():
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Task mismatch error: {str(e)}. This usually happens when you try to use a Classifier on a Regression task (continuous target). Please re-upload and select the correct task type."
-            )
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
-    
-    # Persistent storage
-    if current_session["project_id"]:
-        StorageManager.save_json(current_session["project_id"], result, "results.json")
-        # Update index with best score
-        score = list(result["metrics"].values())[0]
-        metadata = HistoryManager.get_project_metadata(current_session["project_id"])
-        if metadata:
-            metadata["score"] = score
-            HistoryManager.add_project(current_session["project_id"], metadata)
-            
-    return result
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    project_id = session.project_id
+    job_id = job_manager.submit(
+        "train",
+        "src.trainer:train_project",
+        project_id,
+        session.target,
+        session.task_type,
+        model_id,
+        settings.MLFLOW_EXPERIMENT_NAME,
+        metadata={"project_id": project_id, "model_id": model_id},
+        on_complete=lambda result: _persist_training_result(project_id, result)
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+@app.post("/train-streaming", status_code=202)
+async def train_model_streaming(model_id: str, session: Session = Depends(get_session)):
+    if session.project_id is None:
+        raise HTTPException(status_code=400, detail="No dataset uploaded.")
+    
+    try:
+        model = ModelSelector.get_model(model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not hasattr(model, "partial_fit"):
+        raise HTTPException(status_code=400, detail=f"Model '{model_id}' cannot be trained incrementally.")
+    
+    project_id = session.project_id
+    job_id = job_manager.submit(
+        "train_streaming",
+        "src.trainer:train_project_streaming",
+        project_id,
+        session.target,
+        session.task_type,
+        model_id,
+        settings.MLFLOW_EXPERIMENT_NAME,
+        metadata={"project_id": project_id, "model_id": model_id},
+        on_complete=lambda result: _persist_training_result(project_id, result)
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+def _persist_leaderboard(project_id: str, result: dict):
+    StorageManager.save_json(project_id, result, "leaderboard.json")
+    if result["best"] is not None:
+        _persist_training_result(project_id, result["best"])
+
+@app.post("/train-all", status_code=202)
+async def train_all_models(model_ids: Optional[List[str]] = Query(None), session: Session = Depends(get_session)):
+    if session.project_id is None:
+        raise HTTPException(status_code=400, detail="No dataset uploaded.")
+    
+    for model_id in model_ids or []:
+        try:
+            ModelSelector.validate(model_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    project_id = session.project_id
+    job_id = job_manager.submit(
+        "train_all",
+        "src.trainer:train_project_all",
+        project_id,
+        session.target,
+        session.task_type,
+        model_ids,
+        settings.MLFLOW_EXPERIMENT_NAME,
+        metadata={"project_id": project_id, "model_ids": model_ids},
+        on_complete=lambda result: _persist_leaderboard(project_id, result)
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+@app.post("/tune", status_code=202)
+async def tune_model(
+    model_id: str,
+    budget_seconds: float = Query(settings.TUNING_DEFAULT_BUDGET_SECONDS, gt=0),
+    session: Session = Depends(get_session)
+):
+    if session.project_id is None:
+        raise HTTPException(status_code=400, detail="No dataset uploaded.")
+    
+    try:
+        ModelSelector.get_search_space(model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    project_id = session.project_id
+    job_id = job_manager.submit(
+        "tune",
+        "src.trainer:tune_project",
+        project_id,
+        session.target,
+        session.task_type,
+        model_id,
+        budget_seconds,
+        settings.MLFLOW_EXPERIMENT_NAME,
+        metadata={"project_id": project_id, "model_id": model_id, "budget_seconds": budget_seconds},
+        on_complete=lambda result: _persist_training_result(project_id, result)
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+@app.post("/screen", status_code=202)
+async def screen_models(model_ids: Optional[List[str]] = Query(None), session: Session = Depends(get_session)):
+    if session.project_id is None:
+        raise HTTPException(status_code=400, detail="No dataset uploaded.")
+    
+    for model_id in model_ids or []:
+        try:
+            ModelSelector.validate(model_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    project_id = session.project_id
+    job_id = job_manager.submit(
+        "screen",
+        "src.trainer:screen_project",
+        project_id,
+        session.target,
+        session.task_type,
+        model_ids,
+        settings.MLFLOW_EXPERIMENT_NAME,
+        metadata={"project_id": project_id, "model_ids": model_ids},
+        on_complete=lambda result: _persist_training_result(project_id, result)
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+@app.post("/cross-validate", status_code=202)
+async def cross_validate_models(
+    model_ids: Optional[List[str]] = Query(None),
+    n_splits: int = Query(5, ge=2, le=20),
+    session: Session = Depends(get_session)
+):
+    if session.project_id is None:
+        raise HTTPException(status_code=400, detail="No dataset uploaded.")
+    
+    for model_id in model_ids or []:
+        try:
+            ModelSelector.validate(model_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    project_id = session.project_id
+    job_id = job_manager.submit(
+        "cross_validate",
+        "src.trainer:cross_validate_project",
+        project_id,
+        session.target,
+        session.task_type,
+        model_ids,
+        n_splits,
+        settings.MLFLOW_EXPERIMENT_NAME,
+        metadata={"project_id": project_id, "model_ids": model_ids, "n_splits": n_splits},
+        on_complete=lambda result: StorageManager.save_json(project_id, result, "cross_validation.json")
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs")
+async def list_jobs():
+    return job_manager.list()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("result", None)
+    return job
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job is still {job['status']}.")
+    if job["status"] == "cancelled":
+        raise HTTPException(status_code=410, detail="Job was cancelled.")
+    if job["status"] == "failed":
+        error = job["error"]
+        if job["error_type"] == "ValueError":
+            if "Unknown label type" in error or "classification" in error.lower():
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Task mismatch error: {error}. This usually happens when you try to use a Classifier on a Regression task (continuous target). Please re-upload and select the correct task type."
+                )
+            raise HTTPException(status_code=500, detail=error)
+        raise HTTPException(status_code=500, detail=f"Training failed: {error}")
+    return job["result"]
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not queued or running.")
+    return {"message": f"Cancellation requested for {job_id}."}
 
 @app.post("/promote")
-async def promote_model(model_id: str, version: int):
+async def promote_model(model_id: str, version: int, background_tasks: BackgroundTasks):
+    model_name = f"Model_{model_id}"
     registry = ModelRegistry()
-    registry.promote_to_production(f"Model_{model_id}", version)
+    registry.promote_to_production(model_name, version)
+    
+    # Drop the stale Production entry and preload the new one off the request path
+    model_cache.invalidate(model_name)
+    background_tasks.add_task(model_cache.warm, model_name, version)
     return {"message": f"Model_{model_id} version {version} promoted to Production."}
 
 @app.post("/predict")
 async def predict(model_id: str, data: dict):
     try:
         predictor = Predictor(f"Model_{model_id}")
-        input_df = pd.DataFrame([data])
-        prediction = predictor.predict(input_df)
+        prediction = predictor.predict_record(data)
         return {"prediction": prediction}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/batch")
+async def predict_batch(
+    request: Request,
+    model_id: str,
+    format: str = "csv",
+    chunk_size: int = settings.BATCH_PREDICT_CHUNK_SIZE,
+    file: Optional[UploadFile] = File(None)
+):
+    if format not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'. Use one of: {', '.join(SUPPORTED_FORMATS)}.")
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive.")
+    
+    predictor = Predictor(f"Model_{model_id}")
+    if predictor.model is None:
+        raise HTTPException(status_code=404, detail=f"No Production model found for '{model_id}'.")
+    
+    if file is not None:
+        source = file.file
+    else:
+        # Spool the raw request body; it only stays in memory while it is small
+        source = tempfile.SpooledTemporaryFile(max_size=settings.BATCH_SPOOL_MAX_MEMORY)
+        async for block in request.stream():
+            source.write(block)
+    source.seek(0)
+    
+    def generate():
+        offset = 0
+        try:
+            for predictions in predictor.predict_batches(iter_batches(source, format, chunk_size)):
+                yield json.dumps({"offset": offset, "predictions": predictions}) + "\n"
+                offset += len(predictions)
+        except Exception as e:
+            # Headers are already sent, so report failures in-band
+            yield json.dumps({"offset": offset, "error": str(e)}) + "\n"
+        finally:
+            source.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
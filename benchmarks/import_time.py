@@ -0,0 +1,80 @@
+"""
+Cold-start benchmark: imports each entry point in a fresh interpreter and fails when it
+is slower than its threshold or loads a library it is not supposed to need.
+
+    python -m benchmarks.import_time [--repeat 5] [--scale 1.0] [--output import_time.json]
+
+--scale multiplies every threshold (slower CI runners).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_LIBRARIES = ["mlflow", "xgboost", "plotly", "sklearn"]
+
+# Entry point -> seconds allowed for the import and heavy libraries it must not load
+TARGETS: Dict[str, Dict[str, Any]] = {
+    "app.main": {"max_seconds": 1.5, "forbidden": HEAVY_LIBRARIES},
+    "pipelines.validation_stage": {"max_seconds": 1.0, "forbidden": HEAVY_LIBRARIES},
+    "pipelines.eda_stage": {"max_seconds": 1.5, "forbidden": ["mlflow", "xgboost", "sklearn"]},
+    "pipelines.preprocessing_stage": {"max_seconds": 3.0, "forbidden": ["mlflow", "xgboost", "plotly"]},
+    "pipelines.training_stage": {"max_seconds": 4.5, "forbidden": ["xgboost", "plotly"]}
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted({{m.split(".")[0] for m in sys.modules}})}}))
+"""
+
+def measure(module: str) -> Dict[str, Any]:
+    """Imports module in a new interpreter; returns the import time and top-level packages loaded."""
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run(repeat: int, scale: float) -> List[Dict[str, Any]]:
+    results = []
+    for module, target in TARGETS.items():
+        # Best of several runs: the minimum is the least noisy estimate of the cost
+        samples = [measure(module) for _ in range(repeat)]
+        seconds = min(s["seconds"] for s in samples)
+        loaded = [lib for lib in target["forbidden"] if lib in samples[0]["modules"]]
+        max_seconds = target["max_seconds"] * scale
+        results.append({
+            "module": module,
+            "seconds": round(seconds, 3),
+            "max_seconds": max_seconds,
+            "forbidden_loaded": loaded,
+            "ok": seconds <= max_seconds and not loaded
+        })
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=float(os.environ.get("IMPORT_TIME_SCALE", 1.0)))
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.scale)
+    for r in results:
+        status = "ok" if r["ok"] else "FAIL"
+        extra = f"  loads {', '.join(r['forbidden_loaded'])}" if r["forbidden_loaded"] else ""
+        print(f"{status:4}  {r['module']:32} {r['seconds']:6.2f}s  (limit {r['max_seconds']:.2f}s){extra}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
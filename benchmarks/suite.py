@@ -0,0 +1,309 @@
+"""
+End-to-end benchmark: upload, validation, EDA, preprocessing, training and prediction
+through the real code paths, on the bundled datasets and on synthetic copies of them
+scaled to more rows and/or extra numeric columns.
+
+    python -m benchmarks.suite                                   # bundled + 10^4 and 10^5 rows
+    python -m benchmarks.suite --rows 1000000 10000000 --datasets heart
+    python -m benchmarks.suite --rows 10000 --extra-cols 500     # wide tables
+    python -m benchmarks.suite --update-baseline                 # accept the current numbers
+
+Every stage runs in a fresh process, so its peak RSS is its own. Results (wall time,
+peak RSS, output size per stage) go to --output and are compared with --baseline; the
+exit code is 1 if any stage regressed beyond --tolerance.
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (file in data/, target, task type)
+DATASETS = {
+    "heart": ("heart_cleveland_upload.csv", "condition", "classification"),
+    "cars": ("car data.csv", "Selling_Price", "regression"),
+    "salaries": ("ds_salaries.csv", "salary_in_usd", "regression"),
+    "experience": ("raw_dataset.csv", "Salary", "regression")
+}
+
+DEFAULT_MODELS = {"classification": "logistic_regression", "regression": "linear_regression"}
+
+STAGES = ["upload", "validate", "eda", "preprocess", "train", "predict"]
+
+# Imported before a stage's timer starts
+STAGE_IMPORTS = {
+    "upload": ["src.ingest", "src.validator"],
+    "validate": ["src.data_loader", "src.validator"],
+    "eda": ["src.data_loader", "src.eda_engine"],
+    "preprocess": ["src.data_loader", "src.preprocessor"],
+    "train": ["mlflow.artifacts", "src.data_loader", "src.trainer", "sklearn.linear_model"],
+    "predict": ["mlflow.sklearn", "mlflow.artifacts", "src.data_loader", "src.predictor", "src.registry"]
+}
+
+# A stage only counts as slower/larger past these absolute margins, so tiny stages don't flap
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_DELTA_MB = 20.0
+
+def scale_frame(df, n_rows: Optional[int], extra_cols: int, seed: int = 42):
+    """Resamples df to n_rows (jittering float columns) and appends extra_cols noise features."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    if n_rows is not None:
+        df = df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+        for col in df.columns:
+            if df[col].dtype.kind == "f":
+                std = df[col].std()
+                if std > 0:
+                    df[col] = df[col] + rng.normal(0.0, 0.01 * std, len(df))
+    if extra_cols:
+        wide = pd.DataFrame(rng.normal(size=(len(df), extra_cols)), columns=[f"wide_{i}" for i in range(extra_cols)])
+        df = pd.concat([wide, df], axis=1)
+    return df
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+def _init_worker(work_dir: str):
+    # Before anything imports src.config, so settings point into the scratch directory
+    os.environ["ARTIFACTS_DIR"] = os.path.join(work_dir, "artifacts")
+    os.environ["MLFLOW_TRACKING_URI"] = "file://" + os.path.join(work_dir, "mlruns")
+    os.makedirs(os.environ["ARTIFACTS_DIR"], exist_ok=True)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+def _prepare(case: Dict[str, Any]) -> Dict[str, Any]:
+    import pandas as pd
+
+    df = pd.read_csv(os.path.join(ROOT, "data", case["file"]))
+    df = scale_frame(df, case["rows"], case["extra_cols"])
+    df.to_csv(case["csv_path"], index=False)
+    return {"rows": len(df), "columns": len(df.columns)}
+
+def _run_stage(stage: str, case: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one stage in the current (fresh) process and measures it."""
+    # Module imports are timed on their own (see benchmarks.import_time), not as stage work
+    import_start = time.perf_counter()
+    for module in STAGE_IMPORTS[stage]:
+        importlib.import_module(module)
+    import_seconds = time.perf_counter() - import_start
+
+    start = time.perf_counter()
+    output_bytes: Optional[int] = None
+    extra: Dict[str, Any] = {}
+    target, task_type = case["target"], case["task_type"]
+
+    if stage == "upload":
+        from src.config import settings
+        from src.ingest import ingest_csv
+        from src.validator import StreamingValidator
+
+        validator = StreamingValidator(target, task_type)
+        with open(case["csv_path"], "rb") as source:
+            ingest_csv(source, case["feather_path"], validator.update, settings.UPLOAD_CHUNK_ROWS)
+        extra["valid"] = validator.validate_dataset()[0]
+        output_bytes = os.path.getsize(case["feather_path"])
+
+    elif stage == "validate":
+        from src.data_loader import load_data
+        from src.validator import DataValidator
+
+        df = load_data(case["feather_path"])
+        is_valid, _ = DataValidator.validate_dataset(df)
+        aligned, _ = DataValidator.validate_task_alignment(df, target, task_type)
+        extra["valid"] = is_valid and DataValidator.check_target_exists(df, target) and aligned
+
+    elif stage == "eda":
+        from src.data_loader import load_data
+        from src.eda_engine import EDAEngine
+
+        report_path = EDAEngine.generate_eda_report(load_data(case["feather_path"]), target)
+        output_bytes = os.path.getsize(report_path)
+
+    elif stage == "preprocess":
+        from src.data_loader import load_data
+        from src.preprocessor import DataPreprocessor
+
+        df = load_data(case["feather_path"])
+        X, y = df.drop(columns=[target]), df[target]
+        Xt = DataPreprocessor().build_pipeline(X, task_type).fit_transform(X, y)
+        if hasattr(Xt, "nnz"):
+            output_bytes = int(Xt.data.nbytes + Xt.indices.nbytes + Xt.indptr.nbytes)
+        else:
+            output_bytes = int(Xt.nbytes)
+        extra["n_features"] = int(Xt.shape[1])
+
+    elif stage == "train":
+        import mlflow.artifacts
+        from src.data_loader import load_data
+        from src.trainer import Trainer
+
+        result = Trainer(experiment_name="benchmark").train(
+            load_data(case["feather_path"]), target, task_type, case["model_id"]
+        )
+        output_bytes = _dir_size(mlflow.artifacts.download_artifacts(result["model_uri"]))
+        extra["metrics"] = result["metrics"]
+        # Handed back to the parent, which passes it on to the predict stage
+        extra["run_id"] = result["run_id"]
+
+    elif stage == "predict":
+        from src.config import settings
+        from src.data_loader import load_data
+        from src.predictor import Predictor
+        from src.registry import ModelRegistry
+
+        model_name = f"Model_{case['model_id']}"
+        registry = ModelRegistry()
+        version = registry.client.search_model_versions(f"run_id='{state['run_id']}'")[0].version
+        registry.promote_to_production(model_name, int(version))
+        # Registry bookkeeping above is setup; loading and scoring is the measured part
+        start = time.perf_counter()
+
+        X = load_data(case["feather_path"]).drop(columns=[target])
+        predictor = Predictor(model_name)
+        n_predictions = 0
+        output_bytes = 0
+        chunk = settings.BATCH_PREDICT_CHUNK_SIZE
+        for predictions in predictor.predict_batches(X.iloc[i:i + chunk] for i in range(0, len(X), chunk)):
+            n_predictions += len(predictions)
+            output_bytes += len(json.dumps(predictions))
+        extra["n_predictions"] = n_predictions
+
+        record = X.iloc[0].to_dict()
+        n_calls = 200
+        single_start = time.perf_counter()
+        for _ in range(n_calls):
+            predictor.predict_record(record)
+        extra["single_row_ms"] = round((time.perf_counter() - single_start) / n_calls * 1000, 3)
+        extra["inference_plan"] = predictor.plan is not None
+
+    return {
+        "seconds": round(time.perf_counter() - start, 4),
+        "import_seconds": round(import_seconds, 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "output_bytes": output_bytes,
+        **extra
+    }
+
+def _in_fresh_process(work_dir: str, fn, *args):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1, initializer=_init_worker, initargs=(work_dir,), maxtasksperchild=1) as pool:
+        return pool.apply(fn, args)
+
+def build_cases(datasets: List[str], rows: List[int], extra_cols: List[int], native: bool) -> List[Dict[str, Any]]:
+    cases = []
+    for name in datasets:
+        file, target, task_type = DATASETS[name]
+        sizes = ([(None, 0)] if native else []) + [(n, c) for n in rows for c in extra_cols]
+        for n_rows, n_extra in sizes:
+            cases.append({
+                "case": f"{name}/{n_rows or 'native'}x+{n_extra}",
+                "dataset": name, "file": file, "target": target, "task_type": task_type,
+                "rows": n_rows, "extra_cols": n_extra,
+                "model_id": DEFAULT_MODELS[task_type]
+            })
+    return cases
+
+def run_cases(cases: List[Dict[str, Any]], work_dir: str) -> List[Dict[str, Any]]:
+    results = []
+    for case in cases:
+        case_dir = os.path.join(work_dir, case["case"].replace("/", "_"))
+        os.makedirs(case_dir, exist_ok=True)
+        case = dict(case, csv_path=os.path.join(case_dir, "data.csv"), feather_path=os.path.join(case_dir, "data.feather"))
+        shape = _in_fresh_process(work_dir, _prepare, case)
+        state: Dict[str, Any] = {}
+        for stage in STAGES:
+            measured = _in_fresh_process(work_dir, _run_stage, stage, case, state)
+            if "run_id" in measured:
+                state["run_id"] = measured.pop("run_id")
+            record = {"case": case["case"], "dataset": case["dataset"], **shape, "stage": stage, **measured}
+            results.append(record)
+            print(
+                f"{case['case']:28} {stage:10} {record['seconds']:9.3f}s {record['peak_rss_mb']:9.1f} MB"
+                f"  {record['output_bytes'] if record['output_bytes'] is not None else '-':>12}",
+                flush=True
+            )
+        shutil.rmtree(case_dir, ignore_errors=True)
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Lists stages that got slower or bigger than the baseline by more than tolerance."""
+    previous = {(r["case"], r["stage"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        base = previous.get((r["case"], r["stage"]))
+        if base is None:
+            continue
+        if r["seconds"] > base["seconds"] * (1 + tolerance) and r["seconds"] - base["seconds"] > MIN_SECONDS_DELTA:
+            regressions.append(f"{r['case']} {r['stage']}: {base['seconds']:.3f}s -> {r['seconds']:.3f}s")
+        if r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance) and r["peak_rss_mb"] - base["peak_rss_mb"] > MIN_RSS_DELTA_MB:
+            regressions.append(f"{r['case']} {r['stage']}: {base['peak_rss_mb']:.1f} MB -> {r['peak_rss_mb']:.1f} MB peak RSS")
+        if r["output_bytes"] and base.get("output_bytes") and r["output_bytes"] > base["output_bytes"] * (1 + tolerance):
+            regressions.append(f"{r['case']} {r['stage']}: output {base['output_bytes']} -> {r['output_bytes']} bytes")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", nargs="+", choices=sorted(DATASETS), default=list(DATASETS))
+    parser.add_argument("--rows", nargs="*", type=int, default=[10_000, 100_000], help="Synthetic row counts")
+    parser.add_argument("--extra-cols", nargs="+", type=int, default=[0], help="Extra numeric columns per synthetic size")
+    parser.add_argument("--no-native", action="store_true", help="Skip the datasets at their bundled size")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown/growth")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--work-dir", help="Scratch directory (default: a temporary one, removed afterwards)")
+    args = parser.parse_args()
+
+    cases = build_cases(args.datasets, args.rows, args.extra_cols, native=not args.no_native)
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="automl-bench-")
+    try:
+        results = run_cases(cases, work_dir)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with; run with --update-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f)["results"], args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION  {line}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -64,6 +64,12 @@ const TrainingPage = () => {
                         <p className="text-gray-400 text-sm mb-8 leading-relaxed">{m.reason}</p>
 
                         <div className="space-y-3 mb-8">
+                            {m.estimated_fit_seconds !== undefined && (
+                                <div className={`flex items-center gap-2 text-xs ${m.over_budget ? 'text-red-400' : 'text-gray-500'}`}>
+                                    <Clock size={14} /> Est. fit: {m.estimated_fit_seconds.toFixed(1)}s · {(m.estimated_peak_memory_bytes / 1024 / 1024).toFixed(0)} MB
+                                    {m.over_budget && ` (over ${m.budget_exceeded.join(' & ')} budget)`}
+                                </div>
+                            )}
                             <div className="flex items-center gap-2 text-xs text-gray-500">
                                 <Settings size={14} /> Hyperparameters: Auto-tuned
                             </div>
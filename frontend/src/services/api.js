@@ -2,8 +2,21 @@ import axios from 'axios';
 
 const API_BASE_URL = 'http://localhost:8000';
 
+// One backend session per browser tab, so concurrent users don't overwrite each other's active project
+const getSessionId = () => {
+    let sessionId = sessionStorage.getItem('sessionId');
+    if (!sessionId) {
+        sessionId = crypto.randomUUID();
+        sessionStorage.setItem('sessionId', sessionId);
+    }
+    return sessionId;
+};
+
 const api = axios.create({
     baseURL: API_BASE_URL,
+    headers: {
+        'X-Session-ID': getSessionId(),
+    },
 });
 
 export const uploadDataset = async (file, taskType, targetColumn) => {
@@ -31,11 +44,35 @@ export const getModelSuggestions = async () => {
     return response.data;
 };
 
-export const trainModel = async (modelId) => {
-    const response = await api.post(`/train?model_id=${modelId}`);
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export const getJob = async (jobId) => {
+    const response = await api.get(`/jobs/${jobId}`);
+    return response.data;
+};
+
+export const cancelJob = async (jobId) => {
+    const response = await api.delete(`/jobs/${jobId}`);
     return response.data;
 };
 
+// Training runs as a background job: submit, poll until it settles, then fetch the result
+export const waitForJob = async (jobId, onProgress, intervalMs = 1000) => {
+    let job = await getJob(jobId);
+    while (job.status === 'queued' || job.status === 'running') {
+        if (onProgress) onProgress(job);
+        await sleep(intervalMs);
+        job = await getJob(jobId);
+    }
+    const response = await api.get(`/jobs/${jobId}/result`);
+    return response.data;
+};
+
+export const trainModel = async (modelId, onProgress) => {
+    const response = await api.post(`/train?model_id=${modelId}`);
+    return waitForJob(response.data.job_id, onProgress);
+};
+
 export const promoteModel = async (modelId, version) => {
     const response = await api.post(`/promote?model_id=${modelId}&version=${version}`);
     return response.data;
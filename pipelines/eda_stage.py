@@ -1,15 +1,15 @@
+import pandas as pd
+from typing import Optional
 from src.eda_engine import EDAEngine
 from src.data_loader import load_data
 from src.config import settings
-import os
+from pipelines.params import target_column
 
-def run_eda():
-    data_path = os.path.join(settings.DATA_DIR, "raw_dataset.csv")
-    df = load_data(data_path)
+def run_eda(df: Optional[pd.DataFrame] = None) -> str:
+    if df is None:
+        df = load_data(settings.RAW_DATASET_PATH)
     
-    # Assuming target is the last column if not specified elsewhere
-    target = df.columns[-1]
-    EDAEngine.generate_eda_report(df, target)
+    return EDAEngine.generate_eda_report(df, target_column(df))
 
 if __name__ == "__main__":
     run_eda()
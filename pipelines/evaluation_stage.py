@@ -0,0 +1,26 @@
+import json
+import joblib
+import pandas as pd
+from typing import Any, Dict, Optional
+from src.trainer import Trainer
+from src.data_loader import load_data, split_features
+from src.config import settings
+from pipelines.params import TASK_TYPE, MODEL_PATH, METRICS_PATH, target_column
+import os
+
+def run_evaluation(df: Optional[pd.DataFrame] = None, model: Optional[Any] = None) -> Dict[str, float]:
+    """Scores the trained pipeline on the held-out split and writes the DVC metrics file."""
+    if df is None:
+        df = load_data(settings.RAW_DATASET_PATH)
+    if model is None:
+        model = joblib.load(os.path.join(settings.BASE_DIR, MODEL_PATH))
+    
+    _, X_test, _, y_test = split_features(df, target_column(df))
+    metrics = Trainer.evaluate(TASK_TYPE, y_test, model.predict(X_test))
+    
+    with open(os.path.join(settings.BASE_DIR, METRICS_PATH), "w") as f:
+        json.dump(metrics, f, indent=4)
+    return metrics
+
+if __name__ == "__main__":
+    run_evaluation()
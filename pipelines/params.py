@@ -0,0 +1,14 @@
+"""Settings shared by the DVC stages; listed as a dependency of every stage that reads them."""
+import pandas as pd
+
+TASK_TYPE = "classification"
+MODEL_ID = "logistic_regression"
+
+# Stage outputs that later stages read back when they run as separate processes
+PREPROCESSOR_PATH = "models/preprocessor.joblib"
+MODEL_PATH = "models/latest_model.pkl"
+METRICS_PATH = "artifacts/metrics.json"
+
+def target_column(df: pd.DataFrame) -> str:
+    # The target is assumed to be the last column
+    return df.columns[-1]
@@ -1,18 +1,23 @@
 import pandas as pd
+from typing import Any, Optional
 from src.preprocessor import DataPreprocessor
-from src.data_loader import load_data
+from src.data_loader import load_data, split_features
 from src.config import settings
+from pipelines.params import TASK_TYPE, PREPROCESSOR_PATH, target_column
 import os
 
-def run_preprocessing():
-    data_path = os.path.join(settings.DATA_DIR, "raw_dataset.csv")
-    df = load_data(data_path)
+def run_preprocessing(df: Optional[pd.DataFrame] = None) -> Any:
+    """Fits the preprocessing on the training split and saves it; returns the fitted ColumnTransformer."""
+    if df is None:
+        df = load_data(settings.RAW_DATASET_PATH)
     
+    # Same split as the training stage, so the fit never sees its test rows
+    X_train, _, y_train, _ = split_features(df, target_column(df))
     preprocessor = DataPreprocessor()
-    preprocessor.build_pipeline(df.drop(columns=[df.columns[-1]])) # Dummy target assumption for stage
+    preprocessor.build_pipeline(X_train, TASK_TYPE).fit(X_train, y_train)
     
-    save_path = os.path.join(settings.MODELS_DIR, "preprocessor.joblib")
-    preprocessor.save(save_path)
+    preprocessor.save(os.path.join(settings.BASE_DIR, PREPROCESSOR_PATH))
+    return preprocessor.preprocessor
 
 if __name__ == "__main__":
     run_preprocessing()
@@ -0,0 +1,233 @@
+"""
+Runs the stages of dvc.yaml in one process: the dataset is loaded once and shared,
+independent stages (EDA and preprocessing) run concurrently, and the fitted
+preprocessor and model are handed to the next stage in memory.
+
+    python -m pipelines.run_pipeline [--force] [--max-workers 2] [stage ...]
+
+A stage is skipped when its command and the content hashes of its dependencies and
+outputs match dvc.lock. The lock file is written in DVC's own format, so this runner
+and `dvc repro` / `dvc status` agree on what is up to date.
+"""
+import argparse
+import hashlib
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import yaml
+
+from src.config import settings
+
+ROOT = settings.BASE_DIR
+LOCK_PATH = os.path.join(ROOT, "dvc.lock")
+
+# Stage -> in-process entry point; other stages run their dvc.yaml cmd in a subprocess
+STAGE_FUNCTIONS = {
+    "data_validation": "pipelines.validation_stage:run_validation",
+    "preprocessing": "pipelines.preprocessing_stage:run_preprocessing",
+    "eda": "pipelines.eda_stage:run_eda",
+    "training": "pipelines.training_stage:run_training",
+    "evaluation": "pipelines.evaluation_stage:run_evaluation"
+}
+
+# Stage -> {keyword argument: upstream stage whose return value it receives}
+IN_MEMORY_INPUTS = {
+    "training": {"preprocessor": "preprocessing"},
+    "evaluation": {"model": "training"}
+}
+
+def load_stages(dvc_path: str = settings.DVC_PATH) -> Dict[str, Dict[str, Any]]:
+    """Reads the stages of dvc.yaml as {name: {cmd, deps, outs}}; metrics and plots count as outputs."""
+    with open(dvc_path) as f:
+        spec = yaml.safe_load(f) or {}
+    stages = {}
+    for name, stage in (spec.get("stages") or {}).items():
+        outs = []
+        for key in ("outs", "metrics", "plots"):
+            # Entries are paths, or {path: options}
+            outs.extend(next(iter(o)) if isinstance(o, dict) else o for o in stage.get(key) or [])
+        stages[name] = {"cmd": stage["cmd"], "deps": list(stage.get("deps") or []), "outs": outs}
+    return stages
+
+def upstream_stages(stages: Dict[str, Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """Stage -> stages producing one of its dependencies."""
+    producers = {out: name for name, stage in stages.items() for out in stage["outs"]}
+    return {
+        name: {producers[dep] for dep in stage["deps"] if dep in producers and producers[dep] != name}
+        for name, stage in stages.items()
+    }
+
+class FileHasher:
+    """md5 of file contents (DVC's "hash: md5"), cached per run by size and mtime."""
+
+    def __init__(self):
+        self._cache: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def entry(self, path: str) -> Optional[Dict[str, Any]]:
+        full_path = os.path.join(ROOT, path)
+        try:
+            stat = os.stat(full_path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is None or cached[0] != key:
+            digest = hashlib.md5()
+            with open(full_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            cached = (key, digest.hexdigest())
+            with self._lock:
+                self._cache[path] = cached
+        return {"path": path, "hash": "md5", "md5": cached[1], "size": stat.st_size}
+
+class PipelineRunner:
+    def __init__(self, stages: Dict[str, Dict[str, Any]], max_workers: int = 2, force: bool = False):
+        self.stages = stages
+        self.upstream = upstream_stages(stages)
+        self.max_workers = max_workers
+        self.force = force
+        self.hasher = FileHasher()
+        self.lock_data = self._read_lock()
+        self.results: Dict[str, Any] = {}
+        self._df = None
+        self._df_lock = threading.Lock()
+        self._lock_file_lock = threading.Lock()
+
+    def dataset(self):
+        """The raw dataset, loaded by the first stage that needs it and shared by the rest."""
+        with self._df_lock:
+            if self._df is None:
+                from src.data_loader import load_data
+                self._df = load_data(settings.RAW_DATASET_PATH)
+            return self._df
+
+    def is_up_to_date(self, name: str) -> bool:
+        locked = self.lock_data.get("stages", {}).get(name)
+        stage = self.stages[name]
+        if self.force or not locked or locked.get("cmd") != stage["cmd"]:
+            return False
+        for key in ("deps", "outs"):
+            recorded = {e["path"]: e.get("md5") for e in locked.get(key) or []}
+            if set(recorded) != set(stage[key]):
+                return False
+            for path in stage[key]:
+                current = self.hasher.entry(path)
+                if current is None or current["md5"] != recorded[path]:
+                    return False
+        return True
+
+    def run(self, targets: Optional[List[str]] = None) -> Dict[str, str]:
+        """Runs the targets (default: every stage) and their upstream stages; returns stage -> status."""
+        selected = self._with_upstream(targets or list(self.stages))
+        status: Dict[str, str] = {}
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                for name in selected:
+                    if name in status or name in running.values():
+                        continue
+                    upstream = self.upstream[name] & selected
+                    if any(status.get(u) in ("failed", "blocked") for u in upstream):
+                        status[name] = "blocked"
+                    elif all(status.get(u) in ("ran", "skipped") for u in upstream):
+                        # Decided only once upstream is done: its outputs are this stage's inputs
+                        if self.is_up_to_date(name):
+                            status[name] = "skipped"
+                            print(f"skip  {name} (unchanged)")
+                        else:
+                            print(f"start {name}")
+                            running[executor.submit(self._run_stage, name)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        seconds = future.result()
+                        status[name] = "ran"
+                        print(f"done  {name} ({seconds:.2f}s)")
+                    except Exception as e:
+                        status[name] = "failed"
+                        print(f"FAIL  {name}: {type(e).__name__}: {e}")
+        for name in selected:
+            status.setdefault(name, "blocked")
+        return status
+
+    def _run_stage(self, name: str) -> float:
+        start = time.perf_counter()
+        stage = self.stages[name]
+        if name in STAGE_FUNCTIONS:
+            kwargs = {
+                arg: self.results[upstream]
+                for arg, upstream in IN_MEMORY_INPUTS.get(name, {}).items()
+                if upstream in self.results
+            }
+            self.results[name] = _resolve(STAGE_FUNCTIONS[name])(df=self.dataset(), **kwargs)
+        else:
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+            subprocess.run(stage["cmd"], shell=True, cwd=ROOT, env=env, check=True)
+
+        missing = [out for out in stage["outs"] if self.hasher.entry(out) is None]
+        if missing:
+            raise RuntimeError(f"Stage did not produce {', '.join(missing)}")
+        self._record(name)
+        return time.perf_counter() - start
+
+    def _record(self, name: str):
+        stage = self.stages[name]
+        entry = {
+            "cmd": stage["cmd"],
+            "deps": [self.hasher.entry(dep) for dep in stage["deps"]],
+            "outs": [self.hasher.entry(out) for out in stage["outs"]]
+        }
+        with self._lock_file_lock:
+            self.lock_data.setdefault("schema", "2.0")
+            self.lock_data.setdefault("stages", {})[name] = entry
+            tmp_path = f"{LOCK_PATH}.tmp{os.getpid()}"
+            with open(tmp_path, "w") as f:
+                yaml.safe_dump(self.lock_data, f, sort_keys=False)
+            os.replace(tmp_path, LOCK_PATH)
+
+    def _read_lock(self) -> Dict[str, Any]:
+        if not os.path.exists(LOCK_PATH):
+            return {}
+        with open(LOCK_PATH) as f:
+            return yaml.safe_load(f) or {}
+
+    def _with_upstream(self, targets: List[str]) -> Set[str]:
+        unknown = [t for t in targets if t not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+        selected, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.upstream[name])
+        return selected
+
+def _resolve(target: str) -> Callable:
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("stages", nargs="*", help="Stages to bring up to date (default: all)")
+    parser.add_argument("--force", action="store_true", help="Run the stages even if they are up to date")
+    parser.add_argument("--max-workers", type=int, default=2, help="Stages run at the same time")
+    args = parser.parse_args()
+
+    status = PipelineRunner(load_stages(), max_workers=args.max_workers, force=args.force).run(args.stages)
+    return 0 if all(s in ("ran", "skipped") for s in status.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,27 @@
+import joblib
+import pandas as pd
+from typing import Any, Optional
 from src.trainer import Trainer
+from src.preprocessor import DataPreprocessor
 from src.data_loader import load_data
 from src.config import settings
+from pipelines.params import TASK_TYPE, MODEL_ID, PREPROCESSOR_PATH, MODEL_PATH, target_column
 import os
-import yaml
 
-def run_training():
-    data_path = os.path.join(settings.DATA_DIR, "raw_dataset.csv")
-    df = load_data(data_path)
-    
-    # Load params (simplified for DVC example)
-    target = df.columns[-1]
-    task_type = "classification" # Default
-    model_id = "logistic_regression" # Default
+def run_training(df: Optional[pd.DataFrame] = None, preprocessor: Optional[Any] = None) -> Any:
+    """Trains on the preprocessing stage's fitted preprocessor; returns the fitted pipeline."""
+    if df is None:
+        df = load_data(settings.RAW_DATASET_PATH)
+    if preprocessor is None:
+        preprocessor = DataPreprocessor.load(os.path.join(settings.BASE_DIR, PREPROCESSOR_PATH))
     
     trainer = Trainer(experiment_name=settings.MLFLOW_EXPERIMENT_NAME)
-    trainer.train(df, target, task_type, model_id)
+    result = trainer.train(df, target_column(df), TASK_TYPE, MODEL_ID, preprocessor=preprocessor, return_pipeline=True)
+    
+    # The pipeline just fitted, rather than a round-trip through the MLflow artifact
+    model = result["pipeline"]
+    joblib.dump(model, os.path.join(settings.BASE_DIR, MODEL_PATH))
+    return model
 
 if __name__ == "__main__":
     run_training()
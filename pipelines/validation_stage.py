@@ -1,16 +1,19 @@
 import pandas as pd
+from typing import Optional
 from src.validator import DataValidator
 from src.data_loader import load_data
 from src.config import settings
 import os
 
-def run_validation():
-    data_path = os.path.join(settings.DATA_DIR, "raw_dataset.csv")
-    if not os.path.exists(data_path):
-        print(f"Data not found at {data_path}")
-        return
+def run_validation(df: Optional[pd.DataFrame] = None):
+    data_path = settings.RAW_DATASET_PATH
+    if df is None:
+        try:
+            df = load_data(data_path)
+        except FileNotFoundError:
+            print(f"Data not found at {data_path}")
+            return
 
-    df = load_data(data_path)
     is_valid, errors = DataValidator.validate_dataset(df)
     
     status_path = os.path.join(settings.ARTIFACTS_DIR, "val_status.txt")
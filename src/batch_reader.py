@@ -0,0 +1,40 @@
+import codecs
+from typing import BinaryIO, Iterator
+
+import pandas as pd
+
+SUPPORTED_FORMATS = ("csv", "ndjson", "arrow")
+
+def iter_batches(fileobj: BinaryIO, fmt: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yields DataFrames of at most chunk_size rows from a CSV, NDJSON or Arrow IPC stream."""
+    if fmt == "csv":
+        yield from pd.read_csv(fileobj, chunksize=chunk_size)
+    elif fmt == "ndjson":
+        # codecs' reader only needs read(); TextIOWrapper also wants readable(), which
+        # SpooledTemporaryFile (uploads, spooled request bodies) lacks before Python 3.11
+        text = codecs.getreader("utf-8")(fileobj)
+        # Keep JSON types as sent; inferring dtypes per chunk makes chunks disagree
+        yield from pd.read_json(text, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False)
+    elif fmt == "arrow":
+        yield from _iter_arrow_batches(fileobj, chunk_size)
+    else:
+        raise ValueError(f"Unsupported batch format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}.")
+
+def _iter_arrow_batches(fileobj: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("Arrow input requires the 'pyarrow' package.")
+
+    # The IPC file format starts with a magic header; anything else is read as a stream
+    magic = fileobj.read(6)
+    fileobj.seek(0)
+    if magic == b"ARROW1":
+        reader = pa.ipc.open_file(fileobj)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = pa.ipc.open_stream(fileobj)
+
+    for batch in batches:
+        for offset in range(0, batch.num_rows, chunk_size):
+            yield batch.slice(offset, chunk_size).to_pandas()
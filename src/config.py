@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,11 +13,72 @@ class Settings(BaseSettings):
     ARTIFACTS_DIR: str = os.path.join(BASE_DIR, "artifacts")
     STORAGE_DIR: str = os.path.join(BASE_DIR, "storage")
     PROJECTS_DIR: str = os.path.join(STORAGE_DIR, "projects")
+    RAW_DATASET_PATH: str = os.path.join(DATA_DIR, "raw_dataset.feather")
+    
+    # Uploads
+    MAX_UPLOAD_BYTES: int = 2 * 1024 * 1024 * 1024
+    UPLOAD_CHUNK_ROWS: int = 100000
+    
+    # Sessions
+    MAX_SESSIONS: int = 1000
+    FRAME_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    # Downcast numbers and turn repetitive strings into categories when frames are loaded
+    OPTIMIZE_DTYPES: bool = True
+    CATEGORY_MAX_RATIO: float = 0.5
+    
+    # EDA
+    EDA_HISTOGRAM_BINS: int = 50
+    EDA_MAX_POINTS: int = 500
+    EDA_MAX_CATEGORIES: int = 30
+    EDA_CACHE_MAX_ENTRIES: int = 16
     
     # MLflow
     MLFLOW_TRACKING_URI: str = "http://localhost:5000"
     MLFLOW_EXPERIMENT_NAME: str = "One_Click_ML_Experiment"
     
+    # Categorical encoding: one-hot up to this many distinct values, then HIGH_CARDINALITY_ENCODING
+    # ("target" = cross-fitted target encoding, "grouped" = one-hot of the most frequent values)
+    ONEHOT_MAX_CATEGORIES: int = 50
+    HIGH_CARDINALITY_ENCODING: str = "target"
+    # Encoded features stay sparse below this share of non-zero values (scikit-learn's default);
+    # denser outputs are made dense, since tree models are slower on CSR input
+    SPARSE_OUTPUT_MAX_DENSITY: float = 0.3
+    # XGBoost models split on categorical columns natively instead of getting the encoding above
+    XGBOOST_NATIVE_CATEGORICAL: bool = True
+    
+    # Model cache (/predict)
+    MODEL_CACHE_MAX_ENTRIES: int = 8
+    MODEL_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+    MODEL_CACHE_RESOLVE_TTL: float = 5.0
+    # Serve linear pipelines through their exported NumPy inference plan when available
+    INFERENCE_PLAN_ENABLED: bool = True
+    # Load models from their memory-mapped joblib artifact, copied once to this directory and shared by all workers
+    MAPPED_MODELS_ENABLED: bool = True
+    MAPPED_MODELS_DIR: str = os.path.join(MODELS_DIR, "mapped")
+    
+    # Background training jobs
+    TRAINING_MAX_WORKERS: int = 2
+    TRAINING_MAX_CPUS: Optional[int] = None  # None = all CPUs available to the process
+    TUNING_DEFAULT_BUDGET_SECONDS: float = 300.0
+    # Finished jobs (and their results) are forgotten after this long, or beyond this many
+    JOB_RETENTION_SECONDS: float = 24 * 3600
+    JOB_RETENTION_MAX: int = 200
+    # Model suggestions whose estimated fit exceeds these budgets are flagged and left out of leaderboards
+    SUGGESTION_TIME_BUDGET_SECONDS: float = 1800.0
+    SUGGESTION_MEMORY_BUDGET_BYTES: Optional[int] = None  # None = physical memory of the machine
+    # Training jobs refit the cost model from MLflow at most this often
+    COST_MODEL_CALIBRATION_INTERVAL_SECONDS: float = 3600.0
+    # Streaming training (/train-streaming): rows per partial_fit batch and passes over the data
+    STREAMING_BATCH_ROWS: int = 50000
+    STREAMING_EPOCHS: int = 3
+    
+    # Batch prediction (/predict/batch)
+    BATCH_PREDICT_CHUNK_SIZE: int = 10000
+    BATCH_SPOOL_MAX_MEMORY: int = 16 * 1024 * 1024
+    
+    # Observability (/metrics): also report per-stage durations in a Server-Timing response header
+    SERVER_TIMING_HEADERS: bool = False
+    
     # DVC
     DVC_PATH: str = os.path.join(BASE_DIR, "dvc.yaml")
     
@@ -0,0 +1,248 @@
+import json
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.config import settings
+from src.dataset_profile import DatasetProfile
+
+# Share of the rows models are fitted on (split_features holds out 20%)
+TRAIN_FRACTION = 0.8
+# Seconds per work unit fitted from past runs, per model
+CALIBRATION_PATH = os.path.join(settings.ARTIFACTS_DIR, "cost_model.json")
+# Most recent runs per model used for calibration
+CALIBRATION_RUNS = 50
+
+class DataShape:
+    """Shape of the matrix a model is fitted on: rows, encoded width, stored values per row, classes."""
+
+    def __init__(self, rows: int, width: int, nnz_per_row: float, n_classes: int = 1, sparse: bool = False):
+        self.rows = max(int(rows), 1)
+        self.width = max(int(width), 1)
+        self.nnz_per_row = max(float(nnz_per_row), 1.0)
+        self.n_classes = max(int(n_classes), 1)
+        self.sparse = sparse
+
+    @property
+    def outputs(self) -> int:
+        # Binary and regression models fit one function, multiclass ones one per class
+        return self.n_classes if self.n_classes > 2 else 1
+
+    def matrix_bytes(self, itemsize: int = 8) -> float:
+        if self.sparse:
+            # CSR values and int32 column indices, plus row pointers
+            return self.rows * (self.nnz_per_row * (itemsize + 4) + 4)
+        return self.rows * self.width * itemsize
+
+    @classmethod
+    def from_profile(
+        cls, profile: DatasetProfile, target: Optional[str], task_type: str, native_categorical: bool = False
+    ) -> "DataShape":
+        """Predicts the width and sparsity DataPreprocessor's encoding gives the profiled dataset."""
+        target_column = profile.column(target) if target else None
+        n_classes = target_column["distinct"] if target_column and task_type == "classification" else 1
+        max_categories = settings.ONEHOT_MAX_CATEGORIES
+        width, nnz, sparse = 0, 0, False
+        for column in profile.data["columns"]:
+            if column["name"] == target:
+                continue
+            if column["kind"] == "numeric":
+                width += 1
+                nnz += 1
+            elif column["kind"] == "categorical" and native_categorical:
+                width += 1
+                nnz += 1
+            elif column["kind"] == "categorical":
+                # Missing values are imputed as their own "missing" category
+                categories = column["distinct"] + (1 if column["null_count"] else 0)
+                if categories <= max_categories:
+                    width += categories
+                    nnz += 1
+                    sparse = True
+                elif settings.HIGH_CARDINALITY_ENCODING == "target":
+                    encoded = n_classes if n_classes > 2 else 1
+                    width += encoded
+                    nnz += encoded
+                else:
+                    width += max_categories
+                    nnz += 1
+                    sparse = True
+            # Boolean and datetime columns are not encoded, so the model never sees them
+        # ColumnTransformer only keeps sparse output below its density threshold
+        sparse = sparse and nnz / max(width, 1) < settings.SPARSE_OUTPUT_MAX_DENSITY
+        return cls(profile.n_rows * TRAIN_FRACTION, width, nnz, n_classes, sparse)
+
+    @classmethod
+    def from_matrix(cls, X: Any, n_classes: int = 1) -> "DataShape":
+        rows, width = X.shape
+        sparse = hasattr(X, "nnz")
+        nnz_per_row = X.nnz / max(rows, 1) if sparse else width
+        return cls(rows, width, nnz_per_row, n_classes, sparse)
+
+    def to_metrics(self) -> Dict[str, float]:
+        """Logged with every training run so its duration can calibrate the cost model."""
+        return {
+            "train_rows": self.rows,
+            "train_width": self.width,
+            "train_nnz_per_row": self.nnz_per_row,
+            "train_classes": self.n_classes,
+            "train_sparse": float(self.sparse)
+        }
+
+    @classmethod
+    def from_metrics(cls, values: Dict[str, float]) -> "DataShape":
+        return cls(
+            values["train_rows"], values["train_width"], values["train_nnz_per_row"],
+            int(values.get("train_classes") or 1), bool(values.get("train_sparse"))
+        )
+
+def _trees(n_estimators: int, features: Callable[[DataShape], float]) -> Callable[[DataShape], float]:
+    # Fully grown trees sort every bootstrap sample at each level they reach, over the sampled features
+    return lambda s: n_estimators * s.rows * math.log2(s.rows + 1) * features(s)
+
+def _forest_memory(n_estimators: int) -> Callable[[DataShape], float]:
+    # float32 copy of X, plus about 1.26 nodes per row (fully grown on 63% unique bootstrap rows) per tree,
+    # each a 64-byte node and its per-class values
+    return lambda s: s.matrix_bytes(4) + n_estimators * 1.26 * s.rows * (64 + 8 * s.n_classes)
+
+def _boosting_units(s: DataShape) -> float:
+    # Histogram boosting rounds are linear in the stored values; early stopping typically ends near 100 rounds
+    return 100 * s.rows * s.nnz_per_row * s.outputs
+
+def _boosting_memory(s: DataShape) -> float:
+    # float32 copy, one quantized bin byte per stored value, gradient pairs per output
+    return s.matrix_bytes(4) + s.rows * s.nnz_per_row + 16 * s.rows * s.outputs
+
+# model_id -> (work units of one fit, peak bytes of one fit) for the models' default settings
+COST_FUNCTIONS: Dict[str, tuple] = {
+    "logistic_regression": (
+        lambda s: s.rows * s.nnz_per_row * s.outputs,
+        lambda s: s.matrix_bytes() + 3 * 8 * s.rows * s.outputs
+    ),
+    "sgd_classifier": (
+        lambda s: s.rows * s.nnz_per_row * s.outputs,
+        lambda s: s.matrix_bytes()
+    ),
+    "random_forest_classifier": (
+        _trees(100, lambda s: math.sqrt(s.width)),
+        _forest_memory(100)
+    ),
+    "xgboost_classifier": (
+        _boosting_units,
+        _boosting_memory
+    ),
+    "linear_regression": (
+        lambda s: s.rows * s.nnz_per_row * s.width,
+        lambda s: 2 * s.matrix_bytes()
+    ),
+    "sgd_regressor": (
+        lambda s: s.rows * s.nnz_per_row,
+        lambda s: s.matrix_bytes()
+    ),
+    "random_forest_regressor": (
+        _trees(100, lambda s: s.width),
+        _forest_memory(100)
+    ),
+    "gradient_boosting_regressor": (
+        _trees(100, lambda s: s.width),
+        lambda s: s.matrix_bytes(4) + 4 * 8 * s.rows
+    ),
+    "xgboost_regressor": (
+        _boosting_units,
+        _boosting_memory
+    )
+}
+
+# Seconds per work unit on a single core, measured with the default settings above;
+# replaced by the median of past runs once the model has some
+DEFAULT_COEFFICIENTS: Dict[str, float] = {
+    "logistic_regression": 1.5e-7,
+    "sgd_classifier": 4e-7,
+    "random_forest_classifier": 1.4e-7,
+    "xgboost_classifier": 3e-8,
+    "linear_regression": 2e-9,
+    "sgd_regressor": 8e-8,
+    "random_forest_regressor": 1.6e-7,
+    "gradient_boosting_regressor": 8e-9,
+    "xgboost_regressor": 3e-8
+}
+
+class CostModel:
+    """
+    Predicts the fit time and peak memory of each model on a dataset of a given shape.
+    Time is work units (from the model's complexity in rows, encoded width and sparsity)
+    times seconds per unit, calibrated from the fit times and shapes of past MLflow runs.
+    """
+
+    def __init__(self, coefficients: Optional[Dict[str, float]] = None):
+        self.coefficients = dict(DEFAULT_COEFFICIENTS)
+        self.coefficients.update(coefficients or {})
+
+    @classmethod
+    def load(cls) -> "CostModel":
+        """The cost model with the last calibration, or with the default coefficients if there is none."""
+        if not os.path.exists(CALIBRATION_PATH):
+            return cls()
+        with open(CALIBRATION_PATH) as f:
+            return cls(json.load(f).get("coefficients"))
+
+    def estimate(self, model_id: str, shape: DataShape) -> Dict[str, float]:
+        if model_id not in COST_FUNCTIONS:
+            raise ValueError(f"Model ID '{model_id}' has no cost model.")
+        units, memory = COST_FUNCTIONS[model_id]
+        return {
+            "fit_seconds": self.coefficients[model_id] * units(shape),
+            "peak_memory_bytes": memory(shape)
+        }
+
+    @staticmethod
+    def calibrate() -> Dict[str, float]:
+        """
+        Refits the seconds per work unit of every model from the fit_time (else duration) of its
+        most recent MLflow runs that logged their training shape, and stores them for load().
+        """
+        import mlflow
+
+        coefficients: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for model_id, (units, _) in COST_FUNCTIONS.items():
+            # One bounded query per model, newest first, rather than a scan of the whole run history
+            runs = mlflow.search_runs(
+                search_all_experiments=True,
+                filter_string=f"params.model_id = '{model_id}' and metrics.train_rows > 0",
+                order_by=["attributes.start_time DESC"],
+                max_results=CALIBRATION_RUNS
+            )
+            ratios = []
+            for _, run in runs.iterrows():
+                seconds = run.get("metrics.fit_time")
+                if seconds is None or math.isnan(seconds):
+                    seconds = run.get("metrics.duration")
+                if seconds is None or math.isnan(seconds):
+                    continue
+                shape = DataShape.from_metrics({
+                    key[len("metrics."):]: value for key, value in run.items()
+                    if key.startswith("metrics.train_") and not math.isnan(value)
+                })
+                ratios.append(seconds / units(shape))
+            if ratios:
+                # Median, so that a run slowed down by a busy machine doesn't skew it
+                coefficients[model_id] = float(sorted(ratios)[len(ratios) // 2])
+                counts[model_id] = len(ratios)
+
+        tmp_path = f"{CALIBRATION_PATH}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump({"coefficients": coefficients, "runs": counts, "calibrated_at": time.time()}, f, indent=4)
+        os.replace(tmp_path, CALIBRATION_PATH)
+        return coefficients
+
+    @staticmethod
+    def calibrate_if_stale(max_age_seconds: float) -> Optional[Dict[str, float]]:
+        """Recalibrates when the stored calibration is missing or older than max_age_seconds."""
+        if os.path.exists(CALIBRATION_PATH):
+            with open(CALIBRATION_PATH) as f:
+                calibrated_at = json.load(f).get("calibrated_at", 0.0)
+            if time.time() - calibrated_at < max_age_seconds:
+                return None
+        return CostModel.calibrate()
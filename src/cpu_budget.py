@@ -0,0 +1,31 @@
+import os
+from typing import Any, Optional, Tuple
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity / container cpusets)."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+def physical_memory() -> Optional[int]:
+    """Total physical memory in bytes, or None where the platform doesn't report it."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def split_cpu_budget(n_tasks: int, max_cpus: Optional[int] = None) -> Tuple[int, int]:
+    """Splits a CPU budget into (parallel tasks, threads per task) so their product never exceeds it."""
+    budget = min(max_cpus or available_cpus(), available_cpus())
+    outer = max(1, min(n_tasks, budget))
+    inner = max(1, budget // outer)
+    return outer, inner
+
+def limit_model_threads(model: Any, n_threads: int) -> Any:
+    """Pins an estimator's internal thread pool (n_jobs / nthread) to n_threads."""
+    params = model.get_params()
+    updates = {name: n_threads for name in ("n_jobs", "nthread") if name in params}
+    if updates:
+        model.set_params(**updates)
+    return model
@@ -1,15 +1,91 @@
 import pandas as pd
 import os
+from typing import List, Optional
 from src.config import settings
 
-def load_data(file_path: str) -> pd.DataFrame:
-    """Loads CSV data into a DataFrame."""
+COLUMNAR_EXTENSIONS = (".feather", ".arrow")
+
+def load_data(file_path: str, columns: Optional[List[str]] = None, optimize: bool = False) -> pd.DataFrame:
+    """Loads CSV, Parquet or Feather data into a DataFrame, optionally only some columns.
+
+    A missing Feather file is created from a CSV file of the same name, if one exists.
+    With optimize=True the dtypes are compacted (see optimize_dtypes) and the savings
+    report is kept in df.attrs["memory_optimization"].
+    """
+    if not os.path.exists(file_path) and file_path.endswith(COLUMNAR_EXTENSIONS):
+        legacy_path = os.path.splitext(file_path)[0] + ".csv"
+        if os.path.exists(legacy_path):
+            migrate_csv(legacy_path, file_path)
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    return pd.read_csv(file_path)
+    df = read_frame(file_path, columns)
+    return compact_frame(df) if optimize else df
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Applies optimize_dtypes and attaches its report to the frame."""
+    from src.memory_optimizer import optimize_dtypes
+    df, report = optimize_dtypes(df, category_max_ratio=settings.CATEGORY_MAX_RATIO)
+    df.attrs["memory_optimization"] = report
+    return df
+
+def split_features(df: pd.DataFrame, target: str, test_size: float = 0.2, random_state: int = 42):
+    """Splits into X_train, X_test, y_train, y_test; shared by training and the DVC preprocessing stage."""
+    from sklearn.model_selection import train_test_split
+    X = df.drop(columns=[target])
+    y = df[target]
+    return train_test_split(X, y, test_size=test_size, random_state=random_state)
 
 def save_data(df: pd.DataFrame, filename: str) -> str:
     """Saves DataFrame to the data directory."""
     path = os.path.join(settings.DATA_DIR, filename)
-    df.to_csv(path, index=False)
+    write_frame(df, path)
     return path
+
+def read_frame(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Reads a frame in the format given by the file extension.
+
+    Feather files are memory-mapped, so columns are only paged in when touched and
+    numeric columns without nulls are not copied.
+    """
+    if path.endswith(COLUMNAR_EXTENSIONS):
+        from pyarrow import feather
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+def write_frame(df: pd.DataFrame, path: str):
+    """Writes a frame in the format given by the file extension, atomically."""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    if path.endswith(COLUMNAR_EXTENSIONS):
+        from pyarrow import feather
+        # Uncompressed so that reads can memory-map the buffers directly
+        feather.write_feather(_to_arrow(df), tmp_path, compression="uncompressed")
+    elif path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def migrate_csv(csv_path: str, target_path: str, remove_source: bool = False):
+    """Converts a CSV file to the columnar format of target_path."""
+    write_frame(pd.read_csv(csv_path), target_path)
+    if remove_source:
+        try:
+            os.remove(csv_path)
+        except FileNotFoundError:
+            # Another request migrated it first
+            pass
+
+def _to_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Object columns that mix strings and numbers (e.g. from chunked CSV parsing) are stored as strings
+        mixed = {
+            col: df[col].where(df[col].isna(), df[col].astype(str))
+            for col in df.columns if df[col].dtype == object
+        }
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
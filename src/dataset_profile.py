@@ -0,0 +1,286 @@
+import hashlib
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PROFILE_FILE = "profile.json"
+# Bump whenever the profile contents change so stored profiles are rebuilt
+PROFILE_VERSION = 2
+
+# Distinct values are counted exactly (as 64-bit hashes) up to this many per column, then estimated
+# with HyperLogLog; wide datasets share DISTINCT_MEMORY_BUDGET bytes of hashes across their columns
+EXACT_DISTINCT_LIMIT = 100_000
+MIN_EXACT_DISTINCT_LIMIT = 1_000
+DISTINCT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Duplicate rows are counted from row hashes (8 bytes per row) up to this many rows; past it they are not reported
+MAX_ROWS_FOR_DUPLICATES = 10_000_000
+
+class HyperLogLog:
+    """Cardinality sketch over 64-bit hashes; relative error about 1.04 / sqrt(2 ** precision)."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray):
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # A sentinel bit below the remaining bits bounds the rank
+        rest = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        np.maximum.at(self.registers, index, _leading_zeros(rest) + 1)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    count = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (x >> np.uint64(64 - shift)) == 0
+        count[empty] += shift
+        x = np.where(empty, x << np.uint64(shift), x)
+    return count
+
+class _DistinctCounter:
+    """Exact distinct count of hashed values until limit, then a HyperLogLog estimate."""
+
+    def __init__(self, limit: int = EXACT_DISTINCT_LIMIT):
+        self.limit = limit
+        self.hashes: Optional[np.ndarray] = np.zeros(0, dtype=np.uint64)
+        self.sketch: Optional[HyperLogLog] = None
+
+    def add(self, hashes: np.ndarray):
+        if self.sketch is not None:
+            self.sketch.add(hashes)
+            return
+        self.hashes = _unique(np.concatenate([self.hashes, hashes]))
+        if len(self.hashes) > self.limit:
+            self.sketch = HyperLogLog()
+            self.sketch.add(self.hashes)
+            self.hashes = None
+
+    @property
+    def exact(self) -> bool:
+        return self.sketch is None
+
+    def count(self) -> int:
+        return len(self.hashes) if self.sketch is None else self.sketch.estimate()
+
+class _ColumnState:
+    def __init__(self, name: str, dtype: Any, distinct_limit: int = EXACT_DISTINCT_LIMIT):
+        self.name = name
+        self.dtype = str(dtype)
+        self.kind = _kind(dtype)
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.distinct = _DistinctCounter(distinct_limit)
+        # Content digest; columns with equal digests hold identical values
+        self.digest = hashlib.blake2b(digest_size=16)
+
+class DatasetProfile:
+    """
+    Per-column statistics of a dataset (dtype, nulls, cardinality, min/max/mean/std,
+    constant and duplicate flags) plus row-level counts, computed once at upload and
+    stored with the project as profile.json.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._columns = {c["name"]: c for c in data["columns"]}
+
+    @property
+    def n_rows(self) -> int:
+        return self.data["n_rows"]
+
+    @property
+    def n_columns(self) -> int:
+        return self.data["n_columns"]
+
+    @property
+    def column_names(self) -> List[str]:
+        return [c["name"] for c in self.data["columns"]]
+
+    def column(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._columns.get(name)
+
+    def columns_of_kind(self, kind: str) -> List[str]:
+        return [c["name"] for c in self.data["columns"] if c["kind"] == kind]
+
+    def null_counts(self) -> pd.Series:
+        return pd.Series({c["name"]: c["null_count"] for c in self.data["columns"]}, dtype=np.int64)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.data
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, chunk_rows: int = 100_000) -> "DatasetProfile":
+        profiler = DatasetProfiler()
+        for start in range(0, len(df), chunk_rows):
+            profiler.update(df.iloc[start:start + chunk_rows])
+        if len(df) == 0:
+            profiler.update(df)
+        return profiler.result()
+
+    @classmethod
+    def for_project(cls, project_id: str, df: Optional[pd.DataFrame] = None) -> Optional["DatasetProfile"]:
+        """The project's stored profile; projects uploaded before profiles existed get one built and saved now."""
+        from src.storage_manager import StorageManager
+
+        path = StorageManager.ensure_dataset(project_id)
+        if path is None:
+            return None
+        size = os.path.getsize(path)
+        data = StorageManager.load_json(project_id, PROFILE_FILE)
+        if data and data.get("version") == PROFILE_VERSION and data.get("dataset_size") == size:
+            return cls(data)
+
+        if df is None:
+            df = StorageManager.load_dataset(project_id)
+        profile = cls.from_frame(df)
+        profile.save(project_id)
+        return profile
+
+    def save(self, project_id: str):
+        """Stores the profile with the project, tagged with the size of the dataset file it describes."""
+        from src.storage_manager import StorageManager
+
+        self.data["dataset_size"] = os.path.getsize(StorageManager.get_dataset_path(project_id))
+        StorageManager.save_json(project_id, self.data, PROFILE_FILE)
+
+class DatasetProfiler:
+    """Builds a DatasetProfile from a dataset fed chunk by chunk, in one pass; each chunk is processed column-vectorized."""
+
+    def __init__(self):
+        self.n_rows = 0
+        self.columns: List[_ColumnState] = []
+        self.row_hashes: Optional[List[np.ndarray]] = []
+
+    def update(self, chunk: pd.DataFrame):
+        if not self.columns:
+            limit = max(MIN_EXACT_DISTINCT_LIMIT, min(EXACT_DISTINCT_LIMIT, DISTINCT_MEMORY_BUDGET // (8 * max(len(chunk.columns), 1))))
+            self.columns = [_ColumnState(str(name), dtype, limit) for name, dtype in zip(chunk.columns, chunk.dtypes)]
+        self.n_rows += len(chunk)
+        if len(chunk) == 0:
+            return
+
+        # Moments and ranges for every numeric column of the chunk at once
+        numeric = [i for i, state in enumerate(self.columns) if state.kind == "numeric" and _kind(chunk.dtypes.iloc[i]) == "numeric"]
+        if numeric:
+            values = chunk.iloc[:, numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(values)
+            counts = present.sum(axis=0)
+            sums = np.where(present, values, 0.0).sum(axis=0)
+            means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+            m2s = np.where(present, (values - means) ** 2, 0.0).sum(axis=0)
+            mins = np.where(present, values, np.inf).min(axis=0)
+            maxs = np.where(present, values, -np.inf).max(axis=0)
+            for j, i in enumerate(numeric):
+                self._merge_moments(self.columns[i], int(counts[j]), float(means[j]), float(m2s[j]))
+                self.columns[i].min = min(self.columns[i].min, float(mins[j]))
+                self.columns[i].max = max(self.columns[i].max, float(maxs[j]))
+
+        nulls = chunk.isna().sum(axis=0).to_numpy()
+        for i, state in enumerate(self.columns):
+            series = chunk.iloc[:, i]
+            if state.kind == "numeric" and i not in numeric:
+                # Parsed as text in this chunk: the column is not numeric after all
+                state.kind = "categorical"
+            state.nulls += int(nulls[i])
+            state.count += len(series) - int(nulls[i]) if i not in numeric else 0
+            hashes = pd.util.hash_array(_canonical(series))
+            state.digest.update(hashes.tobytes())
+            state.distinct.add(hashes[series.notna().to_numpy()])
+
+        if self.row_hashes is not None:
+            if self.n_rows > MAX_ROWS_FOR_DUPLICATES:
+                self.row_hashes = None
+            else:
+                canonical = pd.DataFrame({i: _canonical(chunk.iloc[:, i]) for i in range(chunk.shape[1])}, index=chunk.index)
+                self.row_hashes.append(pd.util.hash_pandas_object(canonical, index=False).to_numpy())
+
+    @staticmethod
+    def _merge_moments(state: _ColumnState, count: int, mean: float, m2: float):
+        # Chan et al. pairwise update of the running mean and sum of squared deviations
+        total = state.count + count
+        if count == 0:
+            return
+        delta = mean - state.mean
+        state.mean += delta * count / total
+        state.m2 += m2 + delta * delta * state.count * count / total
+        state.count = total
+
+    def result(self) -> DatasetProfile:
+        seen_digests: Dict[str, str] = {}
+        columns = []
+        for state in self.columns:
+            digest = state.digest.hexdigest()
+            numeric = state.kind == "numeric" and state.count > 0
+            distinct = state.distinct.count()
+            columns.append({
+                "name": state.name,
+                "dtype": state.dtype,
+                "kind": state.kind,
+                "count": state.count,
+                "null_count": state.nulls,
+                "distinct": distinct,
+                "distinct_exact": state.distinct.exact,
+                "min": _finite(state.min) if numeric else None,
+                "max": _finite(state.max) if numeric else None,
+                "mean": _finite(state.mean) if numeric else None,
+                "std": _finite(math.sqrt(state.m2 / (state.count - 1))) if numeric and state.count > 1 else None,
+                "constant": distinct <= 1,
+                "duplicate_of": seen_digests.get(digest) if self.n_rows else None
+            })
+            seen_digests.setdefault(digest, state.name)
+
+        names = pd.Index([c["name"] for c in columns])
+        duplicate_rows = None
+        if self.row_hashes is not None:
+            distinct_rows = len(_unique(np.concatenate(self.row_hashes))) if self.row_hashes else 0
+            duplicate_rows = self.n_rows - distinct_rows
+        return DatasetProfile({
+            "version": PROFILE_VERSION,
+            "n_rows": self.n_rows,
+            "n_columns": len(columns),
+            "duplicate_column_names": sorted(set(names[names.duplicated()])),
+            # None when the dataset is too large to count them
+            "duplicate_rows": duplicate_rows,
+            "columns": columns
+        })
+
+def _canonical(series: pd.Series) -> np.ndarray:
+    # Numbers hash as float64 whatever their dtype, so a column widened from int64 mid-ingest
+    # keeps counting the same values once; + 0.0 folds -0.0 into 0.0
+    if _kind(series.dtype) == "numeric":
+        return series.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+    return series.to_numpy()
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    # Sort-based; much faster than np.unique's hash table on millions of distinct 64-bit values
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+def _kind(dtype: Any) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "categorical"
+
+def _finite(value: float) -> Optional[float]:
+    return value if math.isfinite(value) else None
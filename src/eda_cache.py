@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+from src.config import settings
+from src.storage_manager import StorageManager
+from src.dataset_profile import DatasetProfile
+
+class EDACache:
+    """
+    Caches EDA reports per project, keyed by the dataset's content hash, the target
+    column and the engine version. Hits are served from memory or the project's eda.json.
+    """
+
+    REPORT_FILE = "eda.json"
+    META_FILE = "eda_meta.json"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(project_id: str, target: str) -> Optional[str]:
+        # Imported on first use: the engine pulls in plotly
+        from src.eda_engine import EDAEngine
+
+        fingerprint = StorageManager.dataset_fingerprint(project_id)
+        if fingerprint is None:
+            return None
+        raw = f"{fingerprint}|{target}|{EDAEngine.ENGINE_VERSION}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get_or_build(
+        self, project_id: str, load_df: Callable[[], Optional[pd.DataFrame]], target: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The project's EDA report. load_df is only called on a miss, so a cached report costs a
+        file read at most. None if the project has no dataset.
+        """
+        from src.eda_engine import EDAEngine
+
+        key = self.cache_key(project_id, target)
+        if key is None:
+            df = load_df()
+            return EDAEngine.build_eda_report(df, target) if df is not None else None
+
+        report = self._lookup(project_id, key)
+        if report is not None:
+            return report
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same report wait for a single build
+        try:
+            with build_lock:
+                report = self._lookup(project_id, key)
+                if report is not None:
+                    return report
+                df = load_df()
+                if df is None:
+                    return None
+                with self._lock:
+                    self.misses += 1
+
+                report = EDAEngine.build_eda_report(df, target, DatasetProfile.for_project(project_id, df))
+                StorageManager.save_json(project_id, report, self.REPORT_FILE)
+                StorageManager.save_json(project_id, {"cache_key": key, "engine_version": EDAEngine.ENGINE_VERSION}, self.META_FILE)
+                self._remember(key, report)
+        finally:
+            # Also after a failed build, so the lock entry doesn't outlive it
+            with self._lock:
+                self._build_locks.pop(key, None)
+        return report
+
+    def _lookup(self, project_id: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._reports:
+                self._reports.move_to_end(key)
+                self.hits += 1
+                return self._reports[key]
+
+        meta = StorageManager.load_json(project_id, self.META_FILE)
+        if not meta or meta.get("cache_key") != key:
+            return None
+        report = StorageManager.load_json(project_id, self.REPORT_FILE)
+        if report is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        self._remember(key, report)
+        return report
+
+    def _remember(self, key: str, report: Dict[str, Any]):
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.max_entries:
+                self._reports.popitem(last=False)
+
+eda_cache = EDACache(max_entries=settings.EDA_CACHE_MAX_ENTRIES)
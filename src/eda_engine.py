@@ -1,29 +1,64 @@
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import json
 import os
+from typing import Any, Dict, Optional
 from src.config import settings
+from src.metrics import metrics
+from src.dataset_profile import DatasetProfile
 
 class EDAEngine:
+    # Bump whenever the report contents change so cached reports are rebuilt
+    ENGINE_VERSION = 3
+
     @staticmethod
     def generate_eda_report(df: pd.DataFrame, target: str) -> str:
+        """
+        Generates the EDA report and saves it to the shared artifacts directory (DVC stage output).
+        """
+        report = EDAEngine.build_eda_report(df, target)
+
+        # Save to artifacts
+        report_path = os.path.join(settings.ARTIFACTS_DIR, "eda_report.json")
+        with open(report_path, "w") as f:
+            json.dump(report, f)
+
+        return report_path
+
+    @staticmethod
+    def build_eda_report(df: pd.DataFrame, target: str, profile: Optional[DatasetProfile] = None) -> Dict[str, Any]:
         """
         Generates a series of Plotly figures and returns them as a dashboard JSON.
+        Null counts, column kinds and cardinalities come from the dataset profile when one is given.
         """
+        with metrics.timer("eda_build"):
+            return EDAEngine._build_figures(df, target, profile)
+
+    @staticmethod
+    def _build_figures(df: pd.DataFrame, target: str, profile: Optional[DatasetProfile]) -> Dict[str, Any]:
         report = {}
+        if profile is not None:
+            null_counts = profile.null_counts()
+            numeric_columns = [c for c in profile.columns_of_kind("numeric") if c in df.columns]
+            target_column = profile.column(target)
+            target_distinct = target_column["distinct"] if target_column else None
+        else:
+            null_counts = df.isnull().sum()
+            numeric_columns = list(df.select_dtypes(include=["number"]).columns)
+            target_distinct = df[target].nunique() if target in df.columns else None
 
         # 1. Missing Values Heatmap
-        null_counts = df.isnull().sum()
         fig_nulls = px.bar(
             x=null_counts.index, 
             y=null_counts.values, 
             title="Missing Values per Column"
         )
-        report["missing_values"] = json.loads(fig_nulls.to_json())
+        report["missing_values"] = EDAEngine._to_dict(fig_nulls)
 
         # 2. Correlation Matrix
-        numeric_df = df.select_dtypes(include=["number"])
+        numeric_df = df[numeric_columns]
         if not numeric_df.empty:
             corr_matrix = numeric_df.corr()
             fig_corr = px.imshow(
@@ -31,27 +66,106 @@ class EDAEngine:
                 text_auto=True, 
                 title="Correlation Matrix"
             )
-            report["correlation_matrix"] = json.loads(fig_corr.to_json())
+            report["correlation_matrix"] = EDAEngine._to_dict(fig_corr)
 
         # 3. Target Distribution
+        # Figures only carry bins, counts and quantiles, so their size doesn't grow with the row count
         if target in df.columns:
-            if df[target].nunique() < 20: # Likely categorical
-                fig_target = px.histogram(df, x=target, title=f"Target Distribution: {target}")
+            numeric_target = pd.api.types.is_numeric_dtype(df[target]) and not pd.api.types.is_bool_dtype(df[target])
+            if target_distinct < 20 or not numeric_target: # Likely categorical
+                fig_target = EDAEngine._bar_of_counts(df[target], title=f"Target Distribution: {target}")
             else: # Likely continuous
-                fig_target = px.box(df, y=target, title=f"Target Distribution: {target}")
-            report["target_distribution"] = json.loads(fig_target.to_json())
+                fig_target = EDAEngine._box_from_quantiles(df[target], title=f"Target Distribution: {target}")
+            report["target_distribution"] = EDAEngine._to_dict(fig_target)
 
         # 4. Feature Distributions (Top 5 features)
         features = [col for col in numeric_df.columns if col != target][:5]
         feature_plots = {}
         for feature in features:
-            fig = px.histogram(df, x=feature, title=f"Distribution of {feature}")
-            feature_plots[feature] = json.loads(fig.to_json())
+            fig = EDAEngine._histogram(df[feature], title=f"Distribution of {feature}")
+            feature_plots[feature] = EDAEngine._to_dict(fig)
         report["feature_distributions"] = feature_plots
 
-        # Save to artifacts
-        report_path = os.path.join(settings.ARTIFACTS_DIR, "eda_report.json")
-        with open(report_path, "w") as f:
-            json.dump(report, f)
+        return report
 
-        return report_path
+    @staticmethod
+    def _to_dict(fig: go.Figure) -> Dict[str, Any]:
+        # Serialization is timed on its own: it is often the larger share of the build
+        with metrics.timer("eda_serialize"):
+            return json.loads(fig.to_json())
+
+    @staticmethod
+    def _histogram(series: pd.Series, title: str, bins: Optional[int] = None) -> go.Figure:
+        """Bins a numeric column server-side and plots the counts as bars."""
+        values = series.dropna().to_numpy(dtype=np.float64)
+        values = values[np.isfinite(values)]
+        bins = bins or settings.EDA_HISTOGRAM_BINS
+        if values.size == 0:
+            return go.Figure(layout={"title": {"text": title}})
+
+        # Integer-valued columns with few distinct values get one bar per value
+        lo, hi = values.min(), values.max()
+        if hi - lo < bins and np.all(np.mod(values, 1) == 0):
+            edges = np.arange(lo - 0.5, hi + 1.5)
+        else:
+            edges = np.histogram_bin_edges(values, bins=bins, range=(lo, hi) if hi > lo else (lo - 0.5, hi + 0.5))
+        counts, edges = np.histogram(values, bins=edges)
+
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            name=series.name
+        ))
+        fig.update_layout(title=title, xaxis_title=str(series.name), yaxis_title="count", bargap=0)
+        return fig
+
+    @staticmethod
+    def _bar_of_counts(series: pd.Series, title: str, top: Optional[int] = None) -> go.Figure:
+        """Counts per value; with many distinct values only the most frequent ones are plotted."""
+        top = top or settings.EDA_MAX_CATEGORIES
+        counts = series.value_counts(dropna=True)
+        if len(counts) > top:
+            counts = counts.head(top)
+            title = f"{title} (top {top})"
+        else:
+            counts = counts.sort_index()
+        fig = go.Figure(go.Bar(x=counts.index.astype(str), y=counts.values, name=series.name))
+        fig.update_layout(title=title, xaxis_title=str(series.name), yaxis_title="count")
+        return fig
+
+    @staticmethod
+    def _box_from_quantiles(series: pd.Series, title: str) -> go.Figure:
+        """Box plot from precomputed quartiles and fences, with a bounded sample of outlier points."""
+        values = series.dropna().to_numpy(dtype=np.float64)
+        if values.size == 0:
+            return go.Figure(layout={"title": {"text": title}})
+
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+
+        fig = go.Figure(go.Box(
+            q1=[q1], median=[median], q3=[q3],
+            lowerfence=[inside.min()], upperfence=[inside.max()],
+            mean=[values.mean()],
+            name=str(series.name),
+            boxpoints=False
+        ))
+        if outliers.size:
+            sample = EDAEngine.sample_values(outliers, settings.EDA_MAX_POINTS)
+            fig.add_trace(go.Scatter(
+                x=[str(series.name)] * sample.size, y=sample,
+                mode="markers", name="outliers (sampled)" if sample.size < outliers.size else "outliers"
+            ))
+        fig.update_layout(title=title, showlegend=False)
+        return fig
+
+    @staticmethod
+    def sample_values(values: np.ndarray, k: int, seed: int = 42) -> np.ndarray:
+        """Uniform sample of at most k values without replacement."""
+        if values.size <= k:
+            return values
+        rng = np.random.default_rng(seed)
+        return values[rng.choice(values.size, size=k, replace=False)]
@@ -1,16 +1,73 @@
 import os
 import json
+import base64
+import sqlite3
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from src.config import settings
 
 class HistoryManager:
-    """Manages the index.json file for tracking past projects."""
-    
+    """Manages the project history index, stored in SQLite (WAL mode) for safe concurrent writers."""
+
+    DB_FILE = os.path.join(settings.STORAGE_DIR, "history.db")
+    # Legacy index, imported once into the database
     INDEX_FILE = os.path.join(settings.STORAGE_DIR, "index.json")
 
+    _local = threading.local()
+    _initialized = False
+    _init_lock = threading.Lock()
+
     @classmethod
-    def _load_index(cls) -> List[Dict[str, Any]]:
+    def _connect(cls) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(cls._local, "conn", None)
+        if conn is None or getattr(cls._local, "db_file", None) != cls.DB_FILE:
+            conn = sqlite3.connect(cls.DB_FILE, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            cls._local.conn = conn
+            cls._local.db_file = cls.DB_FILE
+        if not cls._initialized:
+            with cls._init_lock:
+                if not cls._initialized:
+                    cls._init_db(conn)
+                    cls._initialized = True
+        return conn
+
+    @classmethod
+    def _init_db(cls, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS projects (
+                project_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_recent ON projects (timestamp DESC, project_id DESC)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        # BEGIN IMMEDIATE takes the write lock, so only one worker performs the import
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'json_index_imported'").fetchone()
+            if imported is None:
+                for entry in cls._load_json_index():
+                    # Skip entries whose project folder was already deleted from disk
+                    if os.path.exists(os.path.join(settings.PROJECTS_DIR, entry['project_id'])):
+                        cls._upsert(conn, entry, keep_existing=True)
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('json_index_imported', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @classmethod
+    def _load_json_index(cls) -> List[Dict[str, Any]]:
         if not os.path.exists(cls.INDEX_FILE):
             return []
         try:
@@ -19,57 +76,78 @@ class HistoryManager:
         except (json.JSONDecodeError, IOError):
             return []
 
-    @classmethod
-    def _save_index(cls, index_data: List[Dict[str, Any]]):
-        with open(cls.INDEX_FILE, 'w') as f:
-            json.dump(index_data, f, indent=4)
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, entry: Dict[str, Any], keep_existing: bool = False):
+        metadata = {k: v for k, v in entry.items() if k not in ("project_id", "timestamp")}
+        conflict = "NOTHING" if keep_existing else "UPDATE SET timestamp = excluded.timestamp, metadata = excluded.metadata"
+        conn.execute(
+            f"INSERT INTO projects (project_id, timestamp, metadata) VALUES (?, ?, ?) "
+            f"ON CONFLICT(project_id) DO {conflict}",
+            (entry['project_id'], entry['timestamp'], json.dumps(metadata))
+        )
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        return {"project_id": row["project_id"], "timestamp": row["timestamp"], **json.loads(row["metadata"])}
+
+    @staticmethod
+    def _encode_cursor(entry: Dict[str, Any]) -> str:
+        raw = f"{entry['timestamp']}|{entry['project_id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        try:
+            timestamp, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        except Exception:
+            raise ValueError("Invalid cursor.")
+        return timestamp, project_id
 
     @classmethod
     def add_project(cls, project_id: str, metadata: Dict[str, Any]):
-        index = cls._load_index()
-        
-        # Check if project already exists, if so update it
-        existing_idx = next((i for i, p in enumerate(index) if p['project_id'] == project_id), -1)
-        
+        # Metadata fetched from the index carries its original timestamp, so updates keep their position
         project_entry = {
             "project_id": project_id,
             "timestamp": datetime.now().isoformat(),
             **metadata
         }
-        
-        if existing_idx > -1:
-            index[existing_idx] = project_entry
-        else:
-            index.insert(0, project_entry) # Add to top like ChatGPT
-            
-        cls._save_index(index)
+        cls._upsert(cls._connect(), project_entry)
 
     @classmethod
     def get_all_projects(cls) -> List[Dict[str, Any]]:
-        # Filter out projects that might have been deleted from disk but are still in index
-        index = cls._load_index()
-        valid_projects = []
-        changed = False
-        
-        for p in index:
-            proj_path = os.path.join(settings.PROJECTS_DIR, p['project_id'])
-            if os.path.exists(proj_path):
-                valid_projects.append(p)
-            else:
-                changed = True
-        
-        if changed:
-            cls._save_index(valid_projects)
-            
-        return valid_projects
+        rows = cls._connect().execute(
+            "SELECT * FROM projects ORDER BY timestamp DESC, project_id DESC"
+        ).fetchall()
+        return [cls._row_to_entry(row) for row in rows]
+
+    @classmethod
+    def list_projects(cls, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Returns one page of projects, newest first, and the cursor for the next page (None at the end)."""
+        conn = cls._connect()
+        if cursor:
+            timestamp, project_id = cls._decode_cursor(cursor)
+            rows = conn.execute(
+                "SELECT * FROM projects WHERE (timestamp, project_id) < (?, ?) "
+                "ORDER BY timestamp DESC, project_id DESC LIMIT ?",
+                (timestamp, project_id, limit + 1)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM projects ORDER BY timestamp DESC, project_id DESC LIMIT ?",
+                (limit + 1,)
+            ).fetchall()
+
+        entries = [cls._row_to_entry(row) for row in rows[:limit]]
+        next_cursor = cls._encode_cursor(entries[-1]) if len(rows) > limit else None
+        return entries, next_cursor
 
     @classmethod
     def get_project_metadata(cls, project_id: str) -> Optional[Dict[str, Any]]:
-        index = cls._load_index()
-        return next((p for p in index if p['project_id'] == project_id), None)
+        row = cls._connect().execute(
+            "SELECT * FROM projects WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        return cls._row_to_entry(row) if row else None
 
     @classmethod
     def remove_project(cls, project_id: str):
-        index = cls._load_index()
-        new_index = [p for p in index if p['project_id'] != project_id]
-        cls._save_index(new_index)
+        cls._connect().execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
@@ -0,0 +1,219 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Artifact name of the plan inside the training run
+ARTIFACT_NAME = "inference_plan.npz"
+
+class InferencePlan:
+    """
+    A fitted DataPreprocessor + linear model pipeline flattened into NumPy arrays.
+
+    Imputation medians, scaler statistics and the linear coefficients are folded into
+    one weight matrix for the numeric columns, and every one-hot category maps to its
+    row of coefficients, so a prediction is a few lookups and one matrix product with
+    no pandas or sklearn dispatch. Built with from_pipeline(), which returns None for
+    pipelines it cannot represent (non-linear models, target encoding, ...).
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        numeric_columns: List[str],
+        numeric_fill: np.ndarray,
+        numeric_weights: np.ndarray,
+        intercept: np.ndarray,
+        categorical: List[Tuple[str, np.ndarray, np.ndarray]],
+        classes: Optional[np.ndarray] = None
+    ):
+        self.kind = kind
+        self.numeric_columns = numeric_columns
+        self.numeric_fill = numeric_fill
+        self.numeric_weights = numeric_weights
+        self.intercept = intercept
+        # (column, sorted category strings, one weight row per category)
+        self.categorical = categorical
+        self.classes = classes
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Any) -> Optional["InferencePlan"]:
+        from sklearn.linear_model import LinearRegression, LogisticRegression, SGDClassifier, SGDRegressor
+
+        steps = getattr(pipeline, "named_steps", {})
+        preprocessor, model = steps.get("preprocessor"), steps.get("model")
+        if not isinstance(model, (LinearRegression, LogisticRegression, SGDClassifier, SGDRegressor)):
+            return None
+        if not hasattr(preprocessor, "transformers_"):
+            return None
+
+        coef = np.atleast_2d(np.asarray(model.coef_, dtype=np.float64))
+        if coef.shape[0] != 1 and isinstance(model, (LinearRegression, SGDRegressor)):
+            return None
+        # One weight column per output: 1 for regression and binary, n_classes otherwise
+        weights = coef.T
+        intercept = np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))
+
+        numeric_columns, numeric_fill, numeric_weights = [], np.zeros(0), np.zeros((0, weights.shape[1]))
+        categorical = []
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            columns = list(columns)
+            if transformer == "drop" or not columns:
+                continue
+            if name == "num":
+                imputer, scaler = transformer.named_steps["imputer"], transformer.named_steps["scaler"]
+                mean = scaler.mean_ if scaler.with_mean else np.zeros(len(columns))
+                scale = scaler.scale_ if scaler.with_std else np.ones(len(columns))
+                block = weights[offset:offset + len(columns)] / scale[:, None]
+                # (x - mean) / scale . w == x . (w / scale) - mean . (w / scale)
+                intercept = intercept - mean @ block
+                numeric_columns, numeric_fill, numeric_weights = columns, imputer.statistics_.astype(np.float64), block
+                offset += len(columns)
+            elif name == "cat":
+                imputer, encoder = transformer.named_steps["imputer"], transformer.named_steps["onehot"]
+                if encoder.handle_unknown != "ignore" or encoder.drop is not None or imputer.fill_value != "missing":
+                    return None
+                for column, categories in zip(columns, encoder.categories_):
+                    values = np.asarray([str(c) for c in categories])
+                    block = weights[offset:offset + len(values)]
+                    order = np.argsort(values)
+                    categorical.append((str(column), values[order], block[order]))
+                    offset += len(values)
+            else:
+                return None
+        if offset != weights.shape[0]:
+            return None
+
+        is_classifier = hasattr(model, "classes_")
+        return cls(
+            kind="classifier" if is_classifier else "regressor",
+            numeric_columns=[str(c) for c in numeric_columns],
+            numeric_fill=numeric_fill,
+            numeric_weights=numeric_weights,
+            intercept=intercept,
+            categorical=categorical,
+            classes=np.asarray(model.classes_) if is_classifier else None
+        )
+
+    def predict(self, records: Any) -> np.ndarray:
+        """Scores a DataFrame, a pyarrow RecordBatch/Table, a list of row dicts or a dict of columns/scalars."""
+        n_rows, column = _column_reader(records)
+        scores = np.broadcast_to(self.intercept, (n_rows, len(self.intercept))).copy()
+
+        if self.numeric_columns:
+            values = np.empty((n_rows, len(self.numeric_columns)))
+            for j, name in enumerate(self.numeric_columns):
+                values[:, j] = column(name, np.float64)
+            values = np.where(np.isnan(values), self.numeric_fill, values)
+            scores += values @ self.numeric_weights
+
+        for name, vocabulary, weights in self.categorical:
+            raw = column(name, object)
+            # Only NaN is imputed as "missing"; SimpleImputer leaves None as a category of its own
+            missing = np.fromiter((isinstance(v, float) and v != v for v in raw), dtype=bool, count=len(raw))
+            keys = np.where(missing, "missing", raw).astype(str)
+            index = np.minimum(np.searchsorted(vocabulary, keys), len(vocabulary) - 1)
+            # Unknown categories contribute nothing, as with handle_unknown='ignore'
+            found = vocabulary[index] == keys
+            scores[found] += weights[index[found]]
+
+        if self.kind == "regressor":
+            return scores[:, 0]
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[np.argmax(scores, axis=1)]
+
+    def matches(self, pipeline: Any, X: pd.DataFrame, rtol: float = 1e-6) -> bool:
+        """Parity check: the plan must reproduce pipeline.predict on X."""
+        return self.same_predictions(self.predict(X), pipeline.predict(X), regression=self.kind == "regressor", rtol=rtol)
+
+    @staticmethod
+    def same_predictions(actual: Any, expected: Any, regression: bool, rtol: float = 1e-6) -> bool:
+        """Labels must match exactly; regression outputs up to float rounding."""
+        actual, expected = np.asarray(actual), np.asarray(expected)
+        if regression:
+            return bool(np.allclose(actual, expected, rtol=rtol, atol=1e-8 * max(1.0, float(np.abs(expected).max(initial=0.0)))))
+        return bool(np.array_equal(actual, expected))
+
+    def save(self, path: str):
+        arrays: Dict[str, np.ndarray] = {
+            "kind": np.asarray(self.kind),
+            "numeric_columns": np.asarray(self.numeric_columns, dtype=str),
+            "numeric_fill": self.numeric_fill,
+            "numeric_weights": self.numeric_weights,
+            "intercept": self.intercept,
+            "categorical_columns": np.asarray([c for c, _, _ in self.categorical], dtype=str)
+        }
+        for i, (_, vocabulary, weights) in enumerate(self.categorical):
+            arrays[f"vocabulary_{i}"] = vocabulary
+            arrays[f"weights_{i}"] = weights
+        if self.classes is not None:
+            classes = self.classes
+            arrays["classes"] = classes.astype(str) if classes.dtype == object else classes
+        # Plain arrays only, so loading never unpickles anything
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "InferencePlan":
+        with np.load(path, allow_pickle=False) as data:
+            categorical = [
+                (str(column), data[f"vocabulary_{i}"], data[f"weights_{i}"])
+                for i, column in enumerate(data["categorical_columns"])
+            ]
+            return cls(
+                kind=str(data["kind"]),
+                numeric_columns=[str(c) for c in data["numeric_columns"]],
+                numeric_fill=data["numeric_fill"],
+                numeric_weights=data["numeric_weights"],
+                intercept=data["intercept"],
+                categorical=categorical,
+                classes=data["classes"] if "classes" in data else None
+            )
+
+def _column_reader(records: Any):
+    """Returns (row count, fn(column, dtype) -> 1-D array) for the supported record layouts."""
+    if isinstance(records, pd.DataFrame):
+        def column(name, dtype):
+            if name not in records.columns:
+                return np.full(len(records), np.nan if dtype is np.float64 else None, dtype=dtype)
+            values = records[name]
+            if dtype is np.float64:
+                if pd.api.types.is_numeric_dtype(values):
+                    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+                return pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            return values.to_numpy(dtype=object)
+        return len(records), column
+
+    if hasattr(records, "column_names") and hasattr(records, "num_rows"):
+        # pyarrow RecordBatch / Table
+        names = set(records.column_names)
+        def column(name, dtype):
+            if name not in names:
+                return np.full(records.num_rows, np.nan if dtype is np.float64 else None, dtype=dtype)
+            values = np.asarray(records.column(name).to_pylist(), dtype=object)
+            return _as(values, dtype)
+        return records.num_rows, column
+
+    if isinstance(records, dict):
+        n_rows = next((len(v) for v in records.values() if isinstance(v, (list, tuple, np.ndarray))), 1)
+        def column(name, dtype):
+            value = records.get(name)
+            values = np.asarray(value if isinstance(value, (list, tuple, np.ndarray)) else [value] * n_rows, dtype=object)
+            return _as(values, dtype)
+        return n_rows, column
+
+    rows = list(records)
+    def column(name, dtype):
+        return _as(np.asarray([row.get(name) for row in rows], dtype=object), dtype)
+    return len(rows), column
+
+def _as(values: np.ndarray, dtype) -> np.ndarray:
+    if dtype is np.float64:
+        try:
+            # None becomes NaN
+            return values.astype(np.float64)
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return values
@@ -0,0 +1,102 @@
+import os
+from typing import Any, BinaryIO, Callable, Tuple
+
+import pandas as pd
+
+def ingest_csv(
+    source: BinaryIO,
+    dest_path: str,
+    on_chunk: Callable[[pd.DataFrame], None],
+    chunk_rows: int
+) -> int:
+    """
+    Parses a CSV stream chunk by chunk straight into a Feather file at dest_path.
+
+    Only one chunk is held in memory at a time. on_chunk sees every chunk (e.g. for
+    incremental validation). The column types are fixed by the first chunk; if a later
+    chunk does not fit them (an integer column that turns out to have nulls, a numeric
+    column with text further down) the conflicting columns are widened to float64 or
+    string and the batches already written are rewritten one at a time.
+    Returns the number of rows written.
+    """
+    import pyarrow as pa
+
+    tmp_path = f"{dest_path}.tmp{os.getpid()}"
+    writer = None
+    schema = None
+    n_rows = 0
+    rewrites = 0
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunk_rows):
+            on_chunk(chunk)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pa.ipc.new_file(tmp_path, schema)
+            elif not table.schema.equals(schema):
+                widened = _widen(schema, table.schema)
+                if not widened.equals(schema):
+                    writer.close()
+                    rewrites += 1
+                    writer, tmp_path = _rewrite(tmp_path, f"{dest_path}.tmp{os.getpid()}.{rewrites}", widened)
+                    schema = widened
+                table = table.cast(schema)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    except pd.errors.EmptyDataError:
+        # No header at all; the validator reports the empty dataset
+        return 0
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if os.path.exists(tmp_path):
+        os.replace(tmp_path, dest_path)
+    return n_rows
+
+def _widen(schema: Any, other: Any) -> Any:
+    """The narrowest schema both can be cast to: float64 for mixed numbers, string for anything else."""
+    import pyarrow as pa
+
+    fields = []
+    for field, incoming in zip(schema, other):
+        if field.type == incoming.type or pa.types.is_null(incoming.type):
+            fields.append(field)
+        elif pa.types.is_null(field.type):
+            fields.append(field.with_type(incoming.type))
+        elif _is_number(field.type) and _is_number(incoming.type):
+            fields.append(field.with_type(pa.float64()))
+        else:
+            fields.append(field.with_type(pa.string()))
+    if all(f.type == g.type for f, g in zip(fields, schema)):
+        return schema
+    # The pandas metadata describes the old dtypes, so it is dropped
+    return pa.schema(fields)
+
+def _is_number(data_type: Any) -> bool:
+    import pyarrow as pa
+
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+def _rewrite(path: str, new_path: str, schema: Any) -> Tuple[Any, str]:
+    """Copies the batches written so far to new_path under schema; returns the open writer and new_path."""
+    import pyarrow as pa
+
+    writer = pa.ipc.new_file(new_path, schema)
+    with pa.memory_map(path) as f:
+        reader = pa.ipc.open_file(f)
+        for i in range(reader.num_record_batches):
+            writer.write_table(pa.Table.from_batches([reader.get_batch(i)]).cast(schema))
+    os.remove(path)
+    return writer, new_path
+
+def link_or_copy(src_path: str, dest_path: str):
+    """Publishes src_path at dest_path via a hard link, falling back to a copy across filesystems."""
+    import shutil
+
+    tmp_path = f"{dest_path}.tmp{os.getpid()}"
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, dest_path)
@@ -0,0 +1,226 @@
+import importlib
+import multiprocessing
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.config import settings
+from src.metrics import metrics
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+class JobProgress:
+    """Progress reporter handed to job functions; doubles as the cancellation checkpoint."""
+
+    def __init__(self, job_id: str, shared: Any, cancelled: Any):
+        self.job_id = job_id
+        self._shared = shared
+        self._cancelled = cancelled
+        self.started_at = time.time()
+
+    def __call__(self, fraction: float, message: str = ""):
+        if self._cancelled.get(self.job_id):
+            raise JobCancelled(f"Job {self.job_id} was cancelled.")
+        self._shared[self.job_id] = {
+            "progress": round(min(max(fraction, 0.0), 1.0), 4),
+            "message": message,
+            "started_at": self.started_at
+        }
+
+def _resolve(fn: Union[Callable, str]) -> Callable:
+    if callable(fn):
+        return fn
+    module_name, _, attr = fn.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+def _run_job(fn: Union[Callable, str], job_id: str, shared: Any, cancelled: Any, args: tuple, kwargs: dict) -> Any:
+    fn = _resolve(fn)
+    progress = JobProgress(job_id, shared, cancelled)
+    # Drop timings left behind by an earlier job that failed in this worker
+    metrics.collect_pending()
+    metrics.drain()
+    progress(0.0, "Started")
+    result = fn(*args, progress_callback=progress, **kwargs)
+    # Stage timings travel back with the result and are merged into the API process's metrics
+    return result, metrics.drain()
+
+class JobManager:
+    """Runs long jobs (training) in a process pool so they never block the API event loop."""
+
+    def __init__(self, max_workers: int, retention_seconds: Optional[float] = None, retention_max: Optional[int] = None):
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.retention_max = retention_max
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._shared = None
+        self._cancelled = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            # spawn avoids forking the multi-threaded server process
+            ctx = multiprocessing.get_context("spawn")
+            self._manager = ctx.Manager()
+            self._shared = self._manager.dict()
+            self._cancelled = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+
+    def submit(
+        self,
+        kind: str,
+        fn: Union[Callable, str],
+        *args,
+        metadata: Optional[Dict[str, Any]] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+        **kwargs
+    ) -> str:
+        """Queues fn(*args, progress_callback=..., **kwargs) and returns the job id at once.
+
+        fn must be importable at module level so the worker process can unpickle it. It can
+        also be given as "module:function", which is only imported in the worker, so the API
+        process never loads the training stack.
+        """
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._prune()
+            self._ensure_pool()
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "metadata": metadata or {},
+                "result": None,
+                "error": None,
+                "error_type": None
+            }
+            try:
+                future = self._executor.submit(_run_job, fn, job_id, self._shared, self._cancelled, args, kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); release the broken pool's thread and queues,
+                # then start a fresh pool and retry once
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                future = self._executor.submit(_run_job, fn, job_id, self._shared, self._cancelled, args, kwargs)
+            self._futures[job_id] = future
+
+        future.add_done_callback(lambda f: self._finish(job_id, f, on_complete))
+        return job_id
+
+    def _finish(self, job_id: str, future: Future, on_complete: Optional[Callable]):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["finished_at"] = time.time()
+            self._futures.pop(job_id, None)
+            if self._cancelled is not None:
+                self._cancelled.pop(job_id, None)
+            if future.cancelled():
+                job["status"] = "cancelled"
+                return
+            error = future.exception()
+            if isinstance(error, JobCancelled):
+                job["status"] = "cancelled"
+            elif error is not None:
+                job["status"] = "failed"
+                job["error"] = str(error)
+                job["error_type"] = type(error).__name__
+            else:
+                job["status"] = "completed"
+                job["result"], observations = future.result()
+                metrics.merge(observations)
+
+        if job["status"] == "completed" and on_complete is not None:
+            try:
+                on_complete(job["result"])
+            except Exception:
+                with self._lock:
+                    job["status"] = "failed"
+                    job["error"] = f"Persisting the result failed: {traceback.format_exc(limit=1)}"
+
+    def _prune(self):
+        """Forgets finished jobs past the retention age, then the oldest ones beyond the retention count."""
+        finished = sorted(
+            (job for job in self._jobs.values() if job["finished_at"] is not None),
+            key=lambda job: job["finished_at"]
+        )
+        expired = []
+        if self.retention_seconds is not None:
+            cutoff = time.time() - self.retention_seconds
+            expired = [job for job in finished if job["finished_at"] < cutoff]
+        if self.retention_max is not None and len(finished) - len(expired) > self.retention_max:
+            expired = finished[:len(finished) - self.retention_max]
+        for job in expired:
+            del self._jobs[job["job_id"]]
+            if self._shared is not None:
+                self._shared.pop(job["job_id"], None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = dict(job)
+
+        progress = self._shared.get(job_id) if self._shared is not None else None
+        if progress:
+            status.update(progress)
+            if status["status"] == "queued":
+                status["status"] = "running"
+        else:
+            status.setdefault("progress", 0.0)
+        if status["status"] == "completed":
+            status["progress"] = 1.0
+            status["message"] = "Done"
+        return status
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._prune()
+            job_ids = list(self._jobs)
+        # A job may be pruned by a concurrent submit in between
+        statuses = [status for status in map(self.get, job_ids) if status is not None]
+        for status in statuses:
+            status.pop("result", None)
+        return sorted(statuses, key=lambda s: s["submitted_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a queued job outright; a running job stops at its next progress checkpoint."""
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None or future.done():
+                return False
+            if future.cancel():
+                return True
+            self._cancelled[job_id] = True
+            return True
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for f in self._futures.values() if not f.done())
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+job_manager = JobManager(
+    max_workers=settings.TRAINING_MAX_WORKERS,
+    retention_seconds=settings.JOB_RETENTION_SECONDS,
+    retention_max=settings.JOB_RETENTION_MAX
+)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Tuple
+
+def optimize_dtypes(df: pd.DataFrame, category_max_ratio: float = 0.5) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Shrinks a DataFrame's memory footprint without changing its values:
+    integers are downcast to the smallest type that holds their range, floats to
+    float32 only where that round-trips exactly, and object columns whose distinct
+    values are at most category_max_ratio of the rows become 'category'.
+    Returns the new frame and a report of the conversions and bytes saved.
+    """
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    converted = {}
+    columns = {}
+
+    for col in df.columns:
+        series = df[col]
+        kind = series.dtype.kind
+        new = None
+        if kind in "iu":
+            new = pd.to_numeric(series, downcast="unsigned" if kind == "u" or series.min() >= 0 else "integer")
+        elif kind == "f":
+            as_float32 = series.astype(np.float32)
+            if np.array_equal(as_float32.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+                new = as_float32
+        elif series.dtype == object and len(series) > 0:
+            if series.nunique(dropna=True) <= category_max_ratio * len(series):
+                new = series.astype("category")
+
+        if new is not None and new.dtype != series.dtype:
+            converted[col] = new
+            columns[col] = f"{series.dtype} -> {new.dtype}"
+
+    if converted:
+        df = df.copy(deep=False)
+        for col, series in converted.items():
+            df[col] = series
+    bytes_after = int(df.memory_usage(deep=True).sum())
+
+    return df, {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+        "columns": columns
+    }
@@ -0,0 +1,140 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Stage timings of the HTTP request being handled, for the Server-Timing header
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as Prometheus expects it."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+class MetricsRegistry:
+    """
+    In-process stage latencies and HTTP request counts, rendered in the Prometheus text
+    format. Timings recorded in job worker processes are drained and merged back into
+    the API process's registry when the job finishes (see JobManager).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._request_latency: Dict[str, Histogram] = {}
+        # Observations not yet handed back to the parent process; only kept in job workers
+        self._pending: List[Tuple[str, float]] = []
+        self._collect_pending = False
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self._stages.setdefault(stage, Histogram()).observe(seconds)
+            if self._collect_pending:
+                self._pending.append((stage, seconds))
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def collect_pending(self):
+        """Keeps observations for drain() from now on (job worker processes only)."""
+        with self._lock:
+            self._collect_pending = True
+
+    def drain(self) -> List[Tuple[str, float]]:
+        """Returns and forgets the observations made since the last drain (worker side)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def merge(self, observations: List[Tuple[str, float]]):
+        """Adds observations drained in another process."""
+        with self._lock:
+            for stage, seconds in observations:
+                self._stages.setdefault(stage, Histogram()).observe(seconds)
+
+    def count_request(self, method: str, route: str, status: int, seconds: float):
+        with self._lock:
+            key = (method, route, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._request_latency.setdefault(route, Histogram()).observe(seconds)
+
+    @staticmethod
+    @contextmanager
+    def collect_request_timings() -> Iterator[List[Tuple[str, float]]]:
+        """Collects the stage timings observed while handling one request."""
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        try:
+            yield timings
+        finally:
+            _request_timings.reset(token)
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, Dict[Tuple[Tuple[str, str], ...], float]]]] = None) -> str:
+        """
+        Prometheus text exposition. gauges maps extra metric names to (help, {labels: value})
+        for values sampled at scrape time (cache hits, in-flight jobs, ...).
+        """
+        lines: List[str] = []
+        with self._lock:
+            self._render_histograms(lines, "automl_stage_seconds", "Latency of pipeline stages.", "stage", self._stages)
+            lines.append("# HELP automl_http_requests_total HTTP requests by method, route and status.")
+            lines.append("# TYPE automl_http_requests_total counter")
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'automl_http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+                )
+            self._render_histograms(
+                lines, "automl_http_request_seconds", "HTTP request latency by route.", "route", self._request_latency
+            )
+
+        for name, (help_text, samples) in (gauges or {}).items():
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples.items():
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: List[str], name: str, help_text: str, label: str, histograms: Dict[str, Histogram]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(histograms.items()):
+            value = _escape(key)
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label}="{value}",le="+Inf"}} {histogram.n}')
+            lines.append(f'{name}_sum{{{label}="{value}"}} {histogram.total}')
+            lines.append(f'{name}_count{{{label}="{value}"}} {histogram.n}')
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = MetricsRegistry()
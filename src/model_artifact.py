@@ -0,0 +1,189 @@
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+from sklearn.base import BaseEstimator
+
+# Artifact name of the memory-mappable pipeline inside the training run
+ARTIFACT_NAME = "model.joblib"
+
+# Rows traversed at once; bounds the (rows x trees) index arrays
+CHUNK_ROWS = 4096
+
+class MappedForest(BaseEstimator):
+    """
+    A fitted tree ensemble (random forest, extra trees or a single decision tree) stored as
+    flat NumPy arrays, one entry per node across all trees.
+
+    sklearn's Tree copies its node arrays into private memory when it is unpickled, so a
+    memory-mapped forest would still be duplicated in every worker. MappedForest predicts
+    straight from the arrays instead: loaded with mmap_mode='r' they stay in the shared
+    page cache. Built with from_estimator(), which returns None for unsupported models.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        roots: np.ndarray,
+        children: np.ndarray,
+        is_leaf: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        missing_left: np.ndarray,
+        value: np.ndarray,
+        max_depth: int,
+        n_features_in: int,
+        classes: Optional[np.ndarray] = None
+    ):
+        self.kind = kind
+        self.roots = roots
+        # (right, left) child per node, flattened; leaves point to themselves
+        self.children = children
+        self.is_leaf = is_leaf
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        # Leaf class probabilities (classifier) or leaf predictions (regressor), per node
+        self.value = value
+        self.max_depth = max_depth
+        self.n_features_in = n_features_in
+        self.classes = classes
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.n_features_in
+
+    @property
+    def classes_(self) -> np.ndarray:
+        if self.classes is None:
+            raise AttributeError("Regressors have no classes_.")
+        return self.classes
+
+    @classmethod
+    def from_estimator(cls, model: Any) -> Optional["MappedForest"]:
+        from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+        from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+        if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier, RandomForestRegressor, ExtraTreesRegressor)):
+            trees = [estimator.tree_ for estimator in getattr(model, "estimators_", [])]
+        elif isinstance(model, (DecisionTreeClassifier, DecisionTreeRegressor)):
+            trees = [model.tree_] if hasattr(model, "tree_") else []
+        else:
+            return None
+        if not trees or getattr(model, "n_outputs_", 1) != 1:
+            return None
+
+        kind = "classifier" if hasattr(model, "classes_") else "regressor"
+        roots, children, is_leaf, feature, threshold, missing_left, value = [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            nodes = tree.__getstate__()["nodes"]
+            roots.append(offset)
+            # Children are renumbered into the shared node space
+            index = np.arange(len(nodes)) + offset
+            leaf = nodes["left_child"] < 0
+            children.append(np.column_stack([
+                np.where(leaf, index, nodes["right_child"] + offset),
+                np.where(leaf, index, nodes["left_child"] + offset)
+            ]).ravel())
+            is_leaf.append(leaf)
+            feature.append(np.maximum(nodes["feature"], 0))
+            threshold.append(nodes["threshold"])
+            missing_left.append(nodes["missing_go_to_left"].astype(bool))
+            leaf_values = tree.value[:, 0, :].astype(np.float64)
+            if kind == "classifier":
+                # As DecisionTreeClassifier.predict_proba normalizes them
+                totals = leaf_values.sum(axis=1, keepdims=True)
+                totals[totals == 0.0] = 1.0
+                leaf_values = leaf_values / totals
+            else:
+                leaf_values = leaf_values[:, 0]
+            value.append(leaf_values)
+            offset += len(nodes)
+
+        return cls(
+            kind=kind,
+            roots=np.asarray(roots, dtype=np.int32),
+            children=np.concatenate(children).astype(np.int32),
+            is_leaf=np.concatenate(is_leaf),
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            missing_left=np.concatenate(missing_left),
+            value=np.concatenate(value),
+            max_depth=max(int(tree.max_depth) for tree in trees),
+            n_features_in=int(model.n_features_in_),
+            classes=np.asarray(model.classes_) if kind == "classifier" else None
+        )
+
+    def fit(self, X: Any, y: Any):
+        # Present so that sklearn treats it as an estimator; it is only ever built from a fitted model
+        raise TypeError("MappedForest cannot be refitted; build it from a fitted model with from_estimator().")
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return True
+
+    def predict(self, X: Any) -> np.ndarray:
+        scores = self._average(X)
+        if self.kind == "regressor":
+            return scores
+        return self.classes_.take(np.argmax(scores, axis=1), axis=0)
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        if self.kind != "classifier":
+            raise AttributeError("predict_proba is only available for classifiers.")
+        return self._average(X)
+
+    def _average(self, X: Any) -> np.ndarray:
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        # Trees compare float32 inputs, as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((len(X),) + self.value.shape[1:], dtype=np.float64)
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaves = self._leaves(X[start:start + CHUNK_ROWS])
+            out[start:start + len(leaves)] = self.value[leaves].sum(axis=1) / len(self.roots)
+        return out
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index reached in every tree, shape (rows, trees); all trees descend together."""
+        n_trees = len(self.roots)
+        nodes = np.tile(self.roots, len(X))
+        # Offset of each (row, tree) position's row in the flattened input
+        row_offsets = np.repeat(np.arange(len(X), dtype=np.int64) * X.shape[1], n_trees)
+        flat_X = np.ascontiguousarray(X).ravel()
+        has_missing = bool(np.isnan(flat_X).any())
+        active = np.arange(len(nodes))
+        for depth in range(self.max_depth):
+            current = nodes[active]
+            # Leaves loop on themselves; paths that reached one are dropped every few levels
+            if depth % 4 == 3:
+                keep = ~self.is_leaf[current]
+                active, current = active[keep], current[keep]
+                if not len(active):
+                    break
+            x = flat_X[row_offsets[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_missing:
+                go_left = np.where(np.isnan(x), self.missing_left[current], go_left)
+            nodes[active] = self.children[current * 2 + go_left]
+        return nodes.reshape(len(X), n_trees)
+
+def compile_pipeline(pipeline: Any) -> Any:
+    """Returns the pipeline with a supported tree ensemble replaced by its MappedForest (else unchanged)."""
+    from sklearn.pipeline import Pipeline
+
+    steps = getattr(pipeline, "steps", None)
+    if not steps:
+        return pipeline
+    forest = MappedForest.from_estimator(steps[-1][1])
+    if forest is None:
+        return pipeline
+    return Pipeline(steps=steps[:-1] + [(steps[-1][0], forest)])
+
+def save(pipeline: Any, path: str):
+    # Uncompressed, so that every array in the file can be memory-mapped on load
+    joblib.dump(pipeline, path, compress=0)
+
+def load(path: str) -> Any:
+    """Loads a saved pipeline with its arrays memory-mapped read-only and shared between processes."""
+    return joblib.load(path, mmap_mode="r")
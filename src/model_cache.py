@@ -0,0 +1,212 @@
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import settings
+from src.metrics import metrics
+from src.inference_plan import InferencePlan, ARTIFACT_NAME as PLAN_ARTIFACT
+from src.registry import ModelRegistry
+
+class ModelCache:
+    """Process-wide LRU cache of loaded model pipelines keyed by (model name, version)."""
+
+    def __init__(self, max_entries: int, max_bytes: int, resolve_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.resolve_ttl = resolve_ttl
+        self._models: "OrderedDict[Tuple[str, int], Tuple[Any, int]]" = OrderedDict()
+        self._plans: Dict[Tuple[str, int], Optional[InferencePlan]] = {}
+        # Production version per model name, most recently used last; bounded like _models
+        self._resolved: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._load_locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._registry = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def registry(self) -> ModelRegistry:
+        if self._registry is None:
+            self._registry = ModelRegistry()
+        return self._registry
+
+    def resolve_version(self, model_name: str) -> Optional[int]:
+        """Returns the Production version, re-checking the registry at most once per TTL."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._resolved.get(model_name)
+            if cached is not None and now - cached[1] < self.resolve_ttl:
+                self._resolved.move_to_end(model_name)
+                return cached[0]
+
+        version = self.registry.get_production_version(model_name)
+        # Unknown names aren't remembered, so arbitrary model ids can't grow the cache
+        if version is not None:
+            self._remember_resolved(model_name, version, now)
+        return version
+
+    def _remember_resolved(self, model_name: str, version: int, resolved_at: float):
+        with self._lock:
+            self._resolved[model_name] = (version, resolved_at)
+            self._resolved.move_to_end(model_name)
+            while len(self._resolved) > self.max_entries:
+                self._resolved.popitem(last=False)
+
+    def get(self, model_name: str) -> Optional[Any]:
+        """Returns the Production pipeline for a model, loading it on a miss."""
+        version = self.resolve_version(model_name)
+        if version is None:
+            return None
+        return self.get_version(model_name, version)
+
+    def get_with_plan(self, model_name: str) -> Tuple[Optional[Any], Optional[InferencePlan]]:
+        """Returns the Production pipeline and its compiled inference plan (None if it has none)."""
+        version = self.resolve_version(model_name)
+        if version is None:
+            return None, None
+        model = self.get_version(model_name, version)
+        with self._lock:
+            return model, self._plans.get((model_name, version))
+
+    def get_version(self, model_name: str, version: int) -> Any:
+        key = (model_name, version)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one thread deserializes a given version; the others wait and reuse it
+        try:
+            with load_lock:
+                with self._lock:
+                    if key in self._models:
+                        self._models.move_to_end(key)
+                        self.hits += 1
+                        return self._models[key][0]
+                    self.misses += 1
+
+                with metrics.timer("model_load"):
+                    model, size = self._load_mapped(model_name, version)
+                    if model is None:
+                        model, size = self._load_mlflow_model(model_name, version)
+                    plan = self._load_plan(model_name, version)
+                self._put(key, model, size, plan)
+        finally:
+            # Also after a failed load, so unknown versions don't pile up lock entries
+            with self._lock:
+                self._load_locks.pop(key, None)
+        return model
+
+    def warm(self, model_name: str, version: int):
+        """Pins the resolved Production version and preloads it."""
+        self._remember_resolved(model_name, version, time.monotonic())
+        try:
+            self.get_version(model_name, version)
+        except Exception:
+            # The next /predict will retry the load and surface the error
+            pass
+
+    def invalidate(self, model_name: Optional[str] = None):
+        """Drops cached versions (and the resolved Production version) for one or all models."""
+        with self._lock:
+            if model_name is None:
+                self._models.clear()
+                self._plans.clear()
+                self._resolved.clear()
+                self.total_bytes = 0
+                return
+            self._resolved.pop(model_name, None)
+            for key in [k for k in self._models if k[0] == model_name]:
+                self.total_bytes -= self._models.pop(key)[1]
+                self._plans.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": [f"{name}/{version}" for name, version in self._models],
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _put(self, key: Tuple[str, int], model: Any, size: int, plan: Optional[InferencePlan] = None):
+        with self._lock:
+            if key in self._models:
+                self.total_bytes -= self._models.pop(key)[1]
+            self._models[key] = (model, size)
+            self._plans[key] = plan
+            self.total_bytes += size
+            # Evict least recently used, but always keep the entry just loaded
+            while len(self._models) > 1 and (
+                len(self._models) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                evicted_key, (_, evicted_size) = self._models.popitem(last=False)
+                self._plans.pop(evicted_key, None)
+                self.total_bytes -= evicted_size
+
+    def _load_mapped(self, model_name: str, version: int) -> Tuple[Optional[Any], int]:
+        """
+        Memory-maps the version's joblib artifact, fetching it into MAPPED_MODELS_DIR on first use.
+        Every worker maps the same file, so its arrays are held once in the page cache.
+        """
+        if not settings.MAPPED_MODELS_ENABLED:
+            return None, 0
+        from src import model_artifact
+        try:
+            run_id = self.registry.get_model_version_run_id(model_name, version)
+            path = os.path.join(settings.MAPPED_MODELS_DIR, run_id, model_artifact.ARTIFACT_NAME)
+            if not os.path.exists(path):
+                import mlflow.artifacts
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_dir = f"{os.path.dirname(path)}.tmp{os.getpid()}"
+                downloaded = mlflow.artifacts.download_artifacts(
+                    run_id=run_id, artifact_path=model_artifact.ARTIFACT_NAME, dst_path=tmp_dir
+                )
+                # Atomic, so a worker never maps a half-written file
+                os.replace(downloaded, path)
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Mapped pages are shared and reclaimable; the file size is a conservative upper bound
+            return model_artifact.load(path), os.path.getsize(path)
+        except Exception:
+            # Older runs have no joblib artifact: the MLflow model is loaded instead
+            return None, 0
+
+    def _load_plan(self, model_name: str, version: int) -> Optional[InferencePlan]:
+        """Loads the version's inference plan, if training exported one."""
+        if not settings.INFERENCE_PLAN_ENABLED:
+            return None
+        try:
+            import mlflow.artifacts
+            run_id = self.registry.get_model_version_run_id(model_name, version)
+            return InferencePlan.load(mlflow.artifacts.download_artifacts(run_id=run_id, artifact_path=PLAN_ARTIFACT))
+        except Exception:
+            # No plan (non-linear model, failed parity check, older run): the pipeline is used
+            return None
+
+    def _load_mlflow_model(self, model_name: str, version: int) -> Tuple[Any, int]:
+        """Loads the version's MLflow model; its size is taken from the artifact files on disk."""
+        import tempfile
+        import mlflow.artifacts
+        import mlflow.sklearn
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = mlflow.artifacts.download_artifacts(
+                artifact_uri=self.registry.get_model_version_uri(model_name, version), dst_path=tmp_dir
+            )
+            size = sum(
+                os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(local_path) for name in names
+            )
+            return mlflow.sklearn.load_model(local_path), size
+
+model_cache = ModelCache(
+    max_entries=settings.MODEL_CACHE_MAX_ENTRIES,
+    max_bytes=settings.MODEL_CACHE_MAX_BYTES,
+    resolve_ttl=settings.MODEL_CACHE_RESOLVE_TTL
+)
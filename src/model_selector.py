@@ -1,25 +1,141 @@
-from sklearn.linear_model import LogisticRegression, LinearRegression
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingRegressor
-from xgboost import XGBClassifier
-from typing import Any
+from typing import Any, Callable, Dict
+from src.config import settings
+
+# Estimator libraries are imported inside the factories, so only the model actually
+# requested gets loaded (xgboost and the sklearn ensembles are slow to import).
+
+def _logistic_regression():
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(max_iter=1000)
+
+def _sgd_classifier():
+    from sklearn.linear_model import SGDClassifier
+    return SGDClassifier(loss="log_loss")
+
+def _random_forest_classifier():
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(n_estimators=100)
+
+def _xgboost_classifier():
+    from src.xgboost_model import HistXGBClassifier
+    return HistXGBClassifier()
+
+def _linear_regression():
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression()
+
+def _sgd_regressor():
+    from sklearn.linear_model import SGDRegressor
+    return SGDRegressor()
+
+def _random_forest_regressor():
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_estimators=100)
+
+def _gradient_boosting_regressor():
+    from sklearn.ensemble import GradientBoostingRegressor
+    return GradientBoostingRegressor()
+
+def _xgboost_regressor():
+    from src.xgboost_model import HistXGBRegressor
+    return HistXGBRegressor()
+
+MODEL_FACTORIES: Dict[str, Callable[[], Any]] = {
+    # Classification
+    "logistic_regression": _logistic_regression,
+    "sgd_classifier": _sgd_classifier,
+    "random_forest_classifier": _random_forest_classifier,
+    "xgboost_classifier": _xgboost_classifier,
+
+    # Regression
+    "linear_regression": _linear_regression,
+    "sgd_regressor": _sgd_regressor,
+    "random_forest_regressor": _random_forest_regressor,
+    "gradient_boosting_regressor": _gradient_boosting_regressor,
+    "xgboost_regressor": _xgboost_regressor
+}
+
+# Models fitted on DataPreprocessor's native_categorical output (raw numbers, pandas categoricals) instead of one-hot
+NATIVE_CATEGORICAL_MODELS = {"xgboost_classifier", "xgboost_regressor"}
+# Models whose fit runs outside the GIL, so parallel fits can be threads sharing one process's data
+THREADED_FIT_MODELS = {"xgboost_classifier", "xgboost_regressor"}
 
 class ModelSelector:
+    # Hyperparameter search spaces for tuning: ("int", lo, hi), ("float", lo, hi), ("log", lo, hi) or ("choice", [...])
+    SEARCH_SPACES = {
+        "logistic_regression": {
+            "C": ("log", 1e-3, 1e2)
+        },
+        "sgd_classifier": {
+            "alpha": ("log", 1e-6, 1e-1),
+            "penalty": ("choice", ["l2", "l1", "elasticnet"])
+        },
+        "random_forest_classifier": {
+            "n_estimators": ("int", 50, 500),
+            "max_depth": ("choice", [None, 4, 8, 16, 32]),
+            "min_samples_leaf": ("int", 1, 10),
+            "max_features": ("choice", ["sqrt", "log2", 1.0])
+        },
+        "xgboost_classifier": {
+            "n_estimators": ("int", 50, 500),
+            "max_depth": ("int", 2, 10),
+            "learning_rate": ("log", 0.01, 0.3),
+            "subsample": ("float", 0.5, 1.0),
+            "colsample_bytree": ("float", 0.5, 1.0),
+            "min_child_weight": ("log", 1.0, 10.0)
+        },
+        "linear_regression": {
+            "fit_intercept": ("choice", [True, False])
+        },
+        "sgd_regressor": {
+            "alpha": ("log", 1e-6, 1e-1),
+            "penalty": ("choice", ["l2", "l1", "elasticnet"])
+        },
+        "random_forest_regressor": {
+            "n_estimators": ("int", 50, 500),
+            "max_depth": ("choice", [None, 4, 8, 16, 32]),
+            "min_samples_leaf": ("int", 1, 10),
+            "max_features": ("choice", ["sqrt", "log2", 1.0])
+        },
+        "gradient_boosting_regressor": {
+            "n_estimators": ("int", 50, 500),
+            "learning_rate": ("log", 0.01, 0.3),
+            "max_depth": ("int", 2, 6),
+            "subsample": ("float", 0.5, 1.0)
+        },
+        "xgboost_regressor": {
+            "n_estimators": ("int", 50, 500),
+            "max_depth": ("int", 2, 10),
+            "learning_rate": ("log", 0.01, 0.3),
+            "subsample": ("float", 0.5, 1.0),
+            "colsample_bytree": ("float", 0.5, 1.0),
+            "min_child_weight": ("log", 1.0, 10.0)
+        }
+    }
+
     @staticmethod
     def get_model(model_id: str) -> Any:
         """Returns an uninitialized scikit-learn or XGBoost model."""
-        models = {
-            # Classification
-            "logistic_regression": LogisticRegression(max_iter=1000),
-            "random_forest_classifier": RandomForestClassifier(n_estimators=100),
-            "xgboost_classifier": XGBClassifier(use_label_encoder=False, eval_metric='logloss'),
-            
-            # Regression
-            "linear_regression": LinearRegression(),
-            "random_forest_regressor": RandomForestRegressor(n_estimators=100),
-            "gradient_boosting_regressor": GradientBoostingRegressor()
-        }
-        
-        if model_id not in models:
+        ModelSelector.validate(model_id)
+        return MODEL_FACTORIES[model_id]()
+
+    @staticmethod
+    def uses_native_categorical(model_id: str) -> bool:
+        """Whether the model gets its own native-categorical preprocessing rather than the shared one-hot encoding."""
+        return settings.XGBOOST_NATIVE_CATEGORICAL and model_id in NATIVE_CATEGORICAL_MODELS
+
+    @staticmethod
+    def fits_in_threads(model_id: str) -> bool:
+        return model_id in THREADED_FIT_MODELS
+
+    @staticmethod
+    def validate(model_id: str):
+        """Raises ValueError for unknown model IDs without importing any estimator library."""
+        if model_id not in MODEL_FACTORIES:
             raise ValueError(f"Model ID '{model_id}' is not supported.")
-            
-        return models[model_id]
+
+    @staticmethod
+    def get_search_space(model_id: str) -> Dict[str, tuple]:
+        if model_id not in ModelSelector.SEARCH_SPACES:
+            raise ValueError(f"Model ID '{model_id}' has no search space.")
+        return ModelSelector.SEARCH_SPACES[model_id]
@@ -1,26 +1,80 @@
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
+from src.config import settings
+from src.cost_model import CostModel, DataShape
+from src.cpu_budget import physical_memory
+from src.dataset_profile import DatasetProfile
+from src.model_selector import ModelSelector
 
 class ModelSuggester:
+    CANDIDATES = {
+        "classification": [
+            {"name": "Logistic Regression", "id": "logistic_regression", "reason": "Good baseline for classification."},
+            {"name": "Random Forest", "id": "random_forest_classifier", "reason": "Handles non-linear patterns well."},
+            {"name": "XGBoost", "id": "xgboost_classifier", "reason": "High performance for structured data."}
+        ],
+        "regression": [
+            {"name": "Linear Regression", "id": "linear_regression", "reason": "Simple baseline for regression."},
+            {"name": "Random Forest Regressor", "id": "random_forest_regressor", "reason": "Robust for regression tasks."},
+            {"name": "Gradient Boosting", "id": "gradient_boosting_regressor", "reason": "Effective for complex regression."},
+            {"name": "XGBoost Regressor", "id": "xgboost_regressor", "reason": "Fast histogram boosting with native categorical support."}
+        ]
+    }
+
+    # Offered as well when another candidate doesn't fit the budget: one pass per epoch, memory linear in the data
+    SCALABLE_FALLBACKS = {
+        "classification": {"name": "SGD Classifier", "id": "sgd_classifier", "reason": "Linear model that scales to very large datasets."},
+        "regression": {"name": "SGD Regressor", "id": "sgd_regressor", "reason": "Linear model that scales to very large datasets."}
+    }
+
     @staticmethod
-    def suggest_models(df: pd.DataFrame, task_type: str) -> List[Dict]:
-        """Suggests models based on task type and dataset metrics."""
-        n_samples = len(df)
-        n_features = len(df.columns)
-        
-        suggestions = []
-        
-        if task_type == "classification":
-            suggestions = [
-                {"name": "Logistic Regression", "id": "logistic_regression", "reason": "Good baseline for classification."},
-                {"name": "Random Forest", "id": "random_forest_classifier", "reason": "Handles non-linear patterns well."},
-                {"name": "XGBoost", "id": "xgboost_classifier", "reason": "High performance for structured data."}
-            ]
-        elif task_type == "regression":
-            suggestions = [
-                {"name": "Linear Regression", "id": "linear_regression", "reason": "Simple baseline for regression."},
-                {"name": "Random Forest Regressor", "id": "random_forest_regressor", "reason": "Robust for regression tasks."},
-                {"name": "Gradient Boosting", "id": "gradient_boosting_regressor", "reason": "Effective for complex regression."}
-            ]
-            
+    def suggest_models(
+        df: Optional[pd.DataFrame],
+        task_type: str,
+        profile: Optional[DatasetProfile] = None,
+        target: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Suggests models for the task, each with its estimated fit time and peak memory on this
+        dataset (read from the profile when given instead of df). Suggestions are ranked by
+        estimated fit time; those exceeding the configured budgets are flagged and ranked last.
+        """
+        if profile is None:
+            profile = DatasetProfile.from_frame(df)
+        shapes = {
+            native: DataShape.from_profile(profile, target, task_type, native_categorical=native)
+            for native in (False, True)
+        }
+        cost_model = CostModel.load()
+        time_budget = settings.SUGGESTION_TIME_BUDGET_SECONDS
+        memory_budget = settings.SUGGESTION_MEMORY_BUDGET_BYTES or physical_memory()
+
+        def with_estimate(candidate: Dict) -> Dict:
+            estimate = cost_model.estimate(candidate["id"], shapes[ModelSelector.uses_native_categorical(candidate["id"])])
+            exceeded = []
+            if estimate["fit_seconds"] > time_budget:
+                exceeded.append("time")
+            if memory_budget and estimate["peak_memory_bytes"] > memory_budget:
+                exceeded.append("memory")
+            return dict(
+                candidate,
+                estimated_fit_seconds=round(estimate["fit_seconds"], 3),
+                estimated_peak_memory_bytes=int(estimate["peak_memory_bytes"]),
+                over_budget=bool(exceeded),
+                budget_exceeded=exceeded
+            )
+
+        suggestions = [with_estimate(c) for c in ModelSuggester.CANDIDATES.get(task_type, [])]
+        if any(s["over_budget"] for s in suggestions) and task_type in ModelSuggester.SCALABLE_FALLBACKS:
+            suggestions.append(with_estimate(ModelSuggester.SCALABLE_FALLBACKS[task_type]))
+        suggestions.sort(key=lambda s: (s["over_budget"], s["estimated_fit_seconds"]))
         return suggestions
+
+    @staticmethod
+    def default_model_ids(
+        df: Optional[pd.DataFrame], target: str, task_type: str, profile: Optional[DatasetProfile] = None
+    ) -> List[str]:
+        """Candidates trained when none are requested: the suggestions within budget, else the cheapest one."""
+        suggestions = ModelSuggester.suggest_models(df, task_type, profile=profile, target=target)
+        within_budget = [s["id"] for s in suggestions if not s["over_budget"]]
+        return within_budget or [s["id"] for s in suggestions[:1]]
@@ -1,18 +1,45 @@
-import mlflow.sklearn
 import pandas as pd
-from src.registry import ModelRegistry
+from typing import Any, Dict, Iterable, Iterator, List
+from src.metrics import metrics
+from src.model_cache import model_cache
 
 class Predictor:
     def __init__(self, model_name: str):
-        self.registry = ModelRegistry()
-        self.model_uri = self.registry.get_production_model_uri(model_name)
+        self.model_name = model_name
         try:
-            self.model = mlflow.sklearn.load_model(self.model_uri)
+            # Served from the process-wide cache; only a miss deserializes the pipeline
+            self.model, self.plan = model_cache.get_with_plan(model_name)
         except Exception:
             # Fallback to latest if Production doesn't exist yet
-            self.model = None
+            self.model, self.plan = None, None
 
     def predict(self, df: pd.DataFrame):
         if self.model is None:
             raise RuntimeError("No model loaded for prediction.")
-        return self.model.predict(df).tolist()
+        with metrics.timer("predict"):
+            if self.plan is not None:
+                return self.plan.predict(df).tolist()
+            return self.model.predict(self._conform(df)).tolist()
+
+    def predict_record(self, record: Dict[str, Any]) -> List:
+        """Scores a single row given as a dict, skipping the DataFrame when the plan can take it directly."""
+        if self.model is not None and self.plan is not None:
+            with metrics.timer("predict"):
+                return self.plan.predict(record).tolist()
+        return self.predict(pd.DataFrame([record]))
+
+    def predict_batches(self, batches: Iterable[pd.DataFrame]) -> Iterator[List]:
+        """Scores an iterable of DataFrame chunks, yielding one prediction list per chunk."""
+        for batch in batches:
+            yield self.predict(batch)
+
+    def _conform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Casts categorical inputs back to object so an all-null chunk isn't read as numeric."""
+        preprocessor = getattr(self.model, "named_steps", {}).get("preprocessor")
+        for name, _, columns in getattr(preprocessor, "transformers_", []):
+            if not name.startswith("cat"):
+                continue
+            columns = [c for c in columns if c in df.columns and df[c].dtype != object]
+            if columns:
+                df = df.astype({c: object for c in columns})
+        return df
@@ -1,19 +1,82 @@
+import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, TargetEncoder, FunctionTransformer
 from sklearn.impute import SimpleImputer
 import joblib
 import os
+from typing import Dict, Optional
 from src.config import settings
 
+# Transformer name -> encoding strategy recorded for its columns
+ENCODING_STRATEGIES = {
+    "num": "scaled",
+    "cat": "onehot",
+    "cat_target": "target",
+    "cat_grouped": "onehot_infrequent",
+    "num_native": "raw",
+    "cat_native": "native_categorical"
+}
+
+class CategoricalDtypeEncoder(BaseEstimator, TransformerMixin):
+    """
+    Turns string columns into pandas categoricals with the categories seen in fit, for models
+    that split on categories natively (XGBoost). Unseen values and missing values become NaN.
+    """
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.categories_ = {
+            column: pd.Index(_as_strings(X[column]).dropna().unique()).sort_values()
+            for column in X.columns
+        }
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({
+            column: pd.Categorical(_as_strings(X[column]), categories=categories)
+            for column, categories in self.categories_.items()
+        }, index=X.index)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray(list(self.categories_), dtype=object)
+
 class DataPreprocessor:
     def __init__(self):
         self.preprocessor = None
 
-    def build_pipeline(self, X: pd.DataFrame):
-        numeric_features = X.select_dtypes(include=['int64', 'float64']).columns
-        categorical_features = X.select_dtypes(include=['object']).columns
+    def build_pipeline(
+        self, X: pd.DataFrame, task_type: Optional[str] = None, sparse: bool = True, native_categorical: bool = False
+    ):
+        """
+        Categorical columns with at most ONEHOT_MAX_CATEGORIES values are one-hot encoded.
+        Wider ones get HIGH_CARDINALITY_ENCODING: cross-fitted target encoding (needs task_type)
+        or one-hot of the most frequent values with the rest grouped as "infrequent".
+        With sparse=True the output is a sparse matrix when its overall density is below
+        settings.SPARSE_OUTPUT_MAX_DENSITY (one-hot heavy data), and dense otherwise, so mostly-numeric
+        data reaches tree models as a dense array.
+        With native_categorical=True (models that split on categories themselves) the output is a
+        DataFrame of the raw numeric columns and one categorical column per string column instead.
+        """
+        # Any numeric width, since frames may be downcast at load time (bool stays excluded)
+        numeric_features = X.select_dtypes(include=['number']).columns
+        categorical_features = X.select_dtypes(include=['object', 'category']).columns
+
+        if native_categorical:
+            # Missing numbers stay NaN: the model learns which way they go
+            self.preprocessor = ColumnTransformer(transformers=[
+                ('num_native', FunctionTransformer(_as_floats, feature_names_out="one-to-one"), numeric_features),
+                ('cat_native', CategoricalDtypeEncoder(), categorical_features)
+            ], verbose_feature_names_out=False).set_output(transform="pandas")
+            return self.preprocessor
+
+        max_categories = settings.ONEHOT_MAX_CATEGORIES
+        cardinality = X[categorical_features].nunique()
+        onehot_features = [c for c in categorical_features if cardinality[c] <= max_categories]
+        wide_features = [c for c in categorical_features if cardinality[c] > max_categories]
+        use_target = settings.HIGH_CARDINALITY_ENCODING == "target" and task_type is not None
 
         numeric_transformer = Pipeline(steps=[
             ('imputer', SimpleImputer(strategy='median')),
@@ -25,17 +88,50 @@ class DataPreprocessor:
             ('onehot', OneHotEncoder(handle_unknown='ignore'))
         ])
 
+        transformers = [
+            ('num', numeric_transformer, numeric_features),
+            ('cat', categorical_transformer, onehot_features)
+        ]
+        if wide_features and use_target:
+            # fit_transform cross-fits the encoding, so no row is encoded with its own target
+            target_type = "continuous" if task_type == "regression" else "auto"
+            transformers.append(('cat_target', Pipeline(steps=[
+                ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+                ('target', TargetEncoder(target_type=target_type, random_state=42))
+            ]), wide_features))
+        elif wide_features:
+            transformers.append(('cat_grouped', Pipeline(steps=[
+                ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+                ('onehot', OneHotEncoder(handle_unknown='infrequent_if_exist', max_categories=max_categories))
+            ]), wide_features))
+
         self.preprocessor = ColumnTransformer(
-            transformers=[
-                ('num', numeric_transformer, numeric_features),
-                ('cat', categorical_transformer, categorical_features)
-            ]
+            transformers=transformers,
+            sparse_threshold=settings.SPARSE_OUTPUT_MAX_DENSITY if sparse else 0.0
         )
         return self.preprocessor
 
+    @staticmethod
+    def encoding_plan(preprocessor: ColumnTransformer) -> Dict[str, str]:
+        """Maps every input column of a built preprocessor to the strategy that encodes it."""
+        return {
+            str(column): ENCODING_STRATEGIES.get(name, name)
+            for name, _, columns in preprocessor.transformers
+            for column in columns
+        }
+
     def save(self, path: str):
         joblib.dump(self.preprocessor, path)
 
     @staticmethod
     def load(path: str):
         return joblib.load(path)
+
+def _as_strings(values: pd.Series) -> pd.Series:
+    # Categories are matched as strings, so "3" in a CSV batch and 3 in a JSON request are the same value
+    values = values.astype(object)
+    return values.astype(str).where(values.notna())
+
+def _as_floats(X: pd.DataFrame) -> pd.DataFrame:
+    # Request rows can hold None or numbers as strings; anything unparsable is missing
+    return X.apply(pd.to_numeric, errors="coerce").astype(np.float32)
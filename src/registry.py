@@ -1,9 +1,12 @@
-import mlflow
-from mlflow.tracking import MlflowClient
+from typing import Optional
 from src.config import settings
 
 class ModelRegistry:
     def __init__(self):
+        # Imported here so that importing the API doesn't load mlflow
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
         mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
         self.client = MlflowClient()
 
@@ -20,6 +23,24 @@ class ModelRegistry:
         """Returns the URI of the model currently in Production."""
         return f"models:/{model_name}/Production"
 
+    def get_production_version(self, model_name: str) -> Optional[int]:
+        """Returns the version number currently in Production, or None."""
+        try:
+            versions = self.client.get_latest_versions(model_name, stages=["Production"])
+        except Exception:
+            return None
+        if not versions:
+            return None
+        return int(versions[0].version)
+
+    def get_model_version_uri(self, model_name: str, version: int) -> str:
+        """Returns the URI of a specific registered model version."""
+        return f"models:/{model_name}/{version}"
+
+    def get_model_version_run_id(self, model_name: str, version: int) -> str:
+        """Returns the ID of the training run that produced a registered model version."""
+        return self.client.get_model_version(model_name, str(version)).run_id
+
     def get_latest_version(self, model_name: str) -> int:
         """Returns the latest version of a registered model."""
         versions = self.client.get_latest_versions(model_name, stages=["None"])
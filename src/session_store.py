@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from src.config import settings
+from src.storage_manager import StorageManager
+
+class FrameCache:
+    """LRU cache of project DataFrames bounded by their deep memory usage; misses reload from storage."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, project_id: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            if project_id in self._frames:
+                self._frames.move_to_end(project_id)
+                self.hits += 1
+                return self._frames[project_id][0]
+            self.misses += 1
+
+        df = StorageManager.load_dataset(project_id, optimize=settings.OPTIMIZE_DTYPES)
+        if df is not None:
+            self.put(project_id, df)
+        return df
+
+    def put(self, project_id: str, df: pd.DataFrame):
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if project_id in self._frames:
+                self.total_bytes -= self._frames.pop(project_id)[1]
+            self._frames[project_id] = (df, size)
+            self.total_bytes += size
+            # Evict least recently used frames, but always keep the one just added
+            while len(self._frames) > 1 and self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._frames.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def evict(self, project_id: str):
+        with self._lock:
+            if project_id in self._frames:
+                self.total_bytes -= self._frames.pop(project_id)[1]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "frames": len(self._frames),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+class Session:
+    """Active project of one client; the DataFrame itself lives in the shared FrameCache."""
+
+    def __init__(self, session_id: str, frames: FrameCache):
+        self.session_id = session_id
+        self.project_id: Optional[str] = None
+        self.task_type: Optional[str] = None
+        self.target: Optional[str] = None
+        self._frames = frames
+
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        if self.project_id is None:
+            return None
+        return self._frames.get(self.project_id)
+
+    def activate(self, project_id: str, task_type: str, target: str):
+        self.project_id = project_id
+        self.task_type = task_type
+        self.target = target
+
+    def clear(self):
+        self.project_id = None
+        self.task_type = None
+        self.target = None
+
+class SessionStore:
+    """Per-client sessions (keyed by the X-Session-ID header), least recently used dropped past max_sessions."""
+
+    def __init__(self, max_sessions: int, max_frame_bytes: int):
+        self.max_sessions = max_sessions
+        self.frames = FrameCache(max_frame_bytes)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id, self.frames)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def forget_project(self, project_id: str):
+        """Drops a deleted project from the frame cache and from every session using it."""
+        self.frames.evict(project_id)
+        with self._lock:
+            for session in self._sessions.values():
+                if session.project_id == project_id:
+                    session.clear()
+
+session_store = SessionStore(
+    max_sessions=settings.MAX_SESSIONS,
+    max_frame_bytes=settings.FRAME_CACHE_MAX_BYTES
+)
@@ -1,15 +1,22 @@
 import os
 import json
+import hashlib
 import shutil
+import threading
 import uuid
 from datetime import datetime
 import pandas as pd
 from typing import Dict, Any, List, Optional
 from src.config import settings
+from src.data_loader import read_frame, write_frame, migrate_csv, compact_frame
 
 class StorageManager:
     """Manages local filesystem storage for ML projects."""
     
+    DATASET_FILE = "raw_data.feather"
+    # Digests of the stored datasets, with the size and mtime they were computed for
+    FINGERPRINT_FILE = "fingerprints.json"
+    
     @staticmethod
     def create_project_structure() -> str:
         """Generates a unique project ID and creates its directory."""
@@ -23,16 +30,23 @@ class StorageManager:
         return os.path.join(settings.PROJECTS_DIR, project_id)
 
     @classmethod
-    def save_dataset(cls, project_id: str, df: pd.DataFrame, filename: str = "raw_data.csv"):
-        path = os.path.join(cls.get_project_path(project_id), filename)
-        df.to_csv(path, index=False)
+    def get_dataset_path(cls, project_id: str, filename: str = DATASET_FILE) -> str:
+        return os.path.join(cls.get_project_path(project_id), filename)
+
+    @classmethod
+    def save_dataset(cls, project_id: str, df: pd.DataFrame, filename: str = DATASET_FILE):
+        path = cls.get_dataset_path(project_id, filename)
+        write_frame(df, path)
         return path
 
     @classmethod
     def save_json(cls, project_id: str, data: Dict[str, Any], filename: str):
         path = os.path.join(cls.get_project_path(project_id), filename)
-        with open(path, 'w') as f:
+        # Write-then-rename so concurrent readers never see a half-written file
+        tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
         return path
 
     @classmethod
@@ -44,11 +58,50 @@ class StorageManager:
         return None
 
     @classmethod
-    def load_dataset(cls, project_id: str, filename: str = "raw_data.csv") -> Optional[pd.DataFrame]:
-        path = os.path.join(cls.get_project_path(project_id), filename)
-        if os.path.exists(path):
-            return pd.read_csv(path)
-        return None
+    def load_dataset(
+        cls, project_id: str, filename: str = DATASET_FILE, columns: Optional[List[str]] = None,
+        optimize: bool = False
+    ) -> Optional[pd.DataFrame]:
+        path = cls.ensure_dataset(project_id, filename)
+        if path is None:
+            return None
+        df = read_frame(path, columns)
+        return compact_frame(df) if optimize else df
+
+    @classmethod
+    def ensure_dataset(cls, project_id: str, filename: str = DATASET_FILE) -> Optional[str]:
+        """Path of the project's dataset file, or None if it has none."""
+        path = cls.get_dataset_path(project_id, filename)
+        if not os.path.exists(path):
+            # Projects created before columnar storage are converted on first access
+            legacy_path = os.path.splitext(path)[0] + ".csv"
+            if not os.path.exists(legacy_path):
+                return None
+            migrate_csv(legacy_path, path, remove_source=True)
+        return path
+
+    @classmethod
+    def dataset_fingerprint(cls, project_id: str, filename: str = DATASET_FILE) -> Optional[str]:
+        """
+        SHA-256 of the stored dataset file. The digest is kept in the project directory with the
+        file's size and mtime, so an unchanged file is hashed once, even across processes.
+        """
+        path = cls.ensure_dataset(project_id, filename)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        fingerprints = cls.load_json(project_id, cls.FINGERPRINT_FILE) or {}
+        entry = fingerprints.get(filename)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        fingerprints[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+        cls.save_json(project_id, fingerprints, cls.FINGERPRINT_FILE)
+        return digest.hexdigest()
 
     @classmethod
     def delete_project(cls, project_id: str):
@@ -0,0 +1,201 @@
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, RegressorMixin, TransformerMixin
+
+def iter_frames(path: str, batch_rows: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Yields (first row number, DataFrame) batches of at most batch_rows rows from a
+    Feather/Arrow file. The file is memory-mapped, so only the current batch is in RAM.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        offset = 0
+        for i in range(reader.num_record_batches):
+            record_batch = reader.get_batch(i)
+            for start in range(0, record_batch.num_rows, batch_rows):
+                frame = record_batch.slice(start, batch_rows).to_pandas()
+                yield offset, frame
+                offset += len(frame)
+
+def holdout_mask(offset: int, n_rows: int, test_size: float) -> np.ndarray:
+    """
+    True for rows that belong to the held-out stream. Decided by a hash of the row
+    number, so every pass over the file puts the same rows on the same side.
+    """
+    rows = np.arange(offset, offset + n_rows, dtype=np.uint64)
+    hashed = (rows * np.uint64(2654435761) + np.uint64(40503)) % np.uint64(2 ** 32)
+    return hashed < np.uint64(int(test_size * 2 ** 32))
+
+class StreamingPreprocessor(BaseEstimator, TransformerMixin):
+    """
+    Preprocessing whose statistics are accumulated batch by batch with partial_fit:
+    running mean/variance for numeric columns (missing values imputed with the mean,
+    then standardized) and value counts for categorical ones, of which the
+    max_categories most frequent are one-hot encoded and the rest share an
+    "infrequent" column. transform() returns a sparse CSR matrix.
+    """
+
+    # Past this many tracked values per column, counts are pruned to the most frequent ones
+    MAX_TRACKED_VALUES = 100_000
+
+    def __init__(self, numeric_features: List[str], categorical_features: List[str], max_categories: int = 50):
+        self.numeric_features = numeric_features
+        self.categorical_features = categorical_features
+        self.max_categories = max_categories
+
+    def partial_fit(self, X: pd.DataFrame, y: Any = None):
+        if not hasattr(self, "n_seen_"):
+            n = len(self.numeric_features)
+            self.n_seen_ = np.zeros(n)
+            self.mean_ = np.zeros(n)
+            self.m2_ = np.zeros(n)
+            self.counts_ = {col: Counter() for col in self.categorical_features}
+            self.pruned_ = set()
+
+        if self.numeric_features:
+            values = X[self.numeric_features].to_numpy(dtype=np.float64, na_value=np.nan)
+            n_batch = (~np.isnan(values)).sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean_batch = np.where(n_batch > 0, np.nansum(values, axis=0) / np.maximum(n_batch, 1), 0.0)
+                m2_batch = np.nansum((values - mean_batch) ** 2, axis=0)
+            # Chan et al. pairwise update of count, mean and sum of squared deviations
+            total = self.n_seen_ + n_batch
+            delta = mean_batch - self.mean_
+            safe_total = np.maximum(total, 1)
+            self.mean_ = self.mean_ + delta * n_batch / safe_total
+            self.m2_ = self.m2_ + m2_batch + delta ** 2 * self.n_seen_ * n_batch / safe_total
+            self.n_seen_ = total
+
+        for col in self.categorical_features:
+            counts = self.counts_[col]
+            counts.update(self._categories(X[col]).value_counts().to_dict())
+            if len(counts) > self.MAX_TRACKED_VALUES:
+                self.counts_[col] = Counter(dict(counts.most_common(self.MAX_TRACKED_VALUES // 10)))
+                self.pruned_.add(col)
+
+        self._finalize()
+        return self
+
+    def fit(self, X: pd.DataFrame, y: Any = None):
+        for attr in ("n_seen_", "mean_", "m2_", "counts_", "pruned_"):
+            self.__dict__.pop(attr, None)
+        return self.partial_fit(X, y)
+
+    def _finalize(self):
+        variance = np.where(self.n_seen_ > 0, self.m2_ / np.maximum(self.n_seen_, 1), 0.0)
+        self.scale_ = np.where(variance > 0, np.sqrt(variance), 1.0)
+        self.vocabulary_ = {
+            col: [value for value, _ in self.counts_[col].most_common(self.max_categories)]
+            for col in self.categorical_features
+        }
+
+    @staticmethod
+    def _categories(series: pd.Series) -> pd.Series:
+        return series.astype(object).where(series.notna(), "missing").astype(str)
+
+    def transform(self, X: pd.DataFrame):
+        blocks = []
+        if self.numeric_features:
+            values = X[self.numeric_features].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = np.where(np.isnan(values), self.mean_, values)
+            blocks.append(sparse.csr_matrix((values - self.mean_) / self.scale_))
+
+        for col in self.categorical_features:
+            vocabulary = self.vocabulary_[col]
+            codes = pd.Categorical(self._categories(X[col]), categories=vocabulary).codes.astype(np.int64)
+            # Unseen and infrequent values share the last column
+            codes[codes < 0] = len(vocabulary)
+            blocks.append(sparse.csr_matrix(
+                (np.ones(len(codes)), (np.arange(len(codes)), codes)),
+                shape=(len(codes), len(vocabulary) + 1)
+            ))
+
+        if not blocks:
+            return sparse.csr_matrix((len(X), 0))
+        return sparse.hstack(blocks, format="csr")
+
+    def encoding_plan(self) -> Dict[str, str]:
+        """Same shape as DataPreprocessor.encoding_plan."""
+        plan = {str(col): "scaled" for col in self.numeric_features}
+        for col in self.categorical_features:
+            grouped = col in self.pruned_ or len(self.counts_[col]) > self.max_categories
+            plan[str(col)] = "onehot_infrequent" if grouped else "onehot"
+        return plan
+
+class ScaledTargetRegressor(BaseEstimator, RegressorMixin):
+    """
+    Wraps a partial_fit regressor so it learns a standardized target: SGD steps on
+    raw targets far from zero (prices, salaries) diverge. Predictions are mapped back.
+    """
+
+    def __init__(self, regressor: Any, target_mean: float = 0.0, target_scale: float = 1.0):
+        self.regressor = regressor
+        self.target_mean = target_mean
+        self.target_scale = target_scale
+
+    def partial_fit(self, X: Any, y: Any):
+        self.regressor.partial_fit(X, (np.asarray(y, dtype=np.float64) - self.target_mean) / self.target_scale)
+        return self
+
+    def fit(self, X: Any, y: Any):
+        self.regressor.fit(X, (np.asarray(y, dtype=np.float64) - self.target_mean) / self.target_scale)
+        return self
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.regressor.predict(X) * self.target_scale + self.target_mean
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return hasattr(self.regressor, "n_features_in_")
+
+class StreamingMetrics:
+    """Accumulates Trainer.evaluate's metrics over batches without keeping the predictions."""
+
+    def __init__(self, task_type: str):
+        self.task_type = task_type
+        self.n = 0
+        self.confusion: Counter = Counter()
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+        self.sum_sq_error = 0.0
+
+    def update(self, y_true: Any, y_pred: Any):
+        y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+        self.n += len(y_true)
+        if self.task_type == "classification":
+            self.confusion.update(zip(y_true.tolist(), y_pred.tolist()))
+        else:
+            y_true = y_true.astype(np.float64)
+            self.sum_y += float(y_true.sum())
+            self.sum_y2 += float((y_true ** 2).sum())
+            self.sum_sq_error += float(((y_true - y_pred) ** 2).sum())
+
+    def result(self) -> Dict[str, Optional[float]]:
+        if self.n == 0:
+            raise ValueError("The held-out stream is empty.")
+        if self.task_type == "classification":
+            correct = sum(count for (t, p), count in self.confusion.items() if t == p)
+            support, predicted, hits = Counter(), Counter(), Counter()
+            for (t, p), count in self.confusion.items():
+                support[t] += count
+                predicted[p] += count
+                if t == p:
+                    hits[t] += count
+            # Weighted F1, as in f1_score(average='weighted')
+            f1 = 0.0
+            for label, n_true in support.items():
+                precision = hits[label] / predicted[label] if predicted[label] else 0.0
+                recall = hits[label] / n_true
+                if precision + recall > 0:
+                    f1 += n_true * 2 * precision * recall / (precision + recall)
+            return {"accuracy": correct / self.n, "f1": f1 / self.n}
+
+        mse = self.sum_sq_error / self.n
+        total_variance = self.sum_y2 - self.sum_y ** 2 / self.n
+        r2 = 1.0 - self.sum_sq_error / total_variance if total_variance > 0 else 0.0
+        return {"mse": mse, "r2": r2}
@@ -1,64 +1,637 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, KFold, StratifiedKFold
 from sklearn.metrics import accuracy_score, f1_score, mean_squared_error, r2_score
 from sklearn.pipeline import Pipeline
+from joblib import Parallel, delayed, parallel_config
 import mlflow
 import mlflow.sklearn
 import os
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
 from src.config import settings
+from src.metrics import metrics as stage_metrics
 from src.preprocessor import DataPreprocessor
 from src.model_selector import ModelSelector
+from src.model_suggester import ModelSuggester
+from src.cost_model import CostModel, DataShape
+from src.dataset_profile import DatasetProfile
+from src.storage_manager import StorageManager
+from src.data_loader import split_features
+from src.cpu_budget import split_cpu_budget, limit_model_threads
+from src.tuner import SuccessiveHalvingSearch, ProgressiveScreening
+from src.xgboost_model import reuse_matrices
+from src.inference_plan import InferencePlan, ARTIFACT_NAME as PLAN_ARTIFACT
+from src import model_artifact
+from src.streaming import StreamingPreprocessor, StreamingMetrics, ScaledTargetRegressor, iter_frames, holdout_mask
 
 import time
 
+def _fit_candidate(model_id: str, X_train: Any, y_train: pd.Series, n_threads: int):
+    """Fits one model on already-transformed features (runs in a joblib worker)."""
+    start_time = time.time()
+    try:
+        model = limit_model_threads(ModelSelector.get_model(model_id), n_threads)
+        model.fit(X_train, y_train)
+        return model_id, model, time.time() - start_time, None
+    except Exception as e:
+        return model_id, None, time.time() - start_time, f"{type(e).__name__}: {e}"
+
+def _fit_fold(model_id: str, fold: int, X_train: Any, y_train: pd.Series, X_val: Any, y_val: pd.Series, task_type: str, n_threads: int):
+    """Fits and scores one model on one cross-validation fold (runs in a joblib worker)."""
+    start_time = time.time()
+    try:
+        model = limit_model_threads(ModelSelector.get_model(model_id), n_threads)
+        model.fit(X_train, y_train)
+        fit_time = time.time() - start_time
+        metrics = Trainer.evaluate(task_type, y_val, model.predict(X_val))
+        return {"model_id": model_id, "fold": fold, "metrics": metrics, "fit_time": fit_time, "score_time": time.time() - start_time - fit_time}
+    except Exception as e:
+        return {"model_id": model_id, "fold": fold, "error": f"{type(e).__name__}: {e}", "fit_time": time.time() - start_time}
+
+def _preprocess_fold(
+    X: pd.DataFrame, y: pd.Series, train_idx: np.ndarray, val_idx: np.ndarray, task_type: str, native_categorical: bool = False
+):
+    start_time = time.time()
+    X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
+    preprocessor = DataPreprocessor().build_pipeline(X_train, task_type, native_categorical=native_categorical)
+    Xt_train = preprocessor.fit_transform(X_train, y.iloc[train_idx])
+    return Xt_train, preprocessor.transform(X_val), time.time() - start_time, DataPreprocessor.encoding_plan(preprocessor)
+
 class Trainer:
     def __init__(self, experiment_name: str = "One_Click_Experiment"):
         mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
         mlflow.set_experiment(experiment_name)
 
-    def train(self, df: pd.DataFrame, target: str, task_type: str, model_id: str):
+    @staticmethod
+    def split(df: pd.DataFrame, target: str):
+        return split_features(df, target)
+
+    @staticmethod
+    def evaluate(task_type: str, y_test, y_pred) -> Dict[str, float]:
+        metrics = {}
+        if task_type == "classification":
+            metrics["accuracy"] = accuracy_score(y_test, y_pred)
+            metrics["f1"] = f1_score(y_test, y_pred, average='weighted')
+        else:
+            metrics["mse"] = mean_squared_error(y_test, y_pred)
+            metrics["r2"] = r2_score(y_test, y_pred)
+        return metrics
+
+    @staticmethod
+    def ranking_metric(task_type: str) -> str:
+        """Metric used to order candidates; higher is better for both."""
+        return "accuracy" if task_type == "classification" else "r2"
+
+    def train(
+        self,
+        df: pd.DataFrame,
+        target: str,
+        task_type: str,
+        model_id: str,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        preprocessor: Optional[Any] = None,
+        return_pipeline: bool = False
+    ):
+        """
+        Fits and registers one model. A preprocessor already fitted on this split's training
+        rows (e.g. by the DVC preprocessing stage) is reused instead of being refitted.
+        With return_pipeline, the fitted pipeline is also returned under "pipeline", for
+        in-process callers that would otherwise load it back from MLflow.
+        """
+        report = progress_callback or (lambda fraction, message: None)
         start_time = time.time()
+        report(0.05, "Splitting data")
+        X_train, X_test, y_train, y_test = self.split(df, target)
+
+        # Model, with its threads set explicitly from the training CPU budget
+        model = limit_model_threads(ModelSelector.get_model(model_id), split_cpu_budget(1, settings.TRAINING_MAX_CPUS)[1])
+
+        with mlflow.start_run() as run:
+            # Train; the two steps are fitted separately so each gets its own stage timing
+            if preprocessor is None:
+                report(0.1, "Fitting preprocessing")
+                preprocessor = DataPreprocessor().build_pipeline(
+                    X_train, task_type, native_categorical=ModelSelector.uses_native_categorical(model_id)
+                )
+                with stage_metrics.timer("preprocess_fit"):
+                    Xt_train = preprocessor.fit_transform(X_train, y_train)
+            else:
+                Xt_train = preprocessor.transform(X_train)
+            report(0.2, f"Fitting {model_id}")
+            fit_start = time.time()
+            with stage_metrics.timer("model_fit"):
+                model.fit(Xt_train, y_train)
+            mlflow.log_metric("fit_time", time.time() - fit_start)
+            mlflow.log_metrics(self._training_shape(Xt_train, y_train, task_type).to_metrics())
+
+            # Full Pipeline
+            full_pipeline = Pipeline(steps=[
+                ('preprocessor', preprocessor),
+                ('model', model)
+            ])
+
+            # Predictions
+            report(0.7, "Evaluating")
+            y_pred = full_pipeline.predict(X_test)
+
+            # Metrics
+            metrics = self.evaluate(task_type, y_test, y_pred)
+
+            duration = time.time() - start_time
+            report(0.8, "Logging model to MLflow")
+            result = self._log_run(run, full_pipeline, model_id, task_type, metrics, duration, parity_sample=X_test)
+        if return_pipeline:
+            result["pipeline"] = full_pipeline
+        return result
+
+    def train_all(
+        self,
+        df: pd.DataFrame,
+        target: str,
+        task_type: str,
+        model_ids: Optional[List[str]] = None,
+        max_cpus: Optional[int] = None,
+        profile: Optional[DatasetProfile] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Trains several models on one shared split and preprocessing fit, in parallel,
+        and returns them as a ranked leaderboard.
+        """
+        report = progress_callback or (lambda fraction, message: None)
+        start_time = time.time()
+        if not model_ids:
+            model_ids = ModelSuggester.default_model_ids(df, target, task_type, profile=profile)
+
+        report(0.05, "Splitting data")
+        X_train, X_test, y_train, y_test = self.split(df, target)
+
+        # Fit and apply the preprocessing once for every candidate; models with native categorical
+        # splits share a second, native encoding
+        report(0.1, "Fitting shared preprocessing")
+        native_flags = {model_id: ModelSelector.uses_native_categorical(model_id) for model_id in model_ids}
+        encodings = {}
+        for native_categorical in sorted(set(native_flags.values())):
+            preprocessor = DataPreprocessor().build_pipeline(X_train, task_type, native_categorical=native_categorical)
+            with stage_metrics.timer("preprocess_fit"):
+                Xt_train = preprocessor.fit_transform(X_train, y_train)
+            encodings[native_categorical] = (preprocessor, Xt_train, preprocessor.transform(X_test))
+        preprocessing_time = time.time() - start_time
+
+        # Candidates run side by side; each gets an equal share of the cores for its own threads
+        n_parallel, n_threads = split_cpu_budget(len(model_ids), max_cpus)
+        report(0.2, f"Fitting {len(model_ids)} models ({n_parallel} in parallel, {n_threads} threads each)")
+        with parallel_config(backend="loky", inner_max_num_threads=n_threads):
+            fitted = Parallel(n_jobs=n_parallel)(
+                delayed(_fit_candidate)(model_id, encodings[native_flags[model_id]][1], y_train, n_threads)
+                for model_id in model_ids
+            )
+
+        leaderboard = []
+        ranking_metric = self.ranking_metric(task_type)
+        with mlflow.start_run(run_name="leaderboard") as parent_run:
+            for i, (model_id, model, fit_time, error) in enumerate(fitted):
+                # Fits ran in joblib workers, so their timings are recorded here
+                stage_metrics.observe("model_fit", fit_time)
+                report(0.7 + 0.25 * i / len(fitted), f"Evaluating and logging {model_id}")
+                if error is not None:
+                    leaderboard.append({"model_id": model_id, "error": error, "fit_time": fit_time})
+                    continue
+
+                preprocessor, Xt_train, Xt_test = encodings[native_flags[model_id]]
+                metrics = self.evaluate(task_type, y_test, model.predict(Xt_test))
+                full_pipeline = Pipeline(steps=[
+                    ('preprocessor', preprocessor),
+                    ('model', model)
+                ])
+                with mlflow.start_run(nested=True) as run:
+                    mlflow.log_metric("fit_time", fit_time)
+                    mlflow.log_metrics(self._training_shape(Xt_train, y_train, task_type).to_metrics())
+                    result = self._log_run(
+                        run, full_pipeline, model_id, task_type, metrics, preprocessing_time + fit_time, parity_sample=X_test
+                    )
+                result["fit_time"] = fit_time
+                leaderboard.append(result)
+
+            leaderboard.sort(key=lambda r: r.get("metrics", {}).get(ranking_metric, float("-inf")), reverse=True)
+            for rank, entry in enumerate(leaderboard, start=1):
+                entry["rank"] = rank
+
+            duration = time.time() - start_time
+            mlflow.log_params({"task_type": task_type, "candidates": ",".join(model_ids), "n_parallel": n_parallel, "n_threads": n_threads})
+            mlflow.log_metric("duration", duration)
+            mlflow.log_metric("preprocessing_time", preprocessing_time)
+            mlflow.log_dict({"leaderboard": leaderboard}, "leaderboard.json")
+
+        return {
+            "run_id": parent_run.info.run_id,
+            "ranking_metric": ranking_metric,
+            "leaderboard": leaderboard,
+            "best": leaderboard[0] if leaderboard and "error" not in leaderboard[0] else None,
+            "preprocessing_time": preprocessing_time,
+            "duration": duration
+        }
+
+    def tune(
+        self,
+        df: pd.DataFrame,
+        target: str,
+        task_type: str,
+        model_id: str,
+        budget_seconds: Optional[float] = None,
+        cpu_budget_seconds: Optional[float] = None,
+        n_candidates: int = 27,
+        eta: int = 3,
+        max_cpus: Optional[int] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Searches the model's hyperparameters with successive halving, then refits the best
+        configuration on the full training split and registers it like train(). The budgets
+        bound the search; no trial is started that would run past them.
+        """
+        report = progress_callback or (lambda fraction, message: None)
+        start_time = time.time()
+        report(0.02, "Splitting data")
+        X_train, X_test, y_train, y_test = self.split(df, target)
+        stratify = y_train if task_type == "classification" and y_train.value_counts().min() >= 2 else None
+        X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42, stratify=stratify)
+
+        # One preprocessing fit shared by every trial
+        report(0.05, "Fitting shared preprocessing")
+        native_categorical = ModelSelector.uses_native_categorical(model_id)
+        preprocessor = DataPreprocessor().build_pipeline(X_fit, task_type, native_categorical=native_categorical)
+        with stage_metrics.timer("preprocess_fit"):
+            Xt_fit = preprocessor.fit_transform(X_fit, y_fit)
+        Xt_val = preprocessor.transform(X_val)
+
+        score_fn = accuracy_score if task_type == "classification" else r2_score
+        search = SuccessiveHalvingSearch(
+            model_id, task_type, score_fn,
+            n_candidates=n_candidates, eta=eta,
+            budget_seconds=budget_seconds, cpu_budget_seconds=cpu_budget_seconds,
+            max_cpus=max_cpus
+        )
+
+        with mlflow.start_run(run_name=f"tune_{model_id}") as run:
+            client = mlflow.tracking.MlflowClient()
+            trial_runs = {}
+
+            def log_rung(rung: int, fraction: float, trials: List[Dict[str, Any]]):
+                report(0.1 + 0.7 * min(fraction, 1.0), f"Rung {rung}: {len(trials)} trials on {fraction:.0%} of the data")
+                for trial in trials:
+                    if trial["trial"] not in trial_runs:
+                        # One nested run per trial; later rungs add steps to its metrics
+                        with mlflow.start_run(run_name=f"trial_{trial['trial']}", nested=True) as trial_run:
+                            mlflow.log_params(trial["params"])
+                        trial_runs[trial["trial"]] = trial_run.info.run_id
+                    trial_run_id = trial_runs[trial["trial"]]
+                    if np.isfinite(trial["scores"][-1]):
+                        client.log_metric(trial_run_id, "val_score", trial["scores"][-1], step=rung)
+                    client.log_metric(trial_run_id, "train_fraction", fraction, step=rung)
+                    client.log_metric(trial_run_id, "fit_time", trial["fit_times"][-1], step=rung)
+                    if "error" in trial:
+                        client.set_tag(trial_run_id, "error", trial["error"][:500])
+
+            # Trials on the same rung reuse one quantized matrix (XGBoost)
+            with reuse_matrices():
+                search_result = search.run(Xt_fit, y_fit, Xt_val, y_val, on_rung=log_rung)
+
+            # Refit the winner with its own preprocessing on the whole training split
+            report(0.85, "Refitting best configuration")
+            model = ModelSelector.get_model(model_id).set_params(**search_result["best_params"])
+            model = limit_model_threads(model, split_cpu_budget(1, max_cpus)[1])
+            full_pipeline = Pipeline(steps=[
+                ('preprocessor', DataPreprocessor().build_pipeline(X_train, task_type, native_categorical=native_categorical)),
+                ('model', model)
+            ])
+            full_pipeline.fit(X_train, y_train)
+            metrics = self.evaluate(task_type, y_test, full_pipeline.predict(X_test))
+
+            duration = time.time() - start_time
+            report(0.95, "Logging model to MLflow")
+            mlflow.log_params({f"best_{k}": v for k, v in search_result["best_params"].items()})
+            mlflow.log_metrics({"best_val_score": search_result["best_score"], "search_cpu_seconds": search_result["cpu_seconds"]})
+            result = self._log_run(run, full_pipeline, model_id, task_type, metrics, duration, parity_sample=X_test)
+
+        result["tuning"] = search_result
+        return result
+
+    def screen(
+        self,
+        df: pd.DataFrame,
+        target: str,
+        task_type: str,
+        model_ids: Optional[List[str]] = None,
+        fractions: tuple = (0.01, 0.05, 0.2),
+        max_cpus: Optional[int] = None,
+        profile: Optional[DatasetProfile] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Picks a model by progressive sampling: candidates are fitted on nested stratified samples
+        of the training split, dominated ones are dropped after each sample, and only the winner
+        is fitted on the full training split and registered like train().
+        """
+        report = progress_callback or (lambda fraction, message: None)
+        start_time = time.time()
+        if not model_ids:
+            model_ids = ModelSuggester.default_model_ids(df, target, task_type, profile=profile)
+        report(0.02, "Splitting data")
+        X_train, X_test, y_train, y_test = self.split(df, target)
+        stratify = y_train if task_type == "classification" and y_train.value_counts().min() >= 2 else None
+        X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42, stratify=stratify)
+
+        score_fn = accuracy_score if task_type == "classification" else r2_score
+        screening = ProgressiveScreening(model_ids, task_type, score_fn, fractions=fractions, max_cpus=max_cpus)
+        largest, samples = screening.samples(y_fit)
+        X_sample, y_sample = X_fit.iloc[largest], y_fit.iloc[largest]
+
+        # Screening preprocessing is fitted on the largest sample only; the winner gets its own full fit
+        report(0.05, f"Fitting screening preprocessing on {len(largest)} rows")
+        preprocessor = DataPreprocessor().build_pipeline(X_sample, task_type)
+        with stage_metrics.timer("preprocess_fit"):
+            Xt_sample = preprocessor.fit_transform(X_sample, y_sample)
+        Xt_val = preprocessor.transform(X_val)
+
+        with mlflow.start_run(run_name="screening") as run:
+            client = mlflow.tracking.MlflowClient()
+            candidate_runs = {}
+
+            def log_step(step: int, n_rows: int, candidates: List[Dict[str, Any]]):
+                report(0.1 + 0.6 * (step + 1) / len(samples), f"Sample {step + 1}/{len(samples)}: {len(candidates)} models on {n_rows} rows")
+                for candidate in candidates:
+                    model_id = candidate["model_id"]
+                    stage_metrics.observe("model_fit", candidate["fit_times"][-1])
+                    if model_id not in candidate_runs:
+                        # One nested run per candidate; each sample adds a step to its metrics
+                        with mlflow.start_run(run_name=f"screen_{model_id}", nested=True) as candidate_run:
+                            mlflow.log_params({"model_id": model_id, "task_type": task_type})
+                        candidate_runs[model_id] = candidate_run.info.run_id
+                    candidate_run_id = candidate_runs[model_id]
+                    if candidate["scores"][-1] is not None:
+                        client.log_metric(candidate_run_id, "val_score", candidate["scores"][-1], step=step)
+                    client.log_metric(candidate_run_id, "sample_rows", n_rows, step=step)
+                    client.log_metric(candidate_run_id, "fit_time", candidate["fit_times"][-1], step=step)
+                    if "error" in candidate:
+                        client.set_tag(candidate_run_id, "error", candidate["error"][:500])
+
+            screening_result = screening.run(Xt_sample, y_sample, Xt_val, y_val, samples, on_step=log_step)
+            for candidate in screening_result["candidates"]:
+                if candidate["model_id"] in candidate_runs:
+                    client.set_tag(candidate_runs[candidate["model_id"]], "screening_status", candidate["status"])
+
+            # Only the winner sees the full training split
+            winner = screening_result["winner"]
+            report(0.75, f"Fitting {winner} on the full training split")
+            full_preprocessor = DataPreprocessor().build_pipeline(
+                X_train, task_type, native_categorical=ModelSelector.uses_native_categorical(winner)
+            )
+            with stage_metrics.timer("preprocess_fit"):
+                Xt_train = full_preprocessor.fit_transform(X_train, y_train)
+            model = limit_model_threads(ModelSelector.get_model(winner), split_cpu_budget(1, max_cpus)[1])
+            fit_start = time.time()
+            with stage_metrics.timer("model_fit"):
+                model.fit(Xt_train, y_train)
+            mlflow.log_metric("fit_time", time.time() - fit_start)
+            mlflow.log_metrics(self._training_shape(Xt_train, y_train, task_type).to_metrics())
+            full_pipeline = Pipeline(steps=[
+                ('preprocessor', full_preprocessor),
+                ('model', model)
+            ])
+            metrics = self.evaluate(task_type, y_test, full_pipeline.predict(X_test))
+
+            duration = time.time() - start_time
+            report(0.9, "Logging model to MLflow")
+            mlflow.log_params({"candidates": ",".join(model_ids), "screening_samples": ",".join(map(str, screening_result["sample_rows"]))})
+            mlflow.log_metrics({"winner_val_score": screening_result["winner_score"], "screening_seconds": screening_result["wall_seconds"]})
+            mlflow.log_dict(screening_result, "screening.json")
+            result = self._log_run(run, full_pipeline, winner, task_type, metrics, duration, parity_sample=X_test)
+
+        result["screening"] = screening_result
+        return result
+
+    def cross_validate(
+        self,
+        df: pd.DataFrame,
+        target: str,
+        task_type: str,
+        model_ids: Optional[List[str]] = None,
+        n_splits: int = 5,
+        max_cpus: Optional[int] = None,
+        profile: Optional[DatasetProfile] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        K-fold cross-validation (stratified for classification) of several models. Each fold's
+        preprocessing is fitted once and reused by every model; all (model, fold) fits run in parallel.
+        """
+        report = progress_callback or (lambda fraction, message: None)
+        start_time = time.time()
+        if not model_ids:
+            model_ids = ModelSuggester.default_model_ids(df, target, task_type, profile=profile)
         X = df.drop(columns=[target])
         y = df[target]
 
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if task_type == "classification" and y.value_counts().min() >= n_splits:
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        else:
+            splitter = KFold(n_splits=n_splits, shuffle=True, random_state=42)
+        splits = list(splitter.split(X, y))
+
+        # Fold cache: transformed matrices per fold (and encoding), shared by all candidate models
+        report(0.05, f"Fitting preprocessing for {n_splits} folds")
+        native_flags = {model_id: ModelSelector.uses_native_categorical(model_id) for model_id in model_ids}
+        encodings = sorted(set(native_flags.values()))
+        n_parallel, _ = split_cpu_budget(n_splits * len(encodings), max_cpus)
+        fitted_folds = Parallel(n_jobs=n_parallel)(
+            delayed(_preprocess_fold)(X, y, train_idx, val_idx, task_type, native_categorical)
+            for native_categorical in encodings for train_idx, val_idx in splits
+        )
+        folds = {
+            native_categorical: fitted_folds[i * n_splits:(i + 1) * n_splits]
+            for i, native_categorical in enumerate(encodings)
+        }
+        for fold in fitted_folds:
+            stage_metrics.observe("preprocess_fit", fold[2])
+
+        tasks = [(model_id, fold) for model_id in model_ids for fold in range(n_splits)]
+        n_parallel, n_threads = split_cpu_budget(len(tasks), max_cpus)
+        report(0.2, f"Fitting {len(tasks)} model/fold pairs ({n_parallel} in parallel, {n_threads} threads each)")
+        with parallel_config(backend="loky", inner_max_num_threads=n_threads):
+            fold_results = Parallel(n_jobs=n_parallel)(
+                delayed(_fit_fold)(
+                    model_id, fold, folds[native_flags[model_id]][fold][0], y.iloc[splits[fold][0]],
+                    folds[native_flags[model_id]][fold][1], y.iloc[splits[fold][1]], task_type, n_threads
+                )
+                for model_id, fold in tasks
+            )
+
+        report(0.9, "Aggregating and logging")
+        ranking_metric = self.ranking_metric(task_type)
+        results = []
+        with mlflow.start_run(run_name="cross_validation") as parent_run:
+            for model_id in model_ids:
+                model_folds = [r for r in fold_results if r["model_id"] == model_id]
+                for r in model_folds:
+                    r["preprocess_time"] = folds[native_flags[model_id]][r["fold"]][2]
+                    stage_metrics.observe("model_fit", r["fit_time"])
+                errors = [r["error"] for r in model_folds if "error" in r]
+                entry = {"model_id": model_id, "folds": model_folds}
+                if errors:
+                    entry["error"] = errors[0]
+                else:
+                    scores = pd.DataFrame([r["metrics"] for r in model_folds])
+                    entry["metrics_mean"] = scores.mean().to_dict()
+                    entry["metrics_std"] = scores.std(ddof=1).fillna(0.0).to_dict()
+                    entry["fit_time_mean"] = float(np.mean([r["fit_time"] for r in model_folds]))
 
-        # Preprocessing
-        preprocessor_obj = DataPreprocessor()
-        preprocessor = preprocessor_obj.build_pipeline(X_train)
-        
-        # Model
+                with mlflow.start_run(run_name=f"cv_{model_id}", nested=True):
+                    mlflow.log_params({"model_id": model_id, "task_type": task_type, "n_splits": n_splits})
+                    for r in model_folds:
+                        mlflow.log_metric("fold_fit_time", r["fit_time"], step=r["fold"])
+                        mlflow.log_metric("fold_preprocess_time", r["preprocess_time"], step=r["fold"])
+                        for name, value in r.get("metrics", {}).items():
+                            mlflow.log_metric(f"fold_{name}", value, step=r["fold"])
+                    if not errors:
+                        mlflow.log_metrics({f"{k}_mean": v for k, v in entry["metrics_mean"].items()})
+                        mlflow.log_metrics({f"{k}_std": v for k, v in entry["metrics_std"].items()})
+                    else:
+                        mlflow.set_tag("error", entry["error"][:500])
+                results.append(entry)
+
+            results.sort(key=lambda r: r.get("metrics_mean", {}).get(ranking_metric, float("-inf")), reverse=True)
+            for rank, entry in enumerate(results, start=1):
+                entry["rank"] = rank
+
+            duration = time.time() - start_time
+            mlflow.log_params({"task_type": task_type, "candidates": ",".join(model_ids), "n_splits": n_splits})
+            mlflow.log_metric("duration", duration)
+            mlflow.log_dict(
+                {f"fold_{i}": fold[3] for i, fold in enumerate(folds[encodings[0]])}, "encoding_plan.json"
+            )
+
+        return {
+            "run_id": parent_run.info.run_id,
+            "n_splits": n_splits,
+            "ranking_metric": ranking_metric,
+            "results": results,
+            "duration": duration
+        }
+
+    def train_streaming(
+        self,
+        path: str,
+        target: str,
+        task_type: str,
+        model_id: str,
+        batch_rows: Optional[int] = None,
+        n_epochs: Optional[int] = None,
+        test_size: float = 0.2,
+        progress_callback: Optional[Callable[[float, str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Trains a partial_fit-capable model on a Feather file without loading it whole.
+        A first pass over the training rows fits the preprocessing statistics, then each
+        epoch streams them batch by batch into partial_fit, and a last pass scores the
+        held-out rows. Only one batch is in memory at a time.
+        """
+        report = progress_callback or (lambda fraction, message: None)
+        start_time = time.time()
+        batch_rows = batch_rows or settings.STREAMING_BATCH_ROWS
+        n_epochs = n_epochs or settings.STREAMING_EPOCHS
         model = ModelSelector.get_model(model_id)
+        if not hasattr(model, "partial_fit"):
+            raise ValueError(f"Model '{model_id}' cannot be trained incrementally.")
+
+        def train_batches():
+            for offset, batch in iter_frames(path, batch_rows):
+                batch = batch[batch[target].notna() & ~holdout_mask(offset, len(batch), test_size)]
+                if len(batch):
+                    yield batch.drop(columns=[target]), batch[target]
+
+        # Pass 1: preprocessing statistics and the class list partial_fit needs up front
+        report(0.02, "Fitting preprocessing statistics")
+        preprocessor = None
+        classes = set()
+        target_stats = StreamingPreprocessor([target], [])
+        n_train = 0
+        preprocess_start = time.time()
+        for X, y in train_batches():
+            if preprocessor is None:
+                preprocessor = StreamingPreprocessor(
+                    list(X.select_dtypes(include=['number']).columns),
+                    list(X.select_dtypes(include=['object', 'category']).columns),
+                    max_categories=settings.ONEHOT_MAX_CATEGORIES
+                )
+            preprocessor.partial_fit(X)
+            if task_type == "classification":
+                classes.update(y.unique().tolist())
+            else:
+                target_stats.partial_fit(y.to_frame())
+            n_train += len(y)
+        if preprocessor is None:
+            raise ValueError("No training rows in the dataset.")
+        stage_metrics.observe("preprocess_fit", time.time() - preprocess_start)
+        if task_type != "classification":
+            model = ScaledTargetRegressor(model, float(target_stats.mean_[0]), float(target_stats.scale_[0]))
 
-        # Full Pipeline
+        fit_kwargs = {"classes": np.array(sorted(classes))} if task_type == "classification" else {}
+        with stage_metrics.timer("model_fit"):
+            for epoch in range(n_epochs):
+                report(0.1 + 0.75 * epoch / n_epochs, f"Epoch {epoch + 1}/{n_epochs}")
+                for X, y in train_batches():
+                    model.partial_fit(preprocessor.transform(X), y, **fit_kwargs)
+
+        report(0.85, "Evaluating on the held-out stream")
         full_pipeline = Pipeline(steps=[
             ('preprocessor', preprocessor),
             ('model', model)
         ])
+        scores = StreamingMetrics(task_type)
+        for offset, batch in iter_frames(path, batch_rows):
+            batch = batch[batch[target].notna() & holdout_mask(offset, len(batch), test_size)]
+            if len(batch):
+                scores.update(batch[target], full_pipeline.predict(batch.drop(columns=[target])))
+        metrics = scores.result()
 
-        with mlflow.start_run() as run:
-            # Train
-            full_pipeline.fit(X_train, y_train)
-            
-            # Predictions
-            y_pred = full_pipeline.predict(X_test)
-            
-            # Metrics
-            metrics = {}
-            if task_type == "classification":
-                metrics["accuracy"] = accuracy_score(y_test, y_pred)
-                metrics["f1"] = f1_score(y_test, y_pred, average='weighted')
-            else:
-                metrics["mse"] = mean_squared_error(y_test, y_pred)
-                metrics["r2"] = r2_score(y_test, y_pred)
-
+        with mlflow.start_run(run_name=f"stream_{model_id}") as run:
             duration = time.time() - start_time
+            report(0.95, "Logging model to MLflow")
+            mlflow.log_params({"batch_rows": batch_rows, "n_epochs": n_epochs, "n_train_rows": n_train, "n_test_rows": scores.n})
+            result = self._log_run(
+                run, full_pipeline, model_id, task_type, metrics, duration,
+                encoding_plan=preprocessor.encoding_plan()
+            )
+        result["streaming"] = {"n_train_rows": n_train, "n_test_rows": scores.n, "n_epochs": n_epochs}
+        return result
+
+    @staticmethod
+    def _training_shape(Xt_train: Any, y_train: pd.Series, task_type: str) -> DataShape:
+        """Shape of the fitted matrix; logged with the fit time, it calibrates the cost model behind model suggestions."""
+        n_classes = y_train.nunique() if task_type == "classification" else 1
+        return DataShape.from_matrix(Xt_train, n_classes)
+
+    def _log_run(
+        self, run, full_pipeline: Pipeline, model_id: str, task_type: str, metrics: Dict[str, float], duration: float,
+        encoding_plan: Optional[Dict[str, str]] = None, parity_sample: Optional[pd.DataFrame] = None
+    ):
+        with stage_metrics.timer("mlflow_log"):
             # Logging
             mlflow.log_params({"model_id": model_id, "task_type": task_type})
             mlflow.log_metrics(metrics)
             mlflow.log_metric("duration", duration)
-            
+            model = full_pipeline.named_steps['model']
+            if hasattr(model, "best_iteration_"):
+                # Boosting round kept by early stopping
+                mlflow.log_metric("best_iteration", model.best_iteration_)
+            if encoding_plan is None:
+                encoding_plan = DataPreprocessor.encoding_plan(full_pipeline.named_steps['preprocessor'])
+            mlflow.log_dict(encoding_plan, "encoding_plan.json")
+            plan_status = self._export_inference_plan(full_pipeline, parity_sample) if parity_sample is not None else None
+            self._export_mapped_model(full_pipeline, parity_sample)
+
             # Log Model and Register
             model_info = mlflow.sklearn.log_model(
                 sk_model=full_pipeline,
@@ -66,10 +639,167 @@ class Trainer:
                 registered_model_name=f"Model_{model_id}"
             )
 
-            return {
-                "run_id": run.info.run_id,
-                "model_id": model_id,
-                "metrics": metrics,
-                "duration": duration,
-                "model_uri": model_info.model_uri
-            }
+        return {
+            "run_id": run.info.run_id,
+            "model_id": model_id,
+            "metrics": metrics,
+            "duration": duration,
+            "model_uri": model_info.model_uri,
+            "inference_plan": plan_status
+        }
+
+    @staticmethod
+    def _export_inference_plan(full_pipeline: Pipeline, X_sample: pd.DataFrame) -> str:
+        """Logs the NumPy inference plan of a linear pipeline, only if it reproduces Pipeline.predict on X_sample."""
+        plan = InferencePlan.from_pipeline(full_pipeline)
+        if plan is None:
+            status = "unsupported"
+        else:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, PLAN_ARTIFACT)
+                plan.save(path)
+                # Check the reloaded plan, i.e. exactly what Predictor will run
+                if InferencePlan.load(path).matches(full_pipeline, X_sample):
+                    mlflow.log_artifact(path)
+                    status = "compiled"
+                else:
+                    status = "parity_failed"
+        mlflow.set_tag("inference_plan", status)
+        return status
+
+    @staticmethod
+    def _export_mapped_model(full_pipeline: Pipeline, X_sample: Optional[pd.DataFrame]) -> str:
+        """
+        Logs the pipeline as an uncompressed joblib file that the model cache memory-maps.
+        Tree ensembles are stored as a MappedForest, only if it reproduces Pipeline.predict on X_sample.
+        """
+        compiled = model_artifact.compile_pipeline(full_pipeline)
+        if compiled is full_pipeline:
+            status = "pipeline"
+        elif X_sample is not None and InferencePlan.same_predictions(
+            compiled.predict(X_sample), full_pipeline.predict(X_sample), regression=not hasattr(full_pipeline, "classes_")
+        ):
+            status = "mapped_forest"
+        else:
+            compiled, status = full_pipeline, "parity_failed"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, model_artifact.ARTIFACT_NAME)
+            model_artifact.save(compiled, path)
+            mlflow.log_artifact(path)
+        mlflow.set_tag("mapped_model", status)
+        return status
+
+def train_project(
+    project_id: str,
+    target: str,
+    task_type: str,
+    model_id: str,
+    experiment_name: str = settings.MLFLOW_EXPERIMENT_NAME,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+):
+    """Job entry point: loads a project's dataset and trains one model on it."""
+    trainer = Trainer(experiment_name=experiment_name)
+    result = trainer.train(_load_project_dataset(project_id), target, task_type, model_id, progress_callback=progress_callback)
+    _calibrate_cost_model()
+    return result
+
+def train_project_all(
+    project_id: str,
+    target: str,
+    task_type: str,
+    model_ids: Optional[List[str]] = None,
+    experiment_name: str = settings.MLFLOW_EXPERIMENT_NAME,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+):
+    """Job entry point: trains a leaderboard of models on a project's dataset."""
+    trainer = Trainer(experiment_name=experiment_name)
+    df = _load_project_dataset(project_id)
+    result = trainer.train_all(
+        df, target, task_type, model_ids, max_cpus=settings.TRAINING_MAX_CPUS,
+        profile=_suggestion_profile(project_id, df, model_ids), progress_callback=progress_callback
+    )
+    _calibrate_cost_model()
+    return result
+
+def tune_project(
+    project_id: str,
+    target: str,
+    task_type: str,
+    model_id: str,
+    budget_seconds: Optional[float] = None,
+    experiment_name: str = settings.MLFLOW_EXPERIMENT_NAME,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+):
+    """Job entry point: tunes one model's hyperparameters on a project's dataset."""
+    trainer = Trainer(experiment_name=experiment_name)
+    return trainer.tune(
+        _load_project_dataset(project_id), target, task_type, model_id,
+        budget_seconds=budget_seconds, max_cpus=settings.TRAINING_MAX_CPUS, progress_callback=progress_callback
+    )
+
+def screen_project(
+    project_id: str,
+    target: str,
+    task_type: str,
+    model_ids: Optional[List[str]] = None,
+    experiment_name: str = settings.MLFLOW_EXPERIMENT_NAME,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+):
+    """Job entry point: picks a model for a project's dataset by progressive-sampling screening."""
+    trainer = Trainer(experiment_name=experiment_name)
+    df = _load_project_dataset(project_id)
+    result = trainer.screen(
+        df, target, task_type, model_ids, max_cpus=settings.TRAINING_MAX_CPUS,
+        profile=_suggestion_profile(project_id, df, model_ids), progress_callback=progress_callback
+    )
+    _calibrate_cost_model()
+    return result
+
+def cross_validate_project(
+    project_id: str,
+    target: str,
+    task_type: str,
+    model_ids: Optional[List[str]] = None,
+    n_splits: int = 5,
+    experiment_name: str = settings.MLFLOW_EXPERIMENT_NAME,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+):
+    """Job entry point: cross-validates models on a project's dataset."""
+    trainer = Trainer(experiment_name=experiment_name)
+    df = _load_project_dataset(project_id)
+    return trainer.cross_validate(
+        df, target, task_type, model_ids, n_splits, max_cpus=settings.TRAINING_MAX_CPUS,
+        profile=_suggestion_profile(project_id, df, model_ids), progress_callback=progress_callback
+    )
+
+def train_project_streaming(
+    project_id: str,
+    target: str,
+    task_type: str,
+    model_id: str,
+    experiment_name: str = settings.MLFLOW_EXPERIMENT_NAME,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+):
+    """Job entry point: trains one model on a project's dataset in streaming batches."""
+    path = StorageManager.ensure_dataset(project_id)
+    if path is None:
+        raise FileNotFoundError(f"Dataset for project '{project_id}' not found.")
+    trainer = Trainer(experiment_name=experiment_name)
+    return trainer.train_streaming(path, target, task_type, model_id, progress_callback=progress_callback)
+
+def _calibrate_cost_model():
+    try:
+        CostModel.calibrate_if_stale(settings.COST_MODEL_CALIBRATION_INTERVAL_SECONDS)
+    except Exception:
+        # The previous calibration (or the defaults) stays in use; the model is trained either way
+        pass
+
+def _suggestion_profile(project_id: str, df: pd.DataFrame, model_ids: Optional[List[str]]) -> Optional[DatasetProfile]:
+    # Default candidates are chosen from the profile stored at upload rather than a fresh scan of df
+    return None if model_ids else DatasetProfile.for_project(project_id, df)
+
+def _load_project_dataset(project_id: str) -> pd.DataFrame:
+    df = StorageManager.load_dataset(project_id)
+    if df is None:
+        raise FileNotFoundError(f"Dataset for project '{project_id}' not found.")
+    return df
@@ -0,0 +1,325 @@
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, parallel_config
+from sklearn.model_selection import train_test_split
+from src.cpu_budget import split_cpu_budget, limit_model_threads
+from src.model_selector import ModelSelector
+
+def sample_config(space: Dict[str, tuple], rng: np.random.Generator) -> Dict[str, Any]:
+    """Draws one configuration from a ModelSelector search space."""
+    config = {}
+    for name, spec in space.items():
+        kind = spec[0]
+        if kind == "int":
+            config[name] = int(rng.integers(spec[1], spec[2] + 1))
+        elif kind == "float":
+            config[name] = float(rng.uniform(spec[1], spec[2]))
+        elif kind == "log":
+            config[name] = float(math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2]))))
+        elif kind == "choice":
+            config[name] = spec[1][int(rng.integers(len(spec[1])))]
+        else:
+            raise ValueError(f"Unknown search space type '{kind}' for '{name}'.")
+    return config
+
+def _run_trial(
+    model_id: str,
+    config: Dict[str, Any],
+    X_train: Any,
+    y_train: pd.Series,
+    X_val: Any,
+    y_val: pd.Series,
+    score_fn: Callable,
+    n_threads: int
+):
+    """Fits one configuration on a (sub)sample and scores it on the validation split (runs in a joblib worker)."""
+    wall_start, cpu_start = time.time(), time.process_time()
+    try:
+        model = limit_model_threads(ModelSelector.get_model(model_id).set_params(**config), n_threads)
+        model.fit(X_train, y_train)
+        score, error = score_fn(y_val, model.predict(X_val)), None
+    except Exception as e:
+        score, error = float("-inf"), f"{type(e).__name__}: {e}"
+    return score, time.time() - wall_start, time.process_time() - cpu_start, error
+
+def stratified_subsample(y: pd.Series, fraction: float, task_type: str, random_state: int = 42, min_rows: int = 50) -> np.ndarray:
+    """Sorted positions of a sample of about fraction of the rows, stratified by class for classification."""
+    n_rows = len(y)
+    if fraction >= 1.0:
+        return np.arange(n_rows)
+    size = max(int(n_rows * fraction), min(n_rows, min_rows))
+    if size >= n_rows:
+        return np.arange(n_rows)
+    stratify = None
+    if task_type == "classification" and y.value_counts().min() >= 2:
+        stratify = y
+    try:
+        indices, _ = train_test_split(np.arange(n_rows), train_size=size, stratify=stratify, random_state=random_state)
+    except ValueError:
+        indices, _ = train_test_split(np.arange(n_rows), train_size=size, random_state=random_state)
+    return np.sort(indices)
+
+class SuccessiveHalvingSearch:
+    """
+    Successive halving over training-set size: every configuration is tried on a small
+    sample, and only the best 1/eta move on to a sample eta times larger, until the
+    survivors see the full training data or the time budget runs out.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        task_type: str,
+        score_fn: Callable,
+        n_candidates: int = 27,
+        eta: int = 3,
+        min_fraction: Optional[float] = None,
+        budget_seconds: Optional[float] = None,
+        cpu_budget_seconds: Optional[float] = None,
+        max_cpus: Optional[int] = None,
+        random_state: int = 42
+    ):
+        self.model_id = model_id
+        self.task_type = task_type
+        self.score_fn = score_fn
+        self.n_candidates = n_candidates
+        self.eta = eta
+        # Enough rungs that the last survivors get the full data
+        n_rungs = max(1, int(math.floor(math.log(n_candidates, eta))) + 1)
+        self.min_fraction = min_fraction or 1.0 / eta ** (n_rungs - 1)
+        self.budget_seconds = budget_seconds
+        self.cpu_budget_seconds = cpu_budget_seconds
+        self.max_cpus = max_cpus
+        self.random_state = random_state
+        self.trials: List[Dict[str, Any]] = []
+
+    def _subsample(self, y: pd.Series, fraction: float) -> np.ndarray:
+        return stratified_subsample(y, fraction, self.task_type, self.random_state)
+
+    def run(
+        self,
+        X_train: Any,
+        y_train: pd.Series,
+        X_val: Any,
+        y_val: pd.Series,
+        on_rung: Optional[Callable[[int, float, List[Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
+        """Runs the search on already-transformed features and returns the best trial."""
+        rng = np.random.default_rng(self.random_state)
+        space = ModelSelector.get_search_space(self.model_id)
+        survivors = [
+            {"trial": i, "params": sample_config(space, rng), "scores": [], "fit_times": []}
+            for i in range(self.n_candidates)
+        ]
+        self.trials = list(survivors)
+
+        start_time = time.time()
+        cpu_seconds = 0.0
+        fraction = self.min_fraction
+        rung = 0
+        stopped_by_budget = False
+        while survivors:
+            indices = self._subsample(y_train, fraction)
+            X_rung = X_train[indices] if not isinstance(X_train, pd.DataFrame) else X_train.iloc[indices]
+            y_rung = y_train.iloc[indices]
+
+            # Trials start in waves of n_parallel so the budget is checked before each one is started
+            n_parallel, n_threads = split_cpu_budget(len(survivors), self.max_cpus)
+            evaluated = []
+            # Threads for models that release the GIL: trials then share the rung's data (and XGBoost its
+            # quantization); their thread counts are set on the model itself (limit_model_threads)
+            if ModelSelector.fits_in_threads(self.model_id):
+                backend = parallel_config(backend="threading")
+            else:
+                backend = parallel_config(backend="loky", inner_max_num_threads=n_threads)
+            with backend, Parallel(n_jobs=n_parallel) as parallel:
+                for first in range(0, len(survivors), n_parallel):
+                    wave = survivors[first:first + n_parallel]
+                    if (rung or first) and self._out_of_budget(start_time, cpu_seconds, wave, evaluated, fraction):
+                        stopped_by_budget = True
+                        break
+                    results = parallel(
+                        delayed(_run_trial)(self.model_id, t["params"], X_rung, y_rung, X_val, y_val, self.score_fn, n_threads)
+                        for t in wave
+                    )
+                    for trial, (score, fit_time, cpu_time, error) in zip(wave, results):
+                        trial["scores"].append(score)
+                        trial["fit_times"].append(fit_time)
+                        trial["last_rung"] = rung
+                        trial["last_fraction"] = fraction
+                        if error:
+                            trial["error"] = error
+                        cpu_seconds += cpu_time
+                    evaluated.extend(wave)
+
+            if not evaluated:
+                rung -= 1
+                break
+            if on_rung is not None:
+                on_rung(rung, fraction, evaluated)
+            if stopped_by_budget or fraction >= 1.0 or len(survivors) == 1:
+                break
+
+            survivors = sorted(survivors, key=lambda t: t["scores"][-1], reverse=True)
+            survivors = survivors[:max(1, len(survivors) // self.eta)]
+            fraction = min(1.0, fraction * self.eta)
+            rung += 1
+
+        # Best = highest score on the largest sample any trial reached
+        best = max(self.trials, key=lambda t: (t.get("last_fraction", 0.0), t["scores"][-1] if t["scores"] else float("-inf")))
+        if not np.isfinite(best["scores"][-1]):
+            errors = sorted({t["error"] for t in self.trials if "error" in t})
+            raise ValueError(f"Every trial of '{self.model_id}' failed: {'; '.join(errors[:3])}")
+        return {
+            "best_params": best["params"],
+            "best_score": best["scores"][-1],
+            "n_trials": len(self.trials),
+            "n_rungs": rung + 1,
+            "wall_seconds": time.time() - start_time,
+            "cpu_seconds": cpu_seconds,
+            "stopped_by_budget": stopped_by_budget
+        }
+
+    def _out_of_budget(
+        self,
+        start_time: float,
+        cpu_seconds: float,
+        wave: List[Dict[str, Any]],
+        evaluated: List[Dict[str, Any]],
+        fraction: float
+    ) -> bool:
+        """True once a budget is used up, or when the wave is expected to run past the wall-clock budget."""
+        if self.cpu_budget_seconds is not None and cpu_seconds >= self.cpu_budget_seconds:
+            return True
+        if self.budget_seconds is None:
+            return False
+        remaining = self.budget_seconds - (time.time() - start_time)
+        if evaluated:
+            # Trials already fitted on this sample
+            expected = float(np.median([t["fit_times"][-1] for t in evaluated]))
+        else:
+            # Fit time grows about linearly with the sample, so a promoted trial takes its last time scaled up
+            expected = max(
+                (t["fit_times"][-1] * fraction / t["last_fraction"] for t in wave if t["fit_times"]),
+                default=0.0
+            )
+        return remaining <= 0 or expected > remaining
+
+class ProgressiveScreening:
+    """
+    Screens several models on geometrically growing, nested stratified samples of the training
+    data. After each sample, a candidate is dropped when its learning curve is clearly dominated:
+    even if it kept improving at its latest rate (at least `tolerance` per step) over the remaining
+    samples, it would not reach the current leader's score. The winner is the best survivor on
+    the largest sample.
+    """
+
+    def __init__(
+        self,
+        model_ids: List[str],
+        task_type: str,
+        score_fn: Callable,
+        fractions: tuple = (0.01, 0.05, 0.2),
+        tolerance: float = 0.02,
+        min_rows: int = 1000,
+        max_cpus: Optional[int] = None,
+        random_state: int = 42
+    ):
+        self.model_ids = model_ids
+        self.task_type = task_type
+        self.score_fn = score_fn
+        self.fractions = sorted(fractions)
+        self.tolerance = tolerance
+        self.min_rows = min_rows
+        self.max_cpus = max_cpus
+        self.random_state = random_state
+        self.candidates: List[Dict[str, Any]] = []
+
+    def samples(self, y: pd.Series) -> tuple:
+        """
+        Positions of the largest sample in y, and the positions within it of every sample,
+        smallest first (each sample contains the smaller ones; the last is the whole largest sample).
+        """
+        largest = stratified_subsample(y, self.fractions[-1], self.task_type, self.random_state, self.min_rows)
+        y_largest = y.iloc[largest]
+        nested, sizes = [], set()
+        for fraction in self.fractions[:-1]:
+            size = max(int(len(y) * fraction), min(len(y), self.min_rows))
+            # Samples no smaller than the largest one (small datasets) collapse into it
+            if size < len(largest) and size not in sizes:
+                nested.append(stratified_subsample(y_largest, size / len(largest), self.task_type, self.random_state, self.min_rows))
+                sizes.add(size)
+        nested.append(np.arange(len(largest)))
+        return largest, nested
+
+    def run(
+        self,
+        X: Any,
+        y: pd.Series,
+        X_val: Any,
+        y_val: pd.Series,
+        samples: List[np.ndarray],
+        on_step: Optional[Callable[[int, int, List[Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
+        """Runs the screening on already-transformed features of the largest sample and returns the winner."""
+        survivors = [
+            {"model_id": model_id, "sample_rows": [], "scores": [], "fit_times": [], "status": "screening"}
+            for model_id in self.model_ids
+        ]
+        self.candidates = list(survivors)
+        start_time = time.time()
+        for step, indices in enumerate(samples):
+            X_step = X[indices] if not isinstance(X, pd.DataFrame) else X.iloc[indices]
+            y_step = y.iloc[indices]
+            n_parallel, n_threads = split_cpu_budget(len(survivors), self.max_cpus)
+            with parallel_config(backend="loky", inner_max_num_threads=n_threads):
+                results = Parallel(n_jobs=n_parallel)(
+                    delayed(_run_trial)(c["model_id"], {}, X_step, y_step, X_val, y_val, self.score_fn, n_threads)
+                    for c in survivors
+                )
+            for candidate, (score, fit_time, _, error) in zip(survivors, results):
+                candidate["sample_rows"].append(len(indices))
+                # None rather than -inf for failed fits, so the result stays valid JSON
+                candidate["scores"].append(score if not error else None)
+                candidate["fit_times"].append(fit_time)
+                if error:
+                    candidate["error"] = error
+                    candidate["status"] = "failed"
+            if on_step is not None:
+                on_step(step, len(indices), survivors)
+
+            survivors = [c for c in survivors if c["status"] != "failed"]
+            remaining = len(samples) - step - 1
+            if survivors and remaining:
+                leader = max(c["scores"][-1] for c in survivors)
+                for candidate in survivors:
+                    if self._ceiling(candidate, remaining) < leader:
+                        candidate["status"] = f"dominated after {len(indices)} rows"
+                survivors = [c for c in survivors if c["status"] == "screening"]
+            if len(survivors) <= 1:
+                break
+
+        if not survivors:
+            raise RuntimeError("Every candidate failed during screening.")
+        winner = max(survivors, key=lambda c: c["scores"][-1])
+        winner["status"] = "winner"
+        for candidate in survivors:
+            if candidate is not winner:
+                candidate["status"] = "runner-up"
+        return {
+            "winner": winner["model_id"],
+            "winner_score": winner["scores"][-1],
+            "candidates": self.candidates,
+            "sample_rows": [len(indices) for indices in samples],
+            "wall_seconds": time.time() - start_time
+        }
+
+    def _ceiling(self, candidate: Dict[str, Any], remaining: int) -> float:
+        # Optimistic extrapolation of the learning curve over the samples still to come
+        scores = candidate["scores"]
+        rate = scores[-1] - scores[-2] if len(scores) > 1 else 0.0
+        return scores[-1] + max(rate, self.tolerance) * remaining
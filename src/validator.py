@@ -1,5 +1,7 @@
 import pandas as pd
-from typing import Tuple, List
+import time
+from typing import Optional, Tuple, List
+from src.dataset_profile import DatasetProfile, DatasetProfiler
 
 class DataValidator:
     @staticmethod
@@ -25,10 +27,33 @@ class DataValidator:
         target_series = df[target].dropna()
         unique_count = target_series.nunique()
         is_numeric = pd.api.types.is_numeric_dtype(target_series)
-        
+        return DataValidator._task_alignment(target, task_type, unique_count, is_numeric, len(df))
+
+    @staticmethod
+    def validate_profile(profile: DatasetProfile) -> Tuple[bool, List[str]]:
+        """validate_dataset on a stored profile, without touching the data."""
+        errors = []
+        if profile.n_rows == 0 or profile.n_columns == 0:
+            errors.append("Dataset is empty.")
+
+        if profile.data["duplicate_column_names"]:
+            errors.append("Dataset contains duplicate columns.")
+
+        return len(errors) == 0, errors
+
+    @staticmethod
+    def validate_profile_task_alignment(profile: DatasetProfile, target: str, task_type: str) -> Tuple[bool, str]:
+        """validate_task_alignment from the target's profiled cardinality and kind."""
+        column = profile.column(target)
+        # Booleans count as numeric, as is_numeric_dtype has it
+        is_numeric = column["kind"] in ("numeric", "boolean")
+        return DataValidator._task_alignment(target, task_type, column["distinct"], is_numeric, profile.n_rows)
+
+    @staticmethod
+    def _task_alignment(target: str, task_type: str, unique_count: int, is_numeric: bool, n_rows: int) -> Tuple[bool, str]:
         if task_type == "classification":
             # If target is numeric but has too many unique values relative to rows, it might be regression
-            if is_numeric and unique_count > (len(df) * 0.2) and unique_count > 50:
+            if is_numeric and unique_count > (n_rows * 0.2) and unique_count > 50:
                 return False, f"Target column '{target}' has {unique_count} unique numeric values. Did you mean Regression? Classification usually works with discrete categories."
         
         elif task_type == "regression":
@@ -39,3 +64,38 @@ class DataValidator:
                 pass
 
         return True, ""
+
+class StreamingValidator:
+    """
+    Runs the DataValidator checks over chunks of a dataset that is never fully in memory.
+    The chunks build the dataset profile, which the checks then read.
+    """
+
+    def __init__(self, target: str, task_type: str):
+        self.target = target
+        self.task_type = task_type
+        self.profiler = DatasetProfiler()
+        self._profile: Optional[DatasetProfile] = None
+        # Time spent in update(), so callers can tell validation apart from parsing
+        self.seconds = 0.0
+
+    def update(self, chunk: pd.DataFrame):
+        start = time.perf_counter()
+        self.profiler.update(chunk)
+        self._profile = None
+        self.seconds += time.perf_counter() - start
+
+    @property
+    def profile(self) -> DatasetProfile:
+        if self._profile is None:
+            self._profile = self.profiler.result()
+        return self._profile
+
+    def validate_dataset(self) -> Tuple[bool, List[str]]:
+        return DataValidator.validate_profile(self.profile)
+
+    def check_target_exists(self) -> bool:
+        return self.profile.column(self.target) is not None
+
+    def validate_task_alignment(self) -> Tuple[bool, str]:
+        return DataValidator.validate_profile_task_alignment(self.profile, self.target, self.task_type)
@@ -0,0 +1,161 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin
+from sklearn.model_selection import train_test_split
+from src.cpu_budget import available_cpus
+
+# Fits with fewer validation rows than this train on everything, without early stopping
+MIN_VALIDATION_ROWS = 20
+
+# Inside reuse_matrices(), the matrices of the last fit, so consecutive fits on the same input
+# (tuning trials on one rung) reuse its quantization; one entry, so at most one dataset's are kept
+_matrix_cache: Dict[str, Any] = {"enabled": 0}
+_matrix_lock = threading.Lock()
+
+class _HistXGBoost(BaseEstimator):
+    """
+    XGBoost tuned for this pipeline: hist tree method trained from a QuantileDMatrix, native
+    splits on pandas categorical columns (see DataPreprocessor's native_categorical mode), and
+    early stopping on a validation split carved out of the training rows. n_estimators is the
+    upper bound on boosting rounds. nthread is set explicitly by the caller (limit_model_threads);
+    None means all available CPUs.
+    """
+
+    def __init__(
+        self,
+        n_estimators: int = 200,
+        learning_rate: float = 0.1,
+        max_depth: int = 6,
+        subsample: float = 1.0,
+        colsample_bytree: float = 1.0,
+        min_child_weight: float = 1.0,
+        max_bin: int = 256,
+        early_stopping_rounds: int = 20,
+        validation_fraction: float = 0.1,
+        nthread: Optional[int] = None,
+        random_state: int = 42
+    ):
+        self.n_estimators = n_estimators
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.subsample = subsample
+        self.colsample_bytree = colsample_bytree
+        self.min_child_weight = min_child_weight
+        self.max_bin = max_bin
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.nthread = nthread
+        self.random_state = random_state
+
+    def _train(self, X: Any, y: np.ndarray, objective: Dict[str, Any], stratify: Optional[np.ndarray] = None, early_stopping: bool = True):
+        import xgboost as xgb
+
+        nthread = self.nthread or available_cpus()
+        params = dict(
+            objective,
+            tree_method="hist",
+            eta=self.learning_rate,
+            max_depth=self.max_depth,
+            subsample=self.subsample,
+            colsample_bytree=self.colsample_bytree,
+            min_child_weight=self.min_child_weight,
+            max_bin=self.max_bin,
+            nthread=nthread,
+            seed=self.random_state
+        )
+        n_val = int(len(y) * self.validation_fraction)
+        if early_stopping and self.early_stopping_rounds and n_val >= MIN_VALIDATION_ROWS:
+            def build():
+                fit_idx, val_idx = train_test_split(
+                    np.arange(len(y)), test_size=n_val, stratify=stratify, random_state=self.random_state
+                )
+                dtrain = xgb.QuantileDMatrix(_rows(X, fit_idx), y[fit_idx], max_bin=self.max_bin, enable_categorical=True, nthread=nthread)
+                # Scored from raw values like predict() does; a sparse QuantileDMatrix eval set is several times slower
+                dval = xgb.DMatrix(_rows(X, val_idx), y[val_idx], enable_categorical=True, nthread=nthread)
+                return dtrain, dval
+
+            dtrain, dval = _cached_matrices(X, y, (self.max_bin, n_val, self.random_state), build)
+            self.booster_ = xgb.train(
+                params, dtrain, num_boost_round=self.n_estimators, evals=[(dval, "validation")],
+                early_stopping_rounds=self.early_stopping_rounds, verbose_eval=False
+            )
+            self.best_iteration_ = int(self.booster_.best_iteration)
+        else:
+            dtrain, _ = _cached_matrices(
+                X, y, (self.max_bin, None, None),
+                lambda: (xgb.QuantileDMatrix(X, y, max_bin=self.max_bin, enable_categorical=True, nthread=nthread), None)
+            )
+            self.booster_ = xgb.train(params, dtrain, num_boost_round=self.n_estimators)
+            self.best_iteration_ = self.n_estimators - 1
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _raw_predict(self, X: Any) -> np.ndarray:
+        import xgboost as xgb
+
+        data = xgb.DMatrix(X, enable_categorical=True, nthread=self.nthread or available_cpus())
+        return self.booster_.predict(data, iteration_range=(0, self.best_iteration_ + 1))
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return hasattr(self, "booster_")
+
+class HistXGBClassifier(ClassifierMixin, _HistXGBoost):
+    def fit(self, X: Any, y: Any):
+        # XGBoost wants labels 0..n_classes-1
+        self.classes_, encoded = np.unique(np.asarray(y), return_inverse=True)
+        if len(self.classes_) > 2:
+            objective = {"objective": "multi:softprob", "num_class": len(self.classes_), "eval_metric": "mlogloss"}
+        else:
+            objective = {"objective": "binary:logistic", "eval_metric": "logloss"}
+        # Stratifying needs every class on both sides of the validation split
+        splittable = np.bincount(encoded).min() >= 2 and int(len(encoded) * self.validation_fraction) >= len(self.classes_)
+        return self._train(X, encoded.astype(np.float32), objective, stratify=encoded, early_stopping=splittable)
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        proba = self._raw_predict(X)
+        return proba if proba.ndim == 2 else np.column_stack([1.0 - proba, proba])
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+class HistXGBRegressor(RegressorMixin, _HistXGBoost):
+    def fit(self, X: Any, y: Any):
+        objective = {"objective": "reg:squarederror", "eval_metric": "rmse"}
+        return self._train(X, np.asarray(y, dtype=np.float32), objective)
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self._raw_predict(X)
+
+@contextmanager
+def reuse_matrices():
+    """Fits in this block on the same input as the previous one reuse its quantized matrices."""
+    with _matrix_lock:
+        _matrix_cache["enabled"] += 1
+    try:
+        yield
+    finally:
+        with _matrix_lock:
+            _matrix_cache["enabled"] -= 1
+            if not _matrix_cache["enabled"]:
+                _matrix_cache.pop("last", None)
+
+def _cached_matrices(X: Any, y: np.ndarray, key: tuple, build: Callable[[], Tuple[Any, Any]]) -> Tuple[Any, Any]:
+    """The (train, validation) matrices for X and y, quantized by build() unless the last fit used the same ones."""
+    with _matrix_lock:
+        if not _matrix_cache["enabled"]:
+            return build()
+        cached = _matrix_cache.get("last")
+        # Held by reference, so X can't be freed and its id reused while it is cached
+        if cached is not None and cached["X"] is X and cached["key"] == key and np.array_equal(cached["y"], y):
+            return cached["matrices"]
+        _matrix_cache.pop("last", None)
+        matrices = build()
+        _matrix_cache["last"] = {"X": X, "y": y, "key": key, "matrices": matrices}
+        return matrices
+
+def _rows(X: Any, positions: np.ndarray) -> Any:
+    return X.iloc[positions] if isinstance(X, pd.DataFrame) else X[positions]